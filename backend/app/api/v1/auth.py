@@ -103,6 +103,8 @@ async def logout():
         supabase = get_supabase()
         supabase.auth.sign_out()
         return {"message": "Successfully logged out"}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -0,0 +1,140 @@
+from fastapi import APIRouter, HTTPException, status, Depends, Query, UploadFile, File
+from typing import List, Optional
+from app.models.schemas import BOQItemResponse, BOQSummary, BOQImportResult
+from app.core.database import db_manager
+from app.core.cache import TTLCache
+from app.core.idempotency import Idempotency, idempotency, file_digest
+from app.middleware.auth import require_role
+from app.services.boq import BOQImportError, iter_upload_rows, import_boq_rows, fetch_boq_summary
+import uuid
+
+router = APIRouter()
+
+BOQ_EDITOR_ROLES = ["businessOwner", "projectManager", "siteEngineer", "accounts"]
+BOQ_VIEWER_ROLES = BOQ_EDITOR_ROLES + ["factorySupervisor", "purchaseTeam"]
+
+# Project BOQ totals, invalidated on import
+boq_summary_cache = TTLCache(ttl_seconds=300)
+
+async def get_boq_summary(project_id: uuid.UUID) -> Optional[dict]:
+    summary = boq_summary_cache.get(project_id)
+
+    if summary is None:
+        async with db_manager.transaction() as connection:
+            summary = await fetch_boq_summary(connection, project_id)
+        if summary is not None:
+            boq_summary_cache.set(project_id, summary)
+
+    return summary
+
+@router.get("/projects/{project_id}", response_model=List[BOQItemResponse])
+async def get_boq_items(
+    project_id: uuid.UUID,
+    category: Optional[str] = Query(None),
+    limit: int = Query(500, ge=1, le=5000),
+    offset: int = Query(0, ge=0),
+    current_user = Depends(require_role(BOQ_VIEWER_ROLES))
+):
+    """Get BOQ line items for a project"""
+    try:
+        query = "SELECT * FROM boq WHERE project_id = $1"
+        args = [project_id]
+
+        if category:
+            query += " AND category = $2"
+            args.append(category)
+
+        query += f" ORDER BY created_at, id LIMIT ${len(args) + 1} OFFSET ${len(args) + 2}"
+        args.extend([limit, offset])
+
+        rows = await db_manager.execute_query(query, *args, readonly=True)
+
+        return [BOQItemResponse(**dict(row)) for row in rows]
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch BOQ items: {str(e)}"
+        )
+
+@router.get("/projects/{project_id}/summary", response_model=BOQSummary)
+async def get_project_boq_summary(
+    project_id: uuid.UUID,
+    current_user = Depends(require_role(BOQ_VIEWER_ROLES))
+):
+    """Get BOQ category subtotals and total compared against the project budget"""
+    try:
+        summary = await get_boq_summary(project_id)
+
+        if summary is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Project not found"
+            )
+
+        return BOQSummary(**summary)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch BOQ summary: {str(e)}"
+        )
+
+@router.post("/projects/{project_id}/import", response_model=BOQImportResult)
+async def import_boq(
+    project_id: uuid.UUID,
+    file: UploadFile = File(..., description="CSV or XLSX with item_description, unit, quantity, rate and optional category columns"),
+    replace: bool = Query(False, description="Replace the project's existing BOQ instead of appending"),
+    strict: bool = Query(True, description="Reject the whole file if any row is invalid"),
+    idempotency: Idempotency = Depends(idempotency),
+    current_user = Depends(require_role(BOQ_EDITOR_ROLES))
+):
+    """Bulk import BOQ line items from a spreadsheet"""
+    try:
+        fingerprint = None
+        if idempotency.key:
+            fingerprint = {"file": file_digest(file.file), "replace": replace, "strict": strict}
+
+        rows = iter_upload_rows(file.filename, file.file)
+
+        async with db_manager.transaction() as connection:
+            replay = await idempotency.begin(connection, current_user["id"], fingerprint)
+            if replay:
+                return replay
+
+            project = await connection.fetchrow("SELECT id FROM projects WHERE id = $1", project_id)
+
+            if not project:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Project not found"
+                )
+
+            result = await import_boq_rows(
+                connection, project_id, current_user["id"], rows, replace=replace, strict=strict
+            )
+            summary = await fetch_boq_summary(connection, project_id)
+
+            response = BOQImportResult(**result, summary=summary)
+            await idempotency.complete(connection, response)
+
+        boq_summary_cache.set(project_id, summary)
+
+        return response
+
+    except BOQImportError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail={"message": str(e), "errors": e.errors}
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to import BOQ: {str(e)}"
+        )
@@ -0,0 +1,212 @@
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from typing import List, Optional
+from datetime import date
+from decimal import Decimal
+from app.models.schemas import (
+    InvoiceResponse, InvoiceUpdate, InvoiceStatus, InvoiceBulkCreate, InvoiceBulkResult,
+    PurchaseRequestMatch
+)
+from app.core.database import get_supabase, db_manager
+from app.core.idempotency import Idempotency, idempotency
+from app.middleware.auth import require_role
+from app.services.invoices import upsert_invoices, find_purchase_request_matches, sweep_overdue_invoices
+import uuid
+
+router = APIRouter()
+
+INVOICE_EDITOR_ROLES = ["businessOwner", "accounts"]
+INVOICE_VIEWER_ROLES = INVOICE_EDITOR_ROLES + ["projectManager", "purchaseTeam"]
+
+@router.get("/", response_model=List[InvoiceResponse])
+async def get_invoices(
+    project_id: Optional[uuid.UUID] = Query(None),
+    vendor_id: Optional[uuid.UUID] = Query(None),
+    status_filter: Optional[InvoiceStatus] = Query(None, alias="status"),
+    limit: int = Query(100, ge=1, le=500),
+    current_user = Depends(require_role(INVOICE_VIEWER_ROLES))
+):
+    """Get invoices with optional filters"""
+    try:
+        supabase = get_supabase()
+
+        query = supabase.table("invoices").select("*")
+
+        if project_id:
+            query = query.eq("project_id", str(project_id))
+        if vendor_id:
+            query = query.eq("vendor_id", str(vendor_id))
+        if status_filter:
+            query = query.eq("status", status_filter.value)
+
+        result = query.order("due_date", nulls_last=True).limit(limit).execute()
+
+        return [InvoiceResponse(**invoice) for invoice in result.data]
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch invoices: {str(e)}"
+        )
+
+@router.post("/bulk", response_model=InvoiceBulkResult)
+async def ingest_invoices(
+    invoice_data: InvoiceBulkCreate,
+    idempotency: Idempotency = Depends(idempotency),
+    current_user = Depends(require_role(INVOICE_EDITOR_ROLES))
+):
+    """Ingest a batch of vendor invoices; re-uploading the same invoices is a no-op"""
+    try:
+        invoice_numbers = [invoice.invoice_number for invoice in invoice_data.invoices]
+        duplicates = sorted({number for number in invoice_numbers if invoice_numbers.count(number) > 1})
+
+        if duplicates:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Duplicate invoice numbers in upload: {', '.join(duplicates)}"
+            )
+
+        invoices = []
+        for invoice in invoice_data.invoices:
+            invoice_dict = invoice.dict()
+            if invoice_dict["total_amount"] is None:
+                invoice_dict["total_amount"] = float(Decimal(str(invoice.subtotal)) + Decimal(str(invoice.tax_amount)))
+            invoices.append(invoice_dict)
+
+        async with db_manager.transaction() as connection:
+            # A retry reports the original counts rather than "all unchanged"
+            replay = await idempotency.begin(connection, current_user["id"], invoice_data)
+            if replay:
+                return replay
+
+            rows = await upsert_invoices(connection, invoices)
+
+            inserted = sum(1 for row in rows if row["inserted"])
+
+            response = InvoiceBulkResult(
+                inserted=inserted,
+                updated=len(rows) - inserted,
+                unchanged=len(invoices) - len(rows),
+                invoices=[InvoiceResponse(**dict(row)) for row in rows]
+            )
+            await idempotency.complete(connection, response)
+
+        return response
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to ingest invoices: {str(e)}"
+        )
+
+@router.post("/sweep-overdue")
+async def run_overdue_sweep(current_user = Depends(require_role(INVOICE_EDITOR_ROLES))):
+    """Mark unpaid invoices past their due date as overdue now"""
+    try:
+        count = await sweep_overdue_invoices()
+
+        return {"marked_overdue": count}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to sweep overdue invoices: {str(e)}"
+        )
+
+@router.get("/{invoice_id}", response_model=InvoiceResponse)
+async def get_invoice(
+    invoice_id: uuid.UUID,
+    current_user = Depends(require_role(INVOICE_VIEWER_ROLES))
+):
+    """Get invoice by ID"""
+    try:
+        supabase = get_supabase()
+
+        result = supabase.table("invoices").select("*").eq("id", str(invoice_id)).execute()
+
+        if not result.data:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Invoice not found"
+            )
+
+        return InvoiceResponse(**result.data[0])
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch invoice: {str(e)}"
+        )
+
+@router.put("/{invoice_id}", response_model=InvoiceResponse)
+async def update_invoice(
+    invoice_id: uuid.UUID,
+    invoice_data: InvoiceUpdate,
+    current_user = Depends(require_role(INVOICE_EDITOR_ROLES))
+):
+    """Update invoice status (approve, pay)"""
+    try:
+        supabase = get_supabase()
+
+        # Convert to dict and remove None values
+        update_data = {k: v for k, v in invoice_data.dict().items() if v is not None}
+
+        if not update_data:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="No data provided for update"
+            )
+
+        if update_data.get("status"):
+            update_data["processed_by"] = current_user["id"]
+        if update_data.get("status") == InvoiceStatus.PAID and "paid_date" not in update_data:
+            update_data["paid_date"] = date.today()
+
+        for key in ("due_date", "paid_date"):
+            if key in update_data:
+                update_data[key] = update_data[key].isoformat()
+
+        result = supabase.table("invoices").update(update_data).eq("id", str(invoice_id)).execute()
+
+        if not result.data:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Invoice not found"
+            )
+
+        return InvoiceResponse(**result.data[0])
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to update invoice: {str(e)}"
+        )
+
+@router.get("/{invoice_id}/matches", response_model=List[PurchaseRequestMatch])
+async def get_invoice_matches(
+    invoice_id: uuid.UUID,
+    current_user = Depends(require_role(INVOICE_VIEWER_ROLES))
+):
+    """Find committed purchase requests from the same vendor and project that this invoice bills"""
+    try:
+        async with db_manager.transaction() as connection:
+            rows = await find_purchase_request_matches(connection, invoice_id)
+
+        return [PurchaseRequestMatch(**dict(row)) for row in rows]
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to match invoice: {str(e)}"
+        )
@@ -0,0 +1,112 @@
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from typing import Optional
+from app.models.schemas import NotificationResponse, NotificationPage, NotificationMarkRead, NotificationMarkReadResult
+from app.core.database import db_manager
+from app.core.pagination import decode_cursor, next_cursor
+from app.middleware.auth import get_current_user
+
+router = APIRouter()
+
+UNREAD_COUNT_SQL = "SELECT unread_count FROM notification_counters WHERE user_id = $1"
+
+async def fetch_unread_count(connection, user_id) -> int:
+    """Read the trigger-maintained unread counter for a user"""
+    count = await connection.fetchval(UNREAD_COUNT_SQL, user_id)
+    return count or 0
+
+@router.get("/", response_model=NotificationPage)
+async def get_notifications(
+    unread_only: bool = Query(False),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    current_user = Depends(get_current_user)
+):
+    """Get the current user's notifications, newest first"""
+    try:
+        # Served by idx_notifications_user_created, or idx_notifications_user_unread
+        query = "SELECT * FROM notifications WHERE user_id = $1"
+        args = [current_user["id"]]
+
+        if unread_only:
+            query += " AND NOT is_read"
+
+        position = decode_cursor(cursor)
+        if position:
+            query += " AND (created_at, id) < ($2, $3)"
+            args.extend(position)
+
+        query += f" ORDER BY created_at DESC, id DESC LIMIT ${len(args) + 1}"
+        args.append(limit)
+
+        async with db_manager.transaction() as connection:
+            rows = await connection.fetch(query, *args)
+            unread_count = await fetch_unread_count(connection, current_user["id"])
+
+        return NotificationPage(
+            items=[NotificationResponse(**dict(row)) for row in rows],
+            next_cursor=next_cursor(rows, limit),
+            unread_count=unread_count
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch notifications: {str(e)}"
+        )
+
+@router.get("/unread-count")
+async def get_unread_count(current_user = Depends(get_current_user)):
+    """Get the current user's unread notification count"""
+    try:
+        count = await db_manager.execute_one(UNREAD_COUNT_SQL, current_user["id"])
+
+        return {"unread_count": count["unread_count"] if count else 0}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch unread count: {str(e)}"
+        )
+
+@router.post("/mark-read", response_model=NotificationMarkReadResult)
+async def mark_notifications_read(
+    mark_data: NotificationMarkRead,
+    current_user = Depends(get_current_user)
+):
+    """Mark notifications as read, either by id or everything up to a timestamp"""
+    try:
+        if (mark_data.ids is None) == (mark_data.before is None):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Provide either ids or before"
+            )
+
+        if mark_data.ids is not None:
+            condition, value = "id = ANY($2::uuid[])", mark_data.ids
+        else:
+            condition, value = "created_at <= $2", mark_data.before
+
+        async with db_manager.transaction() as connection:
+            result = await connection.execute(
+                f"UPDATE notifications SET is_read = true WHERE user_id = $1 AND NOT is_read AND {condition}",
+                current_user["id"],
+                value
+            )
+            unread_count = await fetch_unread_count(connection, current_user["id"])
+
+        return NotificationMarkReadResult(
+            updated=int(result.split()[-1]),
+            unread_count=unread_count
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to mark notifications as read: {str(e)}"
+        )
@@ -1,22 +1,38 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List, Dict, Any
+from fastapi import APIRouter, HTTPException, status, Depends, Request
+from typing import List, Dict, Any, Optional
 from app.models.schemas import RoleResponse, ProcessResponse
+from app.core.config import settings
 from app.core.database import get_supabase
+from app.core.response_cache import PrecompressedResponseCache
 from app.middleware.auth import get_current_user
 import uuid
 
 router = APIRouter()
 
+# Roles, processes and connections change with deployments, not requests
+_reference_cache: Optional[PrecompressedResponseCache] = None
+
+def get_reference_cache() -> PrecompressedResponseCache:
+    global _reference_cache
+    if _reference_cache is None:
+        _reference_cache = PrecompressedResponseCache(settings.REFERENCE_DATA_CACHE_TTL_SECONDS)
+    return _reference_cache
+
 @router.get("/roles", response_model=List[RoleResponse])
-async def get_roles(current_user = Depends(get_current_user)):
+async def get_roles(request: Request, current_user = Depends(get_current_user)):
     """Get all roles"""
     try:
-        supabase = get_supabase()
-        
-        result = supabase.table("roles").select("*").order("tier").execute()
+        def build():
+            supabase = get_supabase()
+            
+            result = supabase.table("roles").select("*").order("tier").execute()
+            
+            return [RoleResponse(**role) for role in result.data]
         
-        return [RoleResponse(**role) for role in result.data]
+        return get_reference_cache().respond(request, "roles", build)
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -52,34 +68,61 @@ async def get_role(
 
 @router.get("/", response_model=List[ProcessResponse])
 async def get_processes(
+    request: Request,
     role_id: str = None,
     current_user = Depends(get_current_user)
 ):
     """Get all processes, optionally filtered by role"""
     try:
-        supabase = get_supabase()
-        
-        query = supabase.table("processes").select("*")
+        def build():
+            supabase = get_supabase()
+            
+            query = supabase.table("processes").select("*")
+            
+            if role_id:
+                query = query.eq("role_id", role_id)
+            
+            result = query.order("role_id").execute()
+            
+            # Parse JSON steps field
+            processes = []
+            for process in result.data:
+                process_data = ProcessResponse(**process)
+                processes.append(process_data)
+            
+            return processes
         
-        if role_id:
-            query = query.eq("role_id", role_id)
-        
-        result = query.order("role_id").execute()
-        
-        # Parse JSON steps field
-        processes = []
-        for process in result.data:
-            process_data = ProcessResponse(**process)
-            processes.append(process_data)
-        
-        return processes
+        return get_reference_cache().respond(request, ("processes", role_id), build)
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to fetch processes: {str(e)}"
         )
 
+@router.get("/my-processes", response_model=List[ProcessResponse])
+async def get_my_processes(request: Request, current_user = Depends(get_current_user)):
+    """Get processes for current user's role"""
+    try:
+        def build():
+            supabase = get_supabase()
+            
+            result = supabase.table("processes").select("*").eq("role_id", current_user["role_id"]).execute()
+            
+            return [ProcessResponse(**process) for process in result.data]
+        
+        return get_reference_cache().respond(request, ("my-processes", current_user["role_id"]), build)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch your processes: {str(e)}"
+        )
+
 @router.get("/{process_id}", response_model=ProcessResponse)
 async def get_process(
     process_id: str,
@@ -108,72 +151,65 @@ async def get_process(
         )
 
 @router.get("/connections/workflow")
-async def get_workflow_connections(current_user = Depends(get_current_user)):
+async def get_workflow_connections(request: Request, current_user = Depends(get_current_user)):
     """Get all process workflow connections"""
     try:
-        supabase = get_supabase()
-        
-        result = supabase.table("process_connections").select("*").execute()
+        def build():
+            supabase = get_supabase()
+            
+            result = supabase.table("process_connections").select("*").execute()
+            
+            return {"connections": result.data}
         
-        return {"connections": result.data}
+        return get_reference_cache().respond(request, "connections", build)
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to fetch workflow connections: {str(e)}"
         )
 
-@router.get("/my-processes", response_model=List[ProcessResponse])
-async def get_my_processes(current_user = Depends(get_current_user)):
-    """Get processes for current user's role"""
-    try:
-        supabase = get_supabase()
-        
-        result = supabase.table("processes").select("*").eq("role_id", current_user["role_id"]).execute()
-        
-        return [ProcessResponse(**process) for process in result.data]
-    
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to fetch your processes: {str(e)}"
-        )
-
 @router.get("/role/{role_id}/workflow")
 async def get_role_workflow(
+    request: Request,
     role_id: str,
     current_user = Depends(get_current_user)
 ):
     """Get complete workflow information for a specific role"""
     try:
-        supabase = get_supabase()
-        
-        # Get role info
-        role_result = supabase.table("roles").select("*").eq("id", role_id).execute()
-        
-        if not role_result.data:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Role not found"
-            )
-        
-        role = role_result.data[0]
-        
-        # Get processes for this role
-        processes_result = supabase.table("processes").select("*").eq("role_id", role_id).execute()
-        
-        # Get incoming connections (processes that feed into this role)
-        incoming_connections = supabase.table("process_connections").select("*").eq("to_role", role_id).execute()
-        
-        # Get outgoing connections (processes that this role feeds into)
-        outgoing_connections = supabase.table("process_connections").select("*").eq("from_role", role_id).execute()
+        def build():
+            supabase = get_supabase()
+            
+            # Get role info
+            role_result = supabase.table("roles").select("*").eq("id", role_id).execute()
+            
+            if not role_result.data:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Role not found"
+                )
+            
+            role = role_result.data[0]
+            
+            # Get processes for this role
+            processes_result = supabase.table("processes").select("*").eq("role_id", role_id).execute()
+            
+            # Get incoming connections (processes that feed into this role)
+            incoming_connections = supabase.table("process_connections").select("*").eq("to_role", role_id).execute()
+            
+            # Get outgoing connections (processes that this role feeds into)
+            outgoing_connections = supabase.table("process_connections").select("*").eq("from_role", role_id).execute()
+            
+            return {
+                "role": RoleResponse(**role),
+                "processes": [ProcessResponse(**process) for process in processes_result.data],
+                "incoming_connections": incoming_connections.data,
+                "outgoing_connections": outgoing_connections.data
+            }
         
-        return {
-            "role": RoleResponse(**role),
-            "processes": [ProcessResponse(**process) for process in processes_result.data],
-            "incoming_connections": incoming_connections.data,
-            "outgoing_connections": outgoing_connections.data
-        }
+        return get_reference_cache().respond(request, ("role-workflow", role_id), build)
     
     except HTTPException:
         raise
@@ -184,42 +220,47 @@ async def get_role_workflow(
         )
 
 @router.get("/hierarchy/organizational")
-async def get_organizational_hierarchy(current_user = Depends(get_current_user)):
+async def get_organizational_hierarchy(request: Request, current_user = Depends(get_current_user)):
     """Get complete organizational hierarchy with roles and processes"""
     try:
-        supabase = get_supabase()
-        
-        # Get all roles grouped by tier
-        roles_result = supabase.table("roles").select("*").order("tier").execute()
-        
-        # Group roles by tier
-        hierarchy = {
-            "Management Tier": [],
-            "Operations Tier": [],
-            "Support Tier": []
-        }
-        
-        for role in roles_result.data:
-            tier = role["tier"]
-            if tier in hierarchy:
-                # Get processes for this role
-                processes_result = supabase.table("processes").select("*").eq("role_id", role["id"]).execute()
+        def build():
+            supabase = get_supabase()
+            
+            # Get all roles grouped by tier
+            roles_result = supabase.table("roles").select("*").order("tier").execute()
+            
+            # Group roles by tier
+            hierarchy = {
+                "Management Tier": [],
+                "Operations Tier": [],
+                "Support Tier": []
+            }
+            
+            for role in roles_result.data:
+                tier = role["tier"]
+                if tier in hierarchy:
+                    # Get processes for this role
+                    processes_result = supabase.table("processes").select("*").eq("role_id", role["id"]).execute()
                 
-                role_data = {
-                    "role": RoleResponse(**role),
-                    "processes": [ProcessResponse(**process) for process in processes_result.data]
-                }
+                    role_data = {
+                        "role": RoleResponse(**role),
+                        "processes": [ProcessResponse(**process) for process in processes_result.data]
+                    }
                 
-                hierarchy[tier].append(role_data)
+                    hierarchy[tier].append(role_data)
+            
+            # Get all workflow connections
+            connections_result = supabase.table("process_connections").select("*").execute()
+            
+            return {
+                "hierarchy": hierarchy,
+                "workflow_connections": connections_result.data
+            }
         
-        # Get all workflow connections
-        connections_result = supabase.table("process_connections").select("*").execute()
-        
-        return {
-            "hierarchy": hierarchy,
-            "workflow_connections": connections_result.data
-        }
+        return get_reference_cache().respond(request, "hierarchy", build)
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
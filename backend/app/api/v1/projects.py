@@ -1,12 +1,32 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request, Response
 from typing import List, Optional
-from app.models.schemas import ProjectResponse, ProjectCreate, ProjectUpdate, ProjectStatus
-from app.core.database import get_supabase
-from app.middleware.auth import get_current_user, require_manager
+from enum import Enum
+from app.models.schemas import (
+    ProjectResponse, ProjectCreate, ProjectUpdate, ProjectStatus,
+    ProjectCostSummary, ProjectVarianceReport
+)
+from app.core.database import get_supabase, db_manager
+from app.core.access_policy import project_visibility, project_visible, add_arg
+from app.core.idempotency import Idempotency, idempotency
+from app.core.http_cache import version_etag, if_match_versions
+from app.middleware.auth import get_current_user, require_manager, require_role
+from app.services.costs import fetch_project_costs, fetch_category_variance, refresh_project_costs
+from app.services.entities import PROJECT_COLUMNS, project_cache
 import uuid
 
 router = APIRouter()
 
+# Roles that see every project's financials; project managers see their own
+FINANCE_ROLES = ["businessOwner", "accounts"]
+
+def check_financial_access(current_user, costs):
+    if (current_user["role_id"] not in FINANCE_ROLES and
+        str(costs.get("project_manager_id")) != current_user["id"]):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view this project's costs"
+        )
+
 @router.get("/", response_model=List[ProjectResponse])
 async def get_projects(
     status_filter: Optional[ProjectStatus] = Query(None, alias="status"),
@@ -15,28 +35,24 @@ async def get_projects(
 ):
     """Get projects with optional filters"""
     try:
-        supabase = get_supabase()
-        
-        query = supabase.table("projects").select("*")
-        
-        # Role-based filtering
-        if current_user["role_id"] == "projectManager":
-            # Project managers see only their projects
-            query = query.eq("project_manager_id", current_user["id"])
-        elif current_user["role_id"] not in ["businessOwner"]:
-            # Other roles see projects they're involved in
-            # This would need more complex logic based on tasks/assignments
-            pass
-        
+        args = []
+        conditions = [project_visibility(current_user, args)]
+
         if status_filter:
-            query = query.eq("status", status_filter.value)
+            conditions.append(f"p.status = {add_arg(args, status_filter.value)}")
         if project_manager_id:
-            query = query.eq("project_manager_id", str(project_manager_id))
-        
-        result = query.order("created_at", desc=True).execute()
-        
-        return [ProjectResponse(**project) for project in result.data]
+            conditions.append(f"p.project_manager_id = {add_arg(args, project_manager_id)}")
+
+        rows = await db_manager.execute_query(
+            f"SELECT {PROJECT_COLUMNS} FROM projects p WHERE {' AND '.join(conditions)} ORDER BY p.created_at DESC",
+            *args,
+            readonly=True
+        )
+
+        return [ProjectResponse(**dict(row)) for row in rows]
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -45,28 +61,30 @@ async def get_projects(
 
 @router.get("/{project_id}", response_model=ProjectResponse)
 async def get_project(
+    response: Response,
     project_id: uuid.UUID,
     current_user = Depends(get_current_user)
 ):
     """Get project by ID"""
     try:
-        supabase = get_supabase()
-        
-        result = supabase.table("projects").select("*").eq("id", str(project_id)).execute()
-        
-        if not result.data:
+        project = await project_cache.get(project_id)
+        visible = project_visible(current_user, project) if project else False
+
+        if visible is None:
+            args = [project_id]
+            predicate = project_visibility(current_user, args)
+            visible = await db_manager.execute_one(
+                f"SELECT 1 FROM projects p WHERE p.id = $1 AND {predicate}", *args
+            ) is not None
+
+        # Projects the user may not see are indistinguishable from missing ones
+        if not visible:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Project not found"
             )
         
-        project = result.data[0]
-        
-        # Check access permissions
-        if (current_user["role_id"] not in ["businessOwner"] and 
-            project["project_manager_id"] != current_user["id"]):
-            # Additional logic to check if user is assigned to this project
-            pass
+        response.headers["ETag"] = version_etag(project["version"])
         
         return ProjectResponse(**project)
     
@@ -81,30 +99,39 @@ async def get_project(
 @router.post("/", response_model=ProjectResponse)
 async def create_project(
     project_data: ProjectCreate,
+    idempotency: Idempotency = Depends(idempotency),
     current_user = Depends(require_manager)
 ):
     """Create new project (Manager+ only)"""
     try:
-        supabase = get_supabase()
-        
-        # Set project manager if not specified
-        if not project_data.project_manager_id:
-            if current_user["role_id"] == "projectManager":
-                project_data.project_manager_id = uuid.UUID(current_user["id"])
-        
-        project_dict = project_data.dict()
-        if project_dict["project_manager_id"]:
-            project_dict["project_manager_id"] = str(project_dict["project_manager_id"])
-        
-        result = supabase.table("projects").insert(project_dict).execute()
-        
-        if not result.data:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to create project"
+        async with db_manager.transaction() as connection:
+            # A retry with the same Idempotency-Key gets the original response
+            replay = await idempotency.begin(connection, current_user["id"], project_data)
+            if replay:
+                return replay
+            
+            # Set project manager if not specified
+            if not project_data.project_manager_id:
+                if current_user["role_id"] == "projectManager":
+                    project_data.project_manager_id = uuid.UUID(current_user["id"])
+            
+            project = await connection.fetchrow(
+                f"""
+                INSERT INTO projects AS p (
+                    name, description, client_name, project_manager_id, start_date, end_date, budget
+                )
+                VALUES ($1, $2, $3, $4, $5, $6, $7)
+                RETURNING {PROJECT_COLUMNS}
+                """,
+                project_data.name, project_data.description, project_data.client_name,
+                project_data.project_manager_id, project_data.start_date, project_data.end_date,
+                project_data.budget
             )
+            
+            response = ProjectResponse(**dict(project))
+            await idempotency.complete(connection, response)
         
-        return ProjectResponse(**result.data[0])
+        return response
     
     except HTTPException:
         raise
@@ -116,34 +143,19 @@ async def create_project(
 
 @router.put("/{project_id}", response_model=ProjectResponse)
 async def update_project(
+    request: Request,
+    response: Response,
     project_id: uuid.UUID,
     project_data: ProjectUpdate,
     current_user = Depends(get_current_user)
 ):
-    """Update project"""
+    """Update project; send If-Match or version to reject concurrent edits with 412"""
     try:
-        supabase = get_supabase()
-        
-        # Check if user can update this project
-        project_check = supabase.table("projects").select("project_manager_id").eq("id", str(project_id)).execute()
-        
-        if not project_check.data:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Project not found"
-            )
-        
-        project = project_check.data[0]
-        
-        if (current_user["role_id"] not in ["businessOwner"] and 
-            project["project_manager_id"] != current_user["id"]):
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not authorized to update this project"
-            )
-        
         # Convert to dict and remove None values
-        update_data = {k: v for k, v in project_data.dict().items() if v is not None}
+        update_data = {
+            k: (v.value if isinstance(v, Enum) else v)
+            for k, v in project_data.dict(exclude={"version"}).items() if v is not None
+        }
         
         if not update_data:
             raise HTTPException(
@@ -151,15 +163,58 @@ async def update_project(
                 detail="No data provided for update"
             )
         
-        result = supabase.table("projects").update(update_data).eq("id", str(project_id)).execute()
+        args = [project_id]
+        assignments = [f"{column} = {add_arg(args, value)}" for column, value in update_data.items()]
+        
+        # Version preconditions and the permission check share the UPDATE's WHERE clause
+        conditions = ["p.id = $1"]
+        if_match = if_match_versions(request)
+        if if_match is not None:
+            conditions.append(f"p.version = ANY({add_arg(args, if_match)}::int[])")
+        if project_data.version is not None:
+            conditions.append(f"p.version = {add_arg(args, project_data.version)}")
+        if current_user["role_id"] != "businessOwner":
+            conditions.append(f"p.project_manager_id = {add_arg(args, current_user['id'])}")
+        
+        project = await db_manager.execute_one(
+            f"""
+            UPDATE projects AS p SET {", ".join(assignments)}
+            WHERE {" AND ".join(conditions)}
+            RETURNING {PROJECT_COLUMNS}
+            """,
+            *args
+        )
         
-        if not result.data:
+        if not project:
+            # Only a failed update pays for a second query to explain why
+            current = await db_manager.execute_one(
+                "SELECT project_manager_id, version FROM projects WHERE id = $1", project_id
+            )
+            
+            if not current:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Project not found"
+                )
+            
+            if (current_user["role_id"] != "businessOwner" and
+                str(current["project_manager_id"]) != current_user["id"]):
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Not authorized to update this project"
+                )
+            
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to update project"
+                status_code=status.HTTP_412_PRECONDITION_FAILED,
+                detail="Project was modified by someone else; reload and retry",
+                headers={"ETag": version_etag(current["version"])}
             )
         
-        return ProjectResponse(**result.data[0])
+        # Other workers drop their copy when the change notification arrives
+        project_cache.invalidate(project_id)
+        response.headers["ETag"] = version_etag(project["version"])
+        
+        return ProjectResponse(**dict(project))
     
     except HTTPException:
         raise
@@ -195,6 +250,8 @@ async def delete_project(
                 detail="Project not found"
             )
         
+        project_cache.invalidate(project_id)
+        
         return {"message": "Project deleted successfully"}
     
     except HTTPException:
@@ -253,4 +310,89 @@ async def get_project_progress(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to get project progress: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+@router.get("/{project_id}/costs", response_model=ProjectCostSummary)
+async def get_project_costs(
+    project_id: uuid.UUID,
+    current_user = Depends(get_current_user)
+):
+    """Get rolled-up committed, invoiced and paid totals for a project"""
+    try:
+        async with db_manager.transaction() as connection:
+            costs = await fetch_project_costs(connection, project_id)
+
+        if not costs:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Project not found"
+            )
+
+        check_financial_access(current_user, costs)
+
+        return ProjectCostSummary(**costs)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get project costs: {str(e)}"
+        )
+
+@router.get("/{project_id}/variance", response_model=ProjectVarianceReport)
+async def get_project_variance(
+    project_id: uuid.UUID,
+    current_user = Depends(get_current_user)
+):
+    """Get budget-vs-actual variance by BOQ category"""
+    try:
+        async with db_manager.transaction() as connection:
+            costs = await fetch_project_costs(connection, project_id)
+
+            if not costs:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Project not found"
+                )
+
+            check_financial_access(current_user, costs)
+
+            variance = await fetch_category_variance(connection, project_id)
+
+        return ProjectVarianceReport(costs=ProjectCostSummary(**costs), **variance)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get project variance: {str(e)}"
+        )
+
+@router.post("/{project_id}/costs/refresh", response_model=ProjectCostSummary)
+async def refresh_costs(
+    project_id: uuid.UUID,
+    current_user = Depends(require_role(FINANCE_ROLES))
+):
+    """Rebuild a project's cost rollups from its purchase requests and invoices"""
+    try:
+        async with db_manager.transaction() as connection:
+            if not await fetch_project_costs(connection, project_id):
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Project not found"
+                )
+
+            await refresh_project_costs(connection, project_id)
+            costs = await fetch_project_costs(connection, project_id)
+
+        return ProjectCostSummary(**costs)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to refresh project costs: {str(e)}"
+        )
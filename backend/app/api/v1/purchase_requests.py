@@ -0,0 +1,360 @@
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from typing import List, Optional
+from decimal import Decimal, ROUND_HALF_UP
+from app.models.schemas import (
+    PurchaseRequestResponse, PurchaseRequestCreate, PurchaseRequestStatus, ApprovalLevel,
+    PurchaseRequestDecision, PurchaseRequestBulkDecision, PurchaseRequestBulkDecisionResponse,
+    PurchaseRequestQueue
+)
+from app.core.database import get_supabase, db_manager
+from app.core.idempotency import Idempotency, idempotency
+from app.core.pagination import decode_cursor, next_cursor
+from app.middleware.auth import get_current_user
+import uuid
+
+router = APIRouter()
+
+# Upper bounds (inclusive) of each approval tier, in rupees
+MID_RANGE_THRESHOLD = Decimal("10000")
+HIGH_VALUE_THRESHOLD = Decimal("50000")
+
+# Role whose approval queue receives each tier
+APPROVAL_ROUTING = {
+    ApprovalLevel.UNDER_10K: "purchaseTeam",
+    ApprovalLevel.MID_RANGE: "projectManager",
+    ApprovalLevel.HIGH_VALUE: "businessOwner",
+}
+
+# Tiers each role is allowed to decide on
+APPROVAL_AUTHORITY = {
+    "businessOwner": [ApprovalLevel.UNDER_10K, ApprovalLevel.MID_RANGE, ApprovalLevel.HIGH_VALUE],
+    "projectManager": [ApprovalLevel.UNDER_10K, ApprovalLevel.MID_RANGE],
+    "purchaseTeam": [ApprovalLevel.UNDER_10K],
+}
+
+# Roles that can see every purchase request rather than only their own
+PURCHASE_VIEWER_ROLES = ["businessOwner", "projectManager", "purchaseTeam", "accounts"]
+
+def compute_total_amount(quantity: int, unit_price: float) -> Decimal:
+    """Compute a request total rounded to paise"""
+    total = Decimal(quantity) * Decimal(str(unit_price))
+    return total.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+def compute_approval_level(total_amount: Decimal) -> ApprovalLevel:
+    """Map a request total to its approval tier"""
+    if total_amount < MID_RANGE_THRESHOLD:
+        return ApprovalLevel.UNDER_10K
+    if total_amount <= HIGH_VALUE_THRESHOLD:
+        return ApprovalLevel.MID_RANGE
+    return ApprovalLevel.HIGH_VALUE
+
+def get_approval_authority(current_user) -> List[ApprovalLevel]:
+    return APPROVAL_AUTHORITY.get(current_user["role_id"], [])
+
+# Decision statement: the status change and the requester notifications are
+# written by one statement, so a sweep either lands completely or not at all.
+DECISION_SQL = """
+    WITH decided AS (
+        UPDATE purchase_requests
+        SET status = $1, approved_by = $2
+        WHERE id = ANY($3::uuid[])
+          AND status = 'pending'
+          AND approval_level = ANY($4::text[])
+        RETURNING id, requested_by, item_name
+    ), notified AS (
+        INSERT INTO notifications (user_id, title, message, type, related_table, related_id)
+        SELECT requested_by,
+               $5,
+               'Your purchase request for ' || item_name || ' has been ' || $1,
+               'approval',
+               'purchase_requests',
+               id
+        FROM decided
+        WHERE requested_by IS NOT NULL
+    )
+    SELECT id FROM decided
+"""
+
+async def apply_decision(
+    connection,
+    request_ids: List[uuid.UUID],
+    decision: PurchaseRequestStatus,
+    current_user
+) -> List[uuid.UUID]:
+    """Approve or reject pending requests within the user's authority"""
+    authority = get_approval_authority(current_user)
+
+    if not authority:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to approve purchase requests"
+        )
+
+    title = f"Purchase Request {decision.value.capitalize()}"
+
+    rows = await connection.fetch(
+        DECISION_SQL,
+        decision.value,
+        current_user["id"],
+        list(request_ids),
+        [level.value for level in authority],
+        title
+    )
+
+    return [row["id"] for row in rows]
+
+@router.get("/", response_model=List[PurchaseRequestResponse])
+async def get_purchase_requests(
+    project_id: Optional[uuid.UUID] = Query(None),
+    status_filter: Optional[PurchaseRequestStatus] = Query(None, alias="status"),
+    approval_level: Optional[ApprovalLevel] = Query(None),
+    limit: int = Query(100, ge=1, le=500),
+    current_user = Depends(get_current_user)
+):
+    """Get purchase requests with optional filters"""
+    try:
+        supabase = get_supabase()
+
+        query = supabase.table("purchase_requests").select("*")
+
+        # Role-based filtering
+        if current_user["role_id"] not in PURCHASE_VIEWER_ROLES:
+            # Everyone else sees only the requests they raised
+            query = query.eq("requested_by", current_user["id"])
+
+        if project_id:
+            query = query.eq("project_id", str(project_id))
+        if status_filter:
+            query = query.eq("status", status_filter.value)
+        if approval_level:
+            query = query.eq("approval_level", approval_level.value)
+
+        result = query.order("created_at", desc=True).limit(limit).execute()
+
+        return [PurchaseRequestResponse(**request) for request in result.data]
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch purchase requests: {str(e)}"
+        )
+
+@router.get("/approval-queue", response_model=PurchaseRequestQueue)
+async def get_approval_queue(
+    approval_level: Optional[ApprovalLevel] = Query(None, description="Defaults to the tier routed to your role"),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=200),
+    current_user = Depends(get_current_user)
+):
+    """Get pending purchase requests awaiting the current user's approval, oldest first"""
+    try:
+        authority = get_approval_authority(current_user)
+
+        if not approval_level:
+            routed = [level for level, role in APPROVAL_ROUTING.items() if role == current_user["role_id"]]
+            approval_level = routed[0] if routed else None
+
+        if approval_level not in authority:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not authorized to view this approval queue"
+            )
+
+        # Served by idx_purchase_requests_approval_queue (status, approval_level, created_at, id)
+        query = """
+            SELECT * FROM purchase_requests
+            WHERE status = 'pending' AND approval_level = $1
+        """
+        args = [approval_level.value]
+
+        position = decode_cursor(cursor)
+        if position:
+            query += " AND (created_at, id) > ($2, $3)"
+            args.extend(position)
+
+        query += f" ORDER BY created_at, id LIMIT ${len(args) + 1}"
+        args.append(limit)
+
+        rows = await db_manager.execute_query(query, *args, readonly=True)
+
+        return PurchaseRequestQueue(
+            approval_level=approval_level,
+            items=[PurchaseRequestResponse(**dict(row)) for row in rows],
+            next_cursor=next_cursor(rows, limit)
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch approval queue: {str(e)}"
+        )
+
+@router.get("/{request_id}", response_model=PurchaseRequestResponse)
+async def get_purchase_request(
+    request_id: uuid.UUID,
+    current_user = Depends(get_current_user)
+):
+    """Get purchase request by ID"""
+    try:
+        supabase = get_supabase()
+
+        result = supabase.table("purchase_requests").select("*").eq("id", str(request_id)).execute()
+
+        if not result.data:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Purchase request not found"
+            )
+
+        purchase_request = result.data[0]
+
+        # Check access permissions
+        if (current_user["role_id"] not in PURCHASE_VIEWER_ROLES and
+            purchase_request["requested_by"] != current_user["id"]):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not authorized to view this purchase request"
+            )
+
+        return PurchaseRequestResponse(**purchase_request)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch purchase request: {str(e)}"
+        )
+
+# Request and approver notifications are written by one statement
+CREATE_REQUEST_SQL = """
+    WITH created AS (
+        INSERT INTO purchase_requests (
+            item_name, description, quantity, unit_price, vendor_name, category, project_id,
+            requested_by, total_amount, approval_level, status
+        )
+        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, 'pending')
+        RETURNING *
+    ), notified AS (
+        INSERT INTO notifications (user_id, title, message, type, related_table, related_id)
+        SELECT u.id, 'Purchase Approval Required', $12, 'approval', 'purchase_requests', created.id
+        FROM users u, created
+        WHERE u.role_id = $11 AND u.is_active = true
+    )
+    SELECT * FROM created
+"""
+
+@router.post("/", response_model=PurchaseRequestResponse)
+async def create_purchase_request(
+    request_data: PurchaseRequestCreate,
+    idempotency: Idempotency = Depends(idempotency),
+    current_user = Depends(get_current_user)
+):
+    """Create purchase request and route it to the approver role for its tier"""
+    try:
+        async with db_manager.transaction() as connection:
+            # A retry with the same Idempotency-Key gets the original response
+            replay = await idempotency.begin(connection, current_user["id"], request_data)
+            if replay:
+                return replay
+
+            # Verify project exists
+            project = await connection.fetchval("SELECT id FROM projects WHERE id = $1", request_data.project_id)
+
+            if not project:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Project not found"
+                )
+
+            total_amount = compute_total_amount(request_data.quantity, request_data.unit_price)
+            approval_level = compute_approval_level(total_amount)
+
+            # Insert the request and notify the approver role for this tier
+            purchase_request = await connection.fetchrow(
+                CREATE_REQUEST_SQL,
+                request_data.item_name, request_data.description, request_data.quantity,
+                request_data.unit_price, request_data.vendor_name, request_data.category,
+                request_data.project_id, current_user["id"], total_amount, approval_level.value,
+                APPROVAL_ROUTING[approval_level],
+                f"{request_data.item_name} (₹{total_amount:,.2f}) is awaiting your approval"
+            )
+
+            response = PurchaseRequestResponse(**dict(purchase_request))
+            await idempotency.complete(connection, response)
+
+        return response
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to create purchase request: {str(e)}"
+        )
+
+@router.post("/bulk-decision", response_model=PurchaseRequestBulkDecisionResponse)
+async def bulk_decide_purchase_requests(
+    decision_data: PurchaseRequestBulkDecision,
+    idempotency: Idempotency = Depends(idempotency),
+    current_user = Depends(get_current_user)
+):
+    """Approve or reject many pending requests in one transaction"""
+    try:
+        async with db_manager.transaction() as connection:
+            replay = await idempotency.begin(connection, current_user["id"], decision_data)
+            if replay:
+                return replay
+
+            processed = await apply_decision(connection, decision_data.request_ids, decision_data.decision, current_user)
+            processed_ids = set(processed)
+
+            response = PurchaseRequestBulkDecisionResponse(
+                decision=decision_data.decision,
+                processed=processed,
+                skipped=[request_id for request_id in decision_data.request_ids if request_id not in processed_ids]
+            )
+            await idempotency.complete(connection, response)
+
+        return response
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to process purchase requests: {str(e)}"
+        )
+
+@router.post("/{request_id}/decision", response_model=PurchaseRequestResponse)
+async def decide_purchase_request(
+    request_id: uuid.UUID,
+    decision_data: PurchaseRequestDecision,
+    current_user = Depends(get_current_user)
+):
+    """Approve or reject a single pending request"""
+    try:
+        async with db_manager.transaction() as connection:
+            processed = await apply_decision(connection, [request_id], decision_data.decision, current_user)
+
+        if not processed:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Purchase request is not pending or exceeds your approval limit"
+            )
+
+        row = await db_manager.execute_one("SELECT * FROM purchase_requests WHERE id = $1", request_id)
+
+        return PurchaseRequestResponse(**dict(row))
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to process purchase request: {str(e)}"
+        )
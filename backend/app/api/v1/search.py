@@ -0,0 +1,96 @@
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from typing import List, Optional
+from app.models.schemas import SearchResponse, SearchResult, SearchResultType
+from app.core.database import db_manager
+from app.core.access_policy import project_visibility, task_visibility
+from app.middleware.auth import get_current_user
+
+router = APIRouter()
+
+SEARCH_CONFIG = "english"
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=25, MinWords=8, MaxFragments=2"
+
+def project_search_sql(current_user, args: list) -> str:
+    visible = project_visibility(current_user, args)
+
+    return f"""
+        SELECT 'project' AS type, p.id, p.name AS title,
+               concat_ws(' ', p.client_name, p.description) AS body,
+               NULL::uuid AS project_id, p.status, p.created_at,
+               ts_rank(p.search_vector, query.q) AS rank
+        FROM projects p, query
+        WHERE p.search_vector @@ query.q AND {visible}
+        ORDER BY rank DESC, p.created_at DESC
+        LIMIT $2
+    """
+
+def task_search_sql(current_user, args: list) -> str:
+    visible = task_visibility(current_user, args)
+
+    return f"""
+        SELECT 'task' AS type, t.id, t.title,
+               t.description AS body,
+               t.project_id, t.status, t.created_at,
+               ts_rank(t.search_vector, query.q) AS rank
+        FROM tasks t, query
+        WHERE t.search_vector @@ query.q AND {visible}
+        ORDER BY rank DESC, t.created_at DESC
+        LIMIT $2
+    """
+
+@router.get("/", response_model=SearchResponse)
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    types: Optional[List[SearchResultType]] = Query(None, description="Restrict results to these types"),
+    limit: int = Query(20, ge=1, le=50),
+    offset: int = Query(0, ge=0, le=500),
+    current_user = Depends(get_current_user)
+):
+    """Ranked full-text search across projects and tasks with highlighted snippets"""
+    try:
+        types = types or list(SearchResultType)
+
+        # Each branch only needs enough top-ranked rows to fill this page plus one
+        args = [q, offset + limit + 1]
+
+        branches = []
+        if SearchResultType.PROJECT in types:
+            branches.append(project_search_sql(current_user, args))
+        if SearchResultType.TASK in types:
+            branches.append(task_search_sql(current_user, args))
+
+        union = " UNION ALL ".join(f"({branch})" for branch in branches)
+
+        # Snippets are only generated for the rows on the returned page
+        rows = await db_manager.execute_query(
+            f"""
+            WITH query AS (SELECT websearch_to_tsquery('{SEARCH_CONFIG}', $1) AS q),
+            hits AS ({union}),
+            page AS (
+                SELECT * FROM hits
+                ORDER BY rank DESC, created_at DESC, id
+                LIMIT {limit + 1} OFFSET {offset}
+            )
+            SELECT page.type, page.id, page.title, page.project_id, page.status, page.rank,
+                   ts_headline('{SEARCH_CONFIG}', concat_ws(' — ', page.title, page.body),
+                               query.q, '{HEADLINE_OPTIONS}') AS snippet
+            FROM page, query
+            ORDER BY page.rank DESC, page.created_at DESC, page.id
+            """,
+            *args,
+            readonly=True
+        )
+
+        return SearchResponse(
+            query=q,
+            results=[SearchResult(**dict(row)) for row in rows[:limit]],
+            has_more=len(rows) > limit
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to search: {str(e)}"
+        )
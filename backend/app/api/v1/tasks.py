@@ -1,7 +1,20 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request, Response
 from typing import List, Optional
-from app.models.schemas import TaskResponse, TaskCreate, TaskUpdate, TaskStatus, Priority
-from app.core.database import get_supabase
+from enum import Enum
+from app.models.schemas import (
+    TaskResponse, TaskCreate, TaskUpdate, TaskStatus, Priority, TaskSyncResponse, AssigneeRecommendation
+)
+from app.core.config import settings
+from app.core.database import get_supabase, db_manager
+from app.core.access_policy import task_visibility, task_visible, add_arg
+from app.core.idempotency import Idempotency, idempotency
+from app.core.http_cache import (
+    make_etag, is_not_modified, not_modified, set_cache_headers, version_etag, if_match_versions
+)
+from app.services.entities import TASK_COLUMNS, project_cache, task_cache
+from app.services.task_lifecycle import allowed_sources, transition_conflict
+from app.services.task_sync import SYNC_HORIZON_SQL, decode_sync_cursor, encode_sync_cursor, tombstone_horizon
+from app.services.workload import recommend_assignees
 from app.middleware.auth import get_current_user, require_manager
 import uuid
 
@@ -17,63 +30,244 @@ async def get_tasks(
 ):
     """Get tasks with optional filters"""
     try:
-        supabase = get_supabase()
-        
-        query = supabase.table("tasks").select("*")
-        
-        # Role-based filtering
-        if current_user["role_id"] in ["technicians"]:
-            # Technicians see only their assigned tasks
-            query = query.eq("assigned_to", current_user["id"])
-        elif current_user["role_id"] in ["factorySupervisor", "siteEngineer"]:
-            # Supervisors see tasks in their domain (would need more complex logic)
-            pass
-        
+        args = []
+        conditions = [task_visibility(current_user, args)]
+
         if project_id:
-            query = query.eq("project_id", str(project_id))
+            conditions.append(f"t.project_id = {add_arg(args, project_id)}")
         if assigned_to:
-            query = query.eq("assigned_to", str(assigned_to))
+            conditions.append(f"t.assigned_to = {add_arg(args, assigned_to)}")
         if status_filter:
-            query = query.eq("status", status_filter.value)
+            conditions.append(f"t.status = {add_arg(args, status_filter.value)}")
         if priority_filter:
-            query = query.eq("priority", priority_filter.value)
-        
-        result = query.order("created_at", desc=True).execute()
-        
-        return [TaskResponse(**task) for task in result.data]
+            conditions.append(f"t.priority = {add_arg(args, priority_filter.value)}")
+
+        rows = await db_manager.execute_query(
+            f"SELECT {TASK_COLUMNS} FROM tasks t WHERE {' AND '.join(conditions)} ORDER BY t.created_at DESC",
+            *args,
+            readonly=True
+        )
+
+        return [TaskResponse(**dict(row)) for row in rows]
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to fetch tasks: {str(e)}"
         )
 
+@router.get("/my-tasks", response_model=List[TaskResponse])
+async def get_my_tasks(
+    request: Request,
+    response: Response,
+    status_filter: Optional[TaskStatus] = Query(None, alias="status"),
+    current_user = Depends(get_current_user)
+):
+    """Get current user's assigned tasks"""
+    try:
+        args = [current_user["id"]]
+        condition = "assigned_to = $1"
+
+        if status_filter:
+            condition += f" AND status = {add_arg(args, status_filter.value)}"
+
+        async with db_manager.transaction(isolation="repeatable_read", readonly=True) as connection:
+            # Any insert, update, reassignment or delete moves one of these
+            watermark = await connection.fetchrow(
+                f"""
+                SELECT max(updated_at) AS updated_at, count(*) AS task_count,
+                       (SELECT max(deleted_at) FROM task_tombstones WHERE assigned_to = $1) AS deleted_at
+                FROM tasks WHERE {condition}
+                """,
+                *args
+            )
+
+            etag = make_etag(current_user["id"], status_filter, *watermark.values())
+            last_modified = max(
+                (value for value in (watermark["updated_at"], watermark["deleted_at"]) if value),
+                default=None
+            )
+
+            if is_not_modified(request, etag, last_modified):
+                return not_modified(etag, last_modified)
+
+            rows = await connection.fetch(
+                f"""
+                SELECT {TASK_COLUMNS} FROM tasks t WHERE {condition}
+                ORDER BY t.due_date ASC NULLS LAST, t.priority DESC
+                """,
+                *args
+            )
+
+        set_cache_headers(response, etag, last_modified)
+
+        return [TaskResponse(**dict(row)) for row in rows]
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch your tasks: {str(e)}"
+        )
+
+@router.get("/my-tasks/sync", response_model=TaskSyncResponse)
+async def sync_my_tasks(
+    request: Request,
+    response: Response,
+    since: Optional[str] = Query(None, description="Cursor returned by the previous sync"),
+    limit: int = Query(500, ge=1, le=1000),
+    current_user = Depends(get_current_user)
+):
+    """Get the current user's task changes and removals since a sync cursor"""
+    try:
+        position = decode_sync_cursor(since)
+
+        if position and position[0] < tombstone_horizon():
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail="Sync cursor has expired; fetch /tasks/my-tasks in full"
+            )
+
+        args = [current_user["id"]]
+        after = ""
+
+        # On the primary, which assigns the transaction ids
+        async with db_manager.transaction(isolation="repeatable_read") as connection:
+            # Changes by transactions at or above the snapshot's xmin wait for
+            # the next sync, so none can commit behind the returned cursor
+            args.append(await connection.fetchval(SYNC_HORIZON_SQL))
+            if position:
+                args.extend(position[1:])
+                after = "AND ({column}, {key}) > ($3, $4)"
+
+            # Range scan on idx_tasks_assigned_change_xid
+            rows = await connection.fetch(
+                f"""
+                SELECT {TASK_COLUMNS}, t.change_xid FROM tasks t
+                WHERE t.assigned_to = $1 {after.format(column="t.change_xid", key="t.id")}
+                  AND t.change_xid < $2
+                ORDER BY t.change_xid, t.id
+                LIMIT {limit + 1}
+                """,
+                *args
+            )
+
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+
+            deleted = []
+            if position:
+                # On a partial page, stop tombstones where the tasks stopped
+                before = ""
+                if has_more:
+                    args.extend([rows[-1]["change_xid"], rows[-1]["id"]])
+                    before = "AND (tb.change_xid, tb.task_id) <= ($5, $6)"
+
+                # Skip tombstones for tasks reassigned back to this user
+                deleted = await connection.fetch(
+                    f"""
+                    SELECT tb.task_id, tb.deleted_at, tb.change_xid FROM task_tombstones tb
+                    WHERE tb.assigned_to = $1 {after.format(column="tb.change_xid", key="tb.task_id")} {before}
+                      AND tb.change_xid < $2
+                      AND NOT EXISTS (
+                          SELECT 1 FROM tasks t WHERE t.id = tb.task_id AND t.assigned_to = $1
+                      )
+                    ORDER BY tb.change_xid, tb.task_id
+                    """,
+                    *args
+                )
+
+        # (transaction id, row id, time) of the last change returned
+        positions = [(position[1], position[2], position[0])] if position else []
+        if rows:
+            positions.append((rows[-1]["change_xid"], rows[-1]["id"], rows[-1]["updated_at"]))
+        if deleted:
+            positions.append((deleted[-1]["change_xid"], deleted[-1]["task_id"], deleted[-1]["deleted_at"]))
+
+        last = max(positions) if positions else None
+        cursor = encode_sync_cursor(last[2], last[0], last[1]) if last else None
+        last_modified = last[2] if last else None
+
+        # Same cursor in, same cursor out: nothing changed since the last sync
+        etag = make_etag(current_user["id"], since, cursor, limit)
+        if is_not_modified(request, etag, None):
+            return not_modified(etag, last_modified)
+
+        set_cache_headers(response, etag, last_modified)
+
+        return TaskSyncResponse(
+            tasks=[TaskResponse(**dict(row)) for row in rows],
+            deleted=[row["task_id"] for row in deleted],
+            cursor=cursor,
+            has_more=has_more
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to sync your tasks: {str(e)}"
+        )
+
+@router.get("/recommend-assignee", response_model=List[AssigneeRecommendation])
+async def recommend_assignee(
+    process_id: str = Query(...),
+    horizon_days: Optional[int] = Query(None, ge=0, le=365, description="Count estimated hours due this many days ahead"),
+    current_user = Depends(require_manager)
+):
+    """Active users of the process's role, least loaded first (Manager+ only)"""
+    try:
+        if horizon_days is None:
+            horizon_days = settings.ASSIGNEE_WORKLOAD_HORIZON_DAYS
+
+        recommendations = await recommend_assignees(process_id, horizon_days)
+
+        if recommendations is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Process not found"
+            )
+
+        return recommendations
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to recommend assignees: {str(e)}"
+        )
+
 @router.get("/{task_id}", response_model=TaskResponse)
 async def get_task(
+    response: Response,
     task_id: uuid.UUID,
     current_user = Depends(get_current_user)
 ):
     """Get task by ID"""
     try:
-        supabase = get_supabase()
-        
-        result = supabase.table("tasks").select("*").eq("id", str(task_id)).execute()
-        
-        if not result.data:
+        task = await task_cache.get(task_id)
+        visible = task_visible(current_user, task) if task else False
+
+        if visible is None:
+            args = [task_id]
+            predicate = task_visibility(current_user, args)
+            visible = await db_manager.execute_one(
+                f"SELECT 1 FROM tasks t WHERE t.id = $1 AND {predicate}", *args
+            ) is not None
+
+        # Tasks the user may not see are indistinguishable from missing ones
+        if not visible:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Task not found"
             )
         
-        task = result.data[0]
-        
-        # Check access permissions
-        if (current_user["role_id"] in ["technicians"] and 
-            task["assigned_to"] != current_user["id"]):
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not authorized to view this task"
-            )
+        response.headers["ETag"] = version_etag(task["version"])
         
         return TaskResponse(**task)
     
@@ -88,56 +282,64 @@ async def get_task(
 @router.post("/", response_model=TaskResponse)
 async def create_task(
     task_data: TaskCreate,
+    idempotency: Idempotency = Depends(idempotency),
     current_user = Depends(get_current_user)
 ):
     """Create new task"""
     try:
-        supabase = get_supabase()
-        
-        # Verify project exists and user has access
-        project_result = supabase.table("projects").select("*").eq("id", str(task_data.project_id)).execute()
-        
-        if not project_result.data:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Project not found"
-            )
-        
-        # Verify assigned user exists and has appropriate role for the process
-        user_result = supabase.table("users").select("role_id").eq("id", str(task_data.assigned_to)).execute()
-        
-        if not user_result.data:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Assigned user not found"
+        async with db_manager.transaction() as connection:
+            # A retry with the same Idempotency-Key gets the original response
+            replay = await idempotency.begin(connection, current_user["id"], task_data)
+            if replay:
+                return replay
+
+            # Verify project exists and user has access
+            project = await project_cache.get(task_data.project_id, connection)
+            
+            if not project:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Project not found"
+                )
+            
+            # Verify assigned user exists and has appropriate role for the process
+            assignee = await connection.fetchval("SELECT id FROM users WHERE id = $1", task_data.assigned_to)
+            
+            if not assignee:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Assigned user not found"
+                )
+            
+            task = await connection.fetchrow(
+                f"""
+                INSERT INTO tasks AS t (
+                    project_id, process_id, assigned_to, created_by, title, description,
+                    priority, due_date, estimated_hours
+                )
+                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
+                RETURNING {TASK_COLUMNS}
+                """,
+                task_data.project_id, task_data.process_id, task_data.assigned_to, current_user["id"],
+                task_data.title, task_data.description, task_data.priority.value,
+                task_data.due_date, task_data.estimated_hours
             )
-        
-        task_dict = task_data.dict()
-        task_dict["created_by"] = current_user["id"]
-        task_dict["project_id"] = str(task_dict["project_id"])
-        task_dict["assigned_to"] = str(task_dict["assigned_to"])
-        
-        result = supabase.table("tasks").insert(task_dict).execute()
-        
-        if not result.data:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to create task"
+            
+            # Create notification for assigned user
+            await connection.execute(
+                """
+                INSERT INTO notifications (user_id, title, message, type, related_table, related_id)
+                VALUES ($1, 'New Task Assigned', $2, 'task', 'tasks', $3)
+                """,
+                task_data.assigned_to,
+                f"You have been assigned a new task: {task_data.title}",
+                task["id"]
             )
+            
+            response = TaskResponse(**dict(task))
+            await idempotency.complete(connection, response)
         
-        # Create notification for assigned user
-        notification_data = {
-            "user_id": str(task_data.assigned_to),
-            "title": "New Task Assigned",
-            "message": f"You have been assigned a new task: {task_data.title}",
-            "type": "task",
-            "related_table": "tasks",
-            "related_id": result.data[0]["id"]
-        }
-        
-        supabase.table("notifications").insert(notification_data).execute()
-        
-        return TaskResponse(**result.data[0])
+        return response
     
     except HTTPException:
         raise
@@ -147,42 +349,45 @@ async def create_task(
             detail=f"Failed to create task: {str(e)}"
         )
 
+# Roles that may edit any task; others only tasks assigned to or created by them
+TASK_EDITOR_ROLES = ["businessOwner", "projectManager"]
+
+# One statement: the conditional update, and a notification to the creator
+# when the task actually moves into completed. The status counters and
+# completed_at are maintained by triggers on tasks.
+UPDATE_TASK_SQL = """
+    WITH previous AS (
+        SELECT id, status FROM tasks WHERE id = $1 FOR UPDATE
+    ), updated AS (
+        UPDATE tasks AS t SET {assignments}
+        FROM previous
+        WHERE t.id = previous.id AND {conditions}
+        RETURNING {columns}, previous.status AS previous_status
+    ), notified AS (
+        INSERT INTO notifications (user_id, title, message, type, related_table, related_id)
+        SELECT created_by, 'Task Completed', 'Task ''' || title || ''' has been completed',
+               'task', 'tasks', id
+        FROM updated
+        WHERE status = 'completed' AND previous_status <> 'completed' AND created_by IS NOT NULL
+    )
+    SELECT * FROM updated
+"""
+
 @router.put("/{task_id}", response_model=TaskResponse)
 async def update_task(
+    request: Request,
+    response: Response,
     task_id: uuid.UUID,
     task_data: TaskUpdate,
     current_user = Depends(get_current_user)
 ):
-    """Update task"""
+    """Update task; send If-Match or version to reject concurrent edits with 412"""
     try:
-        supabase = get_supabase()
-        
-        # Check if task exists and user has permission to update
-        task_result = supabase.table("tasks").select("*").eq("id", str(task_id)).execute()
-        
-        if not task_result.data:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Task not found"
-            )
-        
-        task = task_result.data[0]
-        
-        # Permission check
-        can_update = (
-            current_user["role_id"] in ["businessOwner", "projectManager"] or
-            task["assigned_to"] == current_user["id"] or
-            task["created_by"] == current_user["id"]
-        )
-        
-        if not can_update:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not authorized to update this task"
-            )
-        
         # Convert to dict and remove None values
-        update_data = {k: v for k, v in task_data.dict().items() if v is not None}
+        update_data = {
+            k: (v.value if isinstance(v, Enum) else v)
+            for k, v in task_data.dict(exclude={"version"}).items() if v is not None
+        }
         
         if not update_data:
             raise HTTPException(
@@ -190,33 +395,72 @@ async def update_task(
                 detail="No data provided for update"
             )
         
-        # Set completion timestamp if status changed to completed
-        if update_data.get("status") == "completed" and task["status"] != "completed":
-            from datetime import datetime
-            update_data["completed_at"] = datetime.utcnow().isoformat()
-        
-        result = supabase.table("tasks").update(update_data).eq("id", str(task_id)).execute()
+        args = [task_id]
+        assignments = [f"{column} = {add_arg(args, value)}" for column, value in update_data.items()]
+        
+        # Version preconditions, the permission check and the status transition
+        # rules all share the UPDATE's WHERE clause
+        conditions = []
+        if_match = if_match_versions(request)
+        if if_match is not None:
+            conditions.append(f"t.version = ANY({add_arg(args, if_match)}::int[])")
+        if task_data.version is not None:
+            conditions.append(f"t.version = {add_arg(args, task_data.version)}")
+        if current_user["role_id"] not in TASK_EDITOR_ROLES:
+            user_param = add_arg(args, current_user["id"])
+            conditions.append(f"(t.assigned_to = {user_param} OR t.created_by = {user_param})")
+        if task_data.status:
+            conditions.append(f"t.status = ANY({add_arg(args, allowed_sources(task_data.status))}::text[])")
+        
+        task = await db_manager.execute_one(
+            UPDATE_TASK_SQL.format(
+                assignments=", ".join(assignments),
+                conditions=" AND ".join(conditions) or "TRUE",
+                columns=TASK_COLUMNS
+            ),
+            *args
+        )
         
-        if not result.data:
+        if not task:
+            # Only a failed update pays for a second query to explain why
+            current = await db_manager.execute_one(
+                "SELECT assigned_to, created_by, status, version FROM tasks WHERE id = $1", task_id
+            )
+            
+            if not current:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Task not found"
+                )
+            
+            if (current_user["role_id"] not in TASK_EDITOR_ROLES and
+                str(current["assigned_to"]) != current_user["id"] and
+                str(current["created_by"]) != current_user["id"]):
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Not authorized to update this task"
+                )
+            
+            # A stale client is told to reload before being told the move is invalid
+            stale = (
+                (if_match is not None and current["version"] not in if_match) or
+                (task_data.version is not None and current["version"] != task_data.version)
+            )
+            
+            if not stale and task_data.status:
+                raise transition_conflict(TaskStatus(current["status"]), task_data.status)
+            
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to update task"
+                status_code=status.HTTP_412_PRECONDITION_FAILED,
+                detail="Task was modified by someone else; reload and retry",
+                headers={"ETag": version_etag(current["version"])}
             )
         
-        # Create notification if status changed to completed
-        if update_data.get("status") == "completed":
-            notification_data = {
-                "user_id": task["created_by"],
-                "title": "Task Completed",
-                "message": f"Task '{task['title']}' has been completed",
-                "type": "task",
-                "related_table": "tasks",
-                "related_id": str(task_id)
-            }
-            
-            supabase.table("notifications").insert(notification_data).execute()
+        # Other workers drop their copy when the change notification arrives
+        task_cache.invalidate(task_id)
+        response.headers["ETag"] = version_etag(task["version"])
         
-        return TaskResponse(**result.data[0])
+        return TaskResponse(**dict(task))
     
     except HTTPException:
         raise
@@ -266,6 +510,8 @@ async def delete_task(
                 detail="Failed to delete task"
             )
         
+        task_cache.invalidate(task_id)
+        
         return {"message": "Task deleted successfully"}
     
     except HTTPException:
@@ -275,27 +521,3 @@ async def delete_task(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to delete task: {str(e)}"
         )
-
-@router.get("/my-tasks", response_model=List[TaskResponse])
-async def get_my_tasks(
-    status_filter: Optional[TaskStatus] = Query(None, alias="status"),
-    current_user = Depends(get_current_user)
-):
-    """Get current user's assigned tasks"""
-    try:
-        supabase = get_supabase()
-        
-        query = supabase.table("tasks").select("*").eq("assigned_to", current_user["id"])
-        
-        if status_filter:
-            query = query.eq("status", status_filter.value)
-        
-        result = query.order("due_date", nulls_last=True).order("priority", desc=True).execute()
-        
-        return [TaskResponse(**task) for task in result.data]
-    
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to fetch your tasks: {str(e)}"
-        )
\ No newline at end of file
@@ -31,6 +31,8 @@ async def get_users(
         
         return [UserResponse(**user) for user in result.data]
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -164,6 +166,8 @@ async def get_users_count_by_role(
         
         return {"role_id": role_id, "count": result.count}
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
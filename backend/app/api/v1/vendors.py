@@ -0,0 +1,262 @@
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from typing import List, Optional
+from app.models.schemas import (
+    VendorResponse, VendorCreate, VendorUpdate, VendorSearchResult, VendorBulkUpsert, VendorBulkResult
+)
+from app.core.database import get_supabase, db_manager
+from app.core.idempotency import Idempotency, idempotency
+from app.middleware.auth import get_current_user, require_role
+import asyncpg
+import uuid
+
+router = APIRouter()
+
+VENDOR_EDITOR_ROLES = ["businessOwner", "purchaseTeam", "vendorManagement"]
+
+# Trigram similarity is unreliable below three characters; shorter queries
+# only use the prefix index.
+MIN_FUZZY_QUERY_LENGTH = 3
+
+# SQLSTATE of unique_violation, which PostgREST reports as the error code.
+# The only unique key besides the id is the name (idx_vendors_name_unique).
+UNIQUE_VIOLATION = "23505"
+
+def duplicate_name_error() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="A vendor with this name already exists"
+    )
+
+VENDOR_COLUMNS = ["name", "contact_person", "email", "phone", "address", "category", "rating", "is_active"]
+
+UPSERT_VENDORS_SQL = """
+    INSERT INTO vendors (name, contact_person, email, phone, address, category, rating, is_active)
+    SELECT * FROM unnest(
+        $1::text[], $2::text[], $3::text[], $4::text[], $5::text[], $6::text[], $7::numeric[], $8::boolean[]
+    )
+    ON CONFLICT ((lower(name))) DO UPDATE SET
+        name = EXCLUDED.name,
+        contact_person = EXCLUDED.contact_person,
+        email = EXCLUDED.email,
+        phone = EXCLUDED.phone,
+        address = EXCLUDED.address,
+        category = EXCLUDED.category,
+        rating = EXCLUDED.rating,
+        is_active = EXCLUDED.is_active
+    RETURNING (xmax = 0) AS inserted
+"""
+
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+@router.get("/", response_model=List[VendorResponse])
+async def get_vendors(
+    category: Optional[str] = Query(None),
+    is_active: Optional[bool] = Query(True),
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    current_user = Depends(get_current_user)
+):
+    """Get vendors with optional filters"""
+    try:
+        supabase = get_supabase()
+
+        query = supabase.table("vendors").select("*")
+
+        if category:
+            query = query.eq("category", category)
+        if is_active is not None:
+            query = query.eq("is_active", is_active)
+
+        result = query.order("name").range(offset, offset + limit - 1).execute()
+
+        return [VendorResponse(**vendor) for vendor in result.data]
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch vendors: {str(e)}"
+        )
+
+@router.get("/search", response_model=List[VendorSearchResult])
+async def search_vendors(
+    q: str = Query(..., min_length=1, max_length=100),
+    category: Optional[str] = Query(None, description="Rank vendors in this category first"),
+    limit: int = Query(10, ge=1, le=50),
+    current_user = Depends(get_current_user)
+):
+    """Type-ahead vendor lookup: prefix matches first, then fuzzy matches, by rating"""
+    try:
+        term = q.strip().lower()
+        args = [term, escape_like(term) + "%", category, limit]
+
+        # Prefix matches score 1; fuzzy matches score by trigram similarity
+        match_clause = "lower(name) LIKE $2"
+        if len(term) >= MIN_FUZZY_QUERY_LENGTH:
+            match_clause = f"({match_clause} OR lower(name) % $1)"
+
+        rows = await db_manager.execute_query(
+            f"""
+            SELECT id, name, category, rating,
+                   CASE WHEN lower(name) LIKE $2 THEN 1.0
+                        ELSE similarity(lower(name), $1) END AS score
+            FROM vendors
+            WHERE is_active AND {match_clause}
+            ORDER BY (category = $3::text) IS TRUE DESC, score DESC, rating DESC, name
+            LIMIT $4
+            """,
+            *args,
+            readonly=True
+        )
+
+        return [VendorSearchResult(**dict(row)) for row in rows]
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to search vendors: {str(e)}"
+        )
+
+@router.post("/bulk", response_model=VendorBulkResult)
+async def bulk_upsert_vendors(
+    vendor_data: VendorBulkUpsert,
+    idempotency: Idempotency = Depends(idempotency),
+    current_user = Depends(require_role(VENDOR_EDITOR_ROLES))
+):
+    """Import a vendor catalog, updating vendors that already exist by name"""
+    try:
+        # Later rows win when a catalog lists the same vendor twice
+        vendors = {}
+        for vendor in vendor_data.vendors:
+            vendors[vendor.name.lower()] = vendor
+
+        arrays = [[getattr(vendor, column) for vendor in vendors.values()] for column in VENDOR_COLUMNS]
+
+        async with db_manager.transaction() as connection:
+            replay = await idempotency.begin(connection, current_user["id"], vendor_data)
+            if replay:
+                return replay
+
+            rows = await connection.fetch(UPSERT_VENDORS_SQL, *arrays)
+
+            inserted = sum(1 for row in rows if row["inserted"])
+
+            response = VendorBulkResult(inserted=inserted, updated=len(rows) - inserted)
+            await idempotency.complete(connection, response)
+
+        return response
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to import vendors: {str(e)}"
+        )
+
+@router.get("/{vendor_id}", response_model=VendorResponse)
+async def get_vendor(
+    vendor_id: uuid.UUID,
+    current_user = Depends(get_current_user)
+):
+    """Get vendor by ID"""
+    try:
+        supabase = get_supabase()
+
+        result = supabase.table("vendors").select("*").eq("id", str(vendor_id)).execute()
+
+        if not result.data:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Vendor not found"
+            )
+
+        return VendorResponse(**result.data[0])
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch vendor: {str(e)}"
+        )
+
+@router.post("/", response_model=VendorResponse)
+async def create_vendor(
+    vendor_data: VendorCreate,
+    idempotency: Idempotency = Depends(idempotency),
+    current_user = Depends(require_role(VENDOR_EDITOR_ROLES))
+):
+    """Create new vendor"""
+    try:
+        async with db_manager.transaction() as connection:
+            replay = await idempotency.begin(connection, current_user["id"], vendor_data)
+            if replay:
+                return replay
+
+            vendor = await connection.fetchrow(
+                f"""
+                INSERT INTO vendors ({", ".join(VENDOR_COLUMNS)})
+                VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+                RETURNING *
+                """,
+                *[getattr(vendor_data, column) for column in VENDOR_COLUMNS]
+            )
+
+            response = VendorResponse(**dict(vendor))
+            await idempotency.complete(connection, response)
+
+        return response
+
+    except HTTPException:
+        raise
+    except asyncpg.UniqueViolationError:
+        raise duplicate_name_error()
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to create vendor: {str(e)}"
+        )
+
+@router.put("/{vendor_id}", response_model=VendorResponse)
+async def update_vendor(
+    vendor_id: uuid.UUID,
+    vendor_data: VendorUpdate,
+    current_user = Depends(require_role(VENDOR_EDITOR_ROLES))
+):
+    """Update vendor"""
+    try:
+        supabase = get_supabase()
+
+        # Convert to dict and remove None values
+        update_data = {k: v for k, v in vendor_data.dict().items() if v is not None}
+
+        if not update_data:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="No data provided for update"
+            )
+
+        result = supabase.table("vendors").update(update_data).eq("id", str(vendor_id)).execute()
+
+        if not result.data:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Vendor not found"
+            )
+
+        return VendorResponse(**result.data[0])
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        if getattr(e, "code", None) == UNIQUE_VIOLATION:
+            raise duplicate_name_error()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to update vendor: {str(e)}"
+        )
@@ -0,0 +1,113 @@
+"""Row visibility rules for projects and tasks, compiled to SQL predicates.
+
+Each function appends the values it needs to ``args`` and returns a boolean
+SQL expression over the given table alias, so callers can AND it into list
+and detail queries and never fetch rows the user cannot see. For rows that
+are already in hand (the entity caches), ``task_visible`` and
+``project_visible`` apply the same rules where the row alone decides them.
+"""
+from typing import Optional
+
+# Roles that see every project and task
+UNRESTRICTED_ROLES = ["businessOwner"]
+
+# Supervisors see tasks in their domain: processes owned by their role and by
+# the roles they direct through "command" process connections
+SUPERVISOR_ROLES = ["factorySupervisor", "siteEngineer"]
+
+# Roles that only see the tasks assigned to them
+ASSIGNEE_ONLY_ROLES = ["technicians"]
+
+def add_arg(args: list, value) -> str:
+    args.append(value)
+    return f"${len(args)}"
+
+def supervised_process_ids(role_param: str) -> str:
+    return f"""
+        SELECT pr.id FROM processes pr
+        WHERE pr.role_id = {role_param}
+           OR pr.role_id IN (
+               SELECT pc.to_role FROM process_connections pc
+               WHERE pc.from_role = {role_param} AND pc.connection_type = 'command'
+           )
+    """
+
+def task_predicate(role: str, user_param: str, args: list, alias: str) -> str:
+    if role in ASSIGNEE_ONLY_ROLES:
+        return f"{alias}.assigned_to = {user_param}"
+
+    involved = f"{alias}.assigned_to = {user_param} OR {alias}.created_by = {user_param}"
+
+    if role == "projectManager":
+        return (
+            f"({involved} OR {alias}.project_id IN "
+            f"(SELECT id FROM projects WHERE project_manager_id = {user_param}))"
+        )
+
+    if role in SUPERVISOR_ROLES:
+        role_param = add_arg(args, role)
+        return f"({involved} OR {alias}.process_id IN ({supervised_process_ids(role_param)}))"
+
+    return f"({involved})"
+
+def task_visibility(current_user, args: list, alias: str = "t") -> str:
+    """Return a predicate limiting tasks to those the user may see"""
+    if current_user["role_id"] in UNRESTRICTED_ROLES:
+        return "TRUE"
+
+    user_param = add_arg(args, current_user["id"])
+    return task_predicate(current_user["role_id"], user_param, args, alias)
+
+def project_visibility(current_user, args: list, alias: str = "p") -> str:
+    """Return a predicate limiting projects to those the user may see"""
+    role = current_user["role_id"]
+
+    if role in UNRESTRICTED_ROLES:
+        return "TRUE"
+
+    user_param = add_arg(args, current_user["id"])
+
+    if role == "projectManager":
+        return f"{alias}.project_manager_id = {user_param}"
+
+    # Everyone else sees the projects they have visible tasks in
+    tasks_clause = task_predicate(role, user_param, args, alias="vt")
+
+    return (
+        f"({alias}.project_manager_id = {user_param} OR EXISTS ("
+        f"SELECT 1 FROM tasks vt WHERE vt.project_id = {alias}.id AND {tasks_clause}))"
+    )
+
+def task_visible(current_user, task) -> Optional[bool]:
+    """task_visibility for a loaded row; None when it depends on other rows"""
+    role = current_user["role_id"]
+
+    if role in UNRESTRICTED_ROLES:
+        return True
+
+    assigned = str(task["assigned_to"]) == current_user["id"]
+
+    if role in ASSIGNEE_ONLY_ROLES:
+        return assigned
+
+    if assigned or str(task["created_by"]) == current_user["id"]:
+        return True
+
+    # The project's manager or the process ownership decides
+    if role == "projectManager" or role in SUPERVISOR_ROLES:
+        return None
+
+    return False
+
+def project_visible(current_user, project) -> Optional[bool]:
+    """project_visibility for a loaded row; None when it depends on other rows"""
+    role = current_user["role_id"]
+
+    if role in UNRESTRICTED_ROLES or str(project["project_manager_id"]) == current_user["id"]:
+        return True
+
+    if role == "projectManager":
+        return False
+
+    # Everyone else depends on their visible tasks in the project
+    return None
@@ -0,0 +1,96 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+import time
+
+class TTLCache:
+    """Small in-process cache with per-entry expiry and a size bound"""
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024, clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: Dict[Any, Tuple[float, Any]] = {}
+
+    def get(self, key) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= self.clock():
+            self._entries.pop(key, None)
+            return None
+
+        return value
+
+    def set(self, key, value, ttl_seconds: Optional[float] = None):
+        if key not in self._entries and len(self._entries) >= self.max_entries:
+            self._evict()
+
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._entries[key] = (self.clock() + ttl, value)
+
+    def invalidate(self, key):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def _evict(self):
+        """Drop expired entries, or the oldest one when nothing has expired"""
+        now = self.clock()
+        expired = [key for key, (expires_at, _) in self._entries.items() if expires_at <= now]
+
+        for key in expired:
+            del self._entries[key]
+
+        if not expired and self._entries:
+            del self._entries[next(iter(self._entries))]
+
+class LRUCache:
+    """In-process cache bounded by entry count that evicts the least recently used entry"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Any, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key) -> Optional[Any]:
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+        }
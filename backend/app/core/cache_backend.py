@@ -0,0 +1,119 @@
+"""Shared cache and rate-limit state, kept in process or in Redis.
+
+``CACHE_BACKEND=local`` keeps everything in the worker's memory, which is
+enough for a single process. ``CACHE_BACKEND=redis`` shares cached results
+and rate-limit buckets between all workers and hosts through ``REDIS_URL``.
+"""
+from typing import Any, Callable, Dict, Optional, Tuple
+import json
+import time
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+class LocalCacheBackend:
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.values = TTLCache(ttl_seconds=60, max_entries=4096, clock=clock)
+        self.buckets: Dict[str, Tuple[float, float]] = {}
+
+    async def get(self, key: str) -> Optional[Any]:
+        return self.values.get(key)
+
+    async def set(self, key: str, value: Any, ttl_seconds: float):
+        self.values.set(key, value, ttl_seconds)
+
+    async def add(self, key: str, value: Any, ttl_seconds: float) -> bool:
+        """Set key only if it is absent; returns whether it was set"""
+        if self.values.get(key) is not None:
+            return False
+        self.values.set(key, value, ttl_seconds)
+        return True
+
+    async def delete(self, key: str):
+        self.values.invalidate(key)
+
+    async def take_token(self, key: str, rate_per_second: float, capacity: int) -> Tuple[bool, float]:
+        """Token bucket: returns (allowed, seconds until the next token)"""
+        now = self.clock()
+        tokens, updated_at = self.buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated_at) * rate_per_second)
+
+        if tokens >= 1:
+            self.buckets[key] = (tokens - 1, now)
+            return True, 0.0
+
+        self.buckets[key] = (tokens, now)
+        return False, (1 - tokens) / rate_per_second
+
+# Refill and take atomically; Redis TIME keeps every worker on one clock
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(bucket[1]) or capacity
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + (now - updated_at) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+class RedisCacheBackend:
+    def __init__(self, url: str, prefix: str = "erp:"):
+        # Imported here so the local backend works without the redis package
+        import redis.asyncio as redis
+
+        self.client = redis.from_url(url)
+        self.prefix = prefix
+        self.token_bucket = self.client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = await self.client.get(self.prefix + key)
+        return json.loads(value) if value is not None else None
+
+    async def set(self, key: str, value: Any, ttl_seconds: float):
+        await self.client.set(self.prefix + key, json.dumps(value), px=max(1, int(ttl_seconds * 1000)))
+
+    async def add(self, key: str, value: Any, ttl_seconds: float) -> bool:
+        """Set key only if it is absent; returns whether it was set"""
+        result = await self.client.set(self.prefix + key, json.dumps(value), px=max(1, int(ttl_seconds * 1000)), nx=True)
+        return bool(result)
+
+    async def delete(self, key: str):
+        await self.client.delete(self.prefix + key)
+
+    async def take_token(self, key: str, rate_per_second: float, capacity: int) -> Tuple[bool, float]:
+        allowed, tokens = await self.token_bucket(keys=[self.prefix + key], args=[capacity, rate_per_second])
+        if allowed:
+            return True, 0.0
+        return False, (1 - float(tokens)) / rate_per_second
+
+    async def close(self):
+        await self.client.aclose()
+
+_backend = None
+
+def get_cache_backend():
+    """Return the process-wide backend selected by settings.CACHE_BACKEND"""
+    global _backend
+    if _backend is None:
+        if settings.CACHE_BACKEND == "redis":
+            _backend = RedisCacheBackend(settings.REDIS_URL)
+        elif settings.CACHE_BACKEND == "local":
+            _backend = LocalCacheBackend()
+        else:
+            raise ValueError(f"Unknown CACHE_BACKEND: {settings.CACHE_BACKEND}")
+    return _backend
+
+async def close_cache_backend():
+    global _backend
+    if isinstance(_backend, RedisCacheBackend):
+        await _backend.close()
+    _backend = None
@@ -0,0 +1,128 @@
+"""Circuit breakers around the database, Supabase auth and PostgREST.
+
+After CIRCUIT_BREAKER_FAILURE_THRESHOLD consecutive failures (connection
+errors, timeouts, 5xx responses) a breaker opens: calls through it fail at
+once with 503 and Retry-After instead of queueing behind a dependency that is
+down, so workers stay free for requests that do not need it. After
+CIRCUIT_BREAKER_RECOVERY_SECONDS one probe call is let through (half-open);
+its success closes the breaker and its failure opens it again. Errors that
+prove the dependency answered, such as constraint violations or 4xx
+responses, count as successes.
+"""
+from contextlib import contextmanager
+from fastapi import HTTPException, status
+from typing import Any, Callable, Dict, Optional
+from app.core.config import settings
+from app.core.deadline import DeadlineExceeded
+import math
+import threading
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitOpenError(HTTPException):
+    def __init__(self, label: str, retry_after: float):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"{label} is unavailable; try again shortly",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+        )
+
+# Every breaker, by name, for GET /health
+breakers: Dict[str, "CircuitBreaker"] = {}
+
+class CircuitBreaker:
+    """Thread-safe: the Supabase breakers are used from threadpool calls"""
+
+    def __init__(self, name: str, label: str, is_failure: Callable[[BaseException], bool]):
+        self.name = name
+        self.label = label
+        self.is_failure = is_failure
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.trips = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+        breakers[name] = self
+
+    def retry_after(self) -> float:
+        return self.opened_at + settings.CIRCUIT_BREAKER_RECOVERY_SECONDS - time.monotonic()
+
+    def before_call(self) -> bool:
+        """Admit a call or raise CircuitOpenError; returns whether it is the half-open probe"""
+        with self._lock:
+            if self.state == CLOSED:
+                return False
+            if self.state == OPEN and self.retry_after() <= 0:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and not self.probing:
+                self.probing = True
+                return True
+            self.rejected += 1
+            retry_after = self.retry_after()
+        raise CircuitOpenError(self.label, retry_after)
+
+    def record(self, failed: bool, probe: bool):
+        with self._lock:
+            if probe:
+                self.probing = False
+            if not failed:
+                # A call admitted before the breaker opened proves nothing now
+                if probe or self.state == CLOSED:
+                    self.state = CLOSED
+                    self.failures = 0
+                return
+            self.failures += 1
+            if probe or (self.state == CLOSED and self.failures >= settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD):
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                self.trips += 1
+
+    def release(self, probe: bool):
+        """Free the probe slot of a call that ended without a verdict (cancelled)"""
+        if probe:
+            with self._lock:
+                self.probing = False
+
+    @contextmanager
+    def protect(self):
+        probe = self.before_call()
+        try:
+            yield
+        except Exception as e:
+            self.record(self.is_failure(e), probe)
+            raise
+        except BaseException:
+            self.release(probe)
+            raise
+        else:
+            self.record(False, probe)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "trips": self.trips,
+                "rejected": self.rejected,
+                "retry_after": round(max(0.0, self.retry_after()), 1) if self.state != CLOSED else None,
+            }
+
+def breaker_states() -> Dict[str, Dict[str, Any]]:
+    return {name: breaker.snapshot() for name, breaker in sorted(breakers.items())}
+
+def unavailable_cause(error: BaseException) -> Optional[HTTPException]:
+    """The 503/504 behind an error a client library wrapped (gotrue wraps
+    every transport exception in its own AuthError)"""
+    seen = 0
+    current: Optional[BaseException] = error
+    while current is not None and seen < 5:
+        if isinstance(current, (CircuitOpenError, DeadlineExceeded)):
+            return current
+        current = current.__cause__ or current.__context__
+        seen += 1
+    return None
@@ -1,31 +1,105 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from functools import lru_cache
+from typing import List, cast
 
 class Settings(BaseSettings):
     # Application
     APP_NAME: str = "Corporate Interiors ERP"
     APP_VERSION: str = "1.0.0"
-    DEBUG: bool = True
+    DEBUG: bool = False
+    
+    # Production server (python -m app.server)
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    WEB_CONCURRENCY: int = 0  # worker processes; 0 means one per CPU core
+    SERVER_LOOP: str = "auto"  # auto, uvloop or asyncio
+    SERVER_HTTP: str = "auto"  # auto, httptools or h11
+    SERVER_KEEPALIVE_SECONDS: int = 5
+    SERVER_GRACEFUL_TIMEOUT_SECONDS: int = 30
+    SERVER_MAX_REQUESTS: int = 0  # recycle a worker after this many requests; 0 disables
     
     # Supabase
     SUPABASE_URL: str
     SUPABASE_ANON_KEY: str
     SUPABASE_SERVICE_ROLE_KEY: str
     
+    # Supabase HTTP client (one pooled transport per worker, shared by auth and PostgREST)
+    SUPABASE_HTTP2: bool = True
+    SUPABASE_MAX_CONNECTIONS: int = 20
+    SUPABASE_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    SUPABASE_KEEPALIVE_EXPIRY_SECONDS: float = 30
+    SUPABASE_CONNECT_TIMEOUT_SECONDS: float = 5
+    SUPABASE_READ_TIMEOUT_SECONDS: float = 10
+    SUPABASE_WRITE_TIMEOUT_SECONDS: float = 10
+    SUPABASE_POOL_TIMEOUT_SECONDS: float = 5  # wait for a free connection when all are busy
+    SUPABASE_CONNECT_RETRIES: int = 1
+    
     # JWT
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str = "HS256"
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
-    # Database
+    # Database (the pool is per worker process)
     DATABASE_URL: str
+    DATABASE_POOL_MIN_SIZE: int = 1
+    DATABASE_POOL_MAX_SIZE: int = 10
+    DATABASE_CONNECT_TIMEOUT_SECONDS: float = 10
+    DATABASE_COMMAND_TIMEOUT_SECONDS: float = 60  # ceiling for statements outside a request budget
+    
+    # Read replica for read-only analytics and list queries; empty sends everything to DATABASE_URL
+    DATABASE_REPLICA_URL: str = ""
+    DATABASE_REPLICA_MAX_LAG_SECONDS: float = 5  # fall back to the primary beyond this lag
+    DATABASE_REPLICA_LAG_CHECK_SECONDS: float = 2
+    # Reads stay on the primary this long after a user's write; keep it above
+    # the maximum lag plus the check interval
+    READ_YOUR_WRITES_SECONDS: float = 10
+    
+    # Request budgets and circuit breakers (database, Supabase auth, PostgREST)
+    REQUEST_DEADLINE_SECONDS: float = 15
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = 5  # consecutive failures that open a breaker
+    CIRCUIT_BREAKER_RECOVERY_SECONDS: float = 10  # open time before a probe call is let through
     
     # Redis
     REDIS_URL: str = "redis://localhost:6379"
     
+    # Shared cache and rate limits: "local" (per process) or "redis"
+    CACHE_BACKEND: str = "local"
+    REPORT_CACHE_TTL_SECONDS: int = 60
+    REPORT_RATE_LIMIT_PER_MINUTE: int = 6
+    REPORT_RATE_LIMIT_BURST: int = 3
+    FORECAST_THROUGHPUT_WINDOW_DAYS: int = 28  # completed work in this window sets the delivery rate
+    FORECAST_RATIO_PRIOR_HOURS: float = 40  # assignee actual/estimated ratios start from 1 with this much weight
+    
+    # Per-worker caches of project and task rows, invalidated by NOTIFY from triggers
+    ENTITY_CACHE_ENABLED: bool = True
+    ENTITY_CACHE_MAX_ENTRIES: int = 10000  # per table, least recently used evicted first
+    ENTITY_CACHE_LISTENER_CHECK_SECONDS: float = 30  # how often the LISTEN connection is checked
+    ENTITY_CACHE_RECONNECT_SECONDS: float = 1
+    ASSIGNEE_WORKLOAD_HORIZON_DAYS: int = 7  # estimated hours due this soon count towards workload
+    
     # CORS
     CORS_ORIGINS: List[str] = ["http://localhost:3000", "http://127.0.0.1:3000"]
     
+    # Response compression
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    REFERENCE_DATA_CACHE_TTL_SECONDS: int = 300
+    
+    # Background jobs
+    SCHEDULER_ENABLED: bool = True
+    INVOICE_OVERDUE_SWEEP_INTERVAL_SECONDS: int = 3600
+    REPORT_PRECOMPUTE_INTERVAL_SECONDS: int = 900
+    FORECAST_FULL_REFRESH_INTERVAL_SECONDS: int = 86400  # moves forecast dates and the throughput window along
+    TASK_TOMBSTONE_RETENTION_DAYS: int = 30
+    TASK_TOMBSTONE_PRUNE_INTERVAL_SECONDS: int = 86400
+    TASK_DUE_REMINDER_INTERVAL_SECONDS: int = 900
+    TASK_DUE_SOON_HOURS: int = 24
+    RECURRING_TASK_INTERVAL_SECONDS: int = 3600
+    RECURRING_TASK_CATCH_UP_DAYS: int = 31  # missed periods older than this are not generated
+    IDEMPOTENCY_KEY_TTL_SECONDS: int = 86400
+    IDEMPOTENCY_KEY_PURGE_INTERVAL_SECONDS: int = 3600
+    
     # Email (optional)
     SMTP_SERVER: str = ""
     SMTP_PORT: int = 587
@@ -36,4 +110,15 @@ class Settings(BaseSettings):
         env_file = ".env"
         case_sensitive = True
 
-settings = Settings()
\ No newline at end of file
+@lru_cache
+def get_settings() -> Settings:
+    return Settings()
+
+class LazySettings:
+    """Reads the environment on first attribute access instead of at import,
+    so importing a module for a CLI tool or test does not require a full .env"""
+
+    def __getattr__(self, name: str):
+        return getattr(get_settings(), name)
+
+settings = cast(Settings, LazySettings())
@@ -1,57 +1,216 @@
-from supabase import create_client, Client
 from app.core.config import settings
+from app.core.circuit_breaker import CLOSED, CircuitBreaker
+from app.core.deadline import DeadlineExceeded, expired, remaining, timeout_for
+from app.core.read_routing import reads_need_primary
+from app.core.single_flight import SingleFlight
+import asyncio
 import asyncpg
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Dict, Optional
+from contextlib import asynccontextmanager
 import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+if TYPE_CHECKING:
+    from supabase import Client
+    from app.core.supabase_transport import PooledClient
 
 class SupabaseClient:
+    """Builds the Supabase client on first use; the lifespan warms it per worker"""
+
     def __init__(self):
-        self.supabase: Client = create_client(
-            settings.SUPABASE_URL,
-            settings.SUPABASE_SERVICE_ROLE_KEY
-        )
+        self.supabase: Optional["PooledClient"] = None
     
-    def get_client(self) -> Client:
+    def get_client(self) -> "Client":
+        if self.supabase is None:
+            # Imported here: the supabase package is the slowest import in the app
+            from app.core.supabase_transport import create_pooled_client
+            self.supabase = create_pooled_client(
+                settings.SUPABASE_URL,
+                settings.SUPABASE_SERVICE_ROLE_KEY
+            )
         return self.supabase
+    
+    def pool_stats(self) -> Optional[dict]:
+        """Connection pool statistics of the shared HTTP transport, once built"""
+        if self.supabase is None:
+            return None
+        return self.supabase.transport.stats()
+    
+    def reset(self):
+        if self.supabase is not None:
+            self.supabase.transport.shutdown()
+        self.supabase = None
 
 # Global Supabase instance
 supabase_client = SupabaseClient()
 
-def get_supabase() -> Client:
+def get_supabase() -> "Client":
     return supabase_client.get_client()
 
+# Errors that mean the database is unreachable, overloaded or too slow, as
+# opposed to errors in the statement itself
+DATABASE_FAILURES = (
+    OSError,
+    asyncio.TimeoutError,
+    asyncpg.PostgresConnectionError,
+    asyncpg.OperatorInterventionError,  # statement_timeout cancellations, shutdowns
+    asyncpg.InsufficientResourcesError,  # too many connections
+)
+
+# Time a connection gets to reset after its request's budget is spent
+RELEASE_GRACE_SECONDS = 0.05
+
+def is_database_failure(error: BaseException) -> bool:
+    return isinstance(error, DATABASE_FAILURES)
+
+database_breaker = CircuitBreaker("database", "The database", is_database_failure)
+replica_breaker = CircuitBreaker("database_replica", "The read replica", is_database_failure)
+
+# Seconds the replica's replay is behind the primary; 0 when it has replayed
+# everything it received (an idle primary sends nothing), or when the
+# configured replica is not in recovery at all
+REPLICA_LAG_SQL = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+END
+"""
+
 class DatabaseManager:
     def __init__(self):
         self.pool: Optional[asyncpg.Pool] = None
+        self.replica_pool: Optional[asyncpg.Pool] = None
+        self.replica_lag: Optional[float] = None
+        self.replica_checked_at = float("-inf")
+        self.lag_checks = SingleFlight()
     
     async def create_pool(self):
         if not self.pool:
             self.pool = await asyncpg.create_pool(
                 settings.DATABASE_URL,
-                min_size=1,
-                max_size=10,
-                command_timeout=60
+                min_size=settings.DATABASE_POOL_MIN_SIZE,
+                max_size=settings.DATABASE_POOL_MAX_SIZE,
+                timeout=settings.DATABASE_CONNECT_TIMEOUT_SECONDS,
+                command_timeout=settings.DATABASE_COMMAND_TIMEOUT_SECONDS
             )
         return self.pool
     
+    async def create_replica_pool(self):
+        if not self.replica_pool:
+            self.replica_pool = await asyncpg.create_pool(
+                settings.DATABASE_REPLICA_URL,
+                min_size=settings.DATABASE_POOL_MIN_SIZE,
+                max_size=settings.DATABASE_POOL_MAX_SIZE,
+                timeout=settings.DATABASE_CONNECT_TIMEOUT_SECONDS,
+                command_timeout=settings.DATABASE_COMMAND_TIMEOUT_SECONDS
+            )
+        return self.replica_pool
+    
     async def close_pool(self):
         if self.pool:
             await self.pool.close()
+            self.pool = None
+        if self.replica_pool:
+            await self.replica_pool.close()
+            self.replica_pool = None
+    
+    async def check_replica_lag(self):
+        """Measure replica lag; an unreachable replica has no lag value and serves no reads.
+        Runs through the replica breaker, so it is also the probe that closes it."""
+        try:
+            with replica_breaker.protect():
+                pool = await self.create_replica_pool()
+                self.replica_lag = float(await pool.fetchval(REPLICA_LAG_SQL, timeout=timeout_for(settings.DATABASE_CONNECT_TIMEOUT_SECONDS)))
+        except Exception as e:
+            logger.warning("Replica lag check failed, reading from the primary: %r", e)
+            self.replica_lag = None
+        finally:
+            self.replica_checked_at = time.monotonic()
+    
+    async def replica_serves_reads(self) -> bool:
+        if not settings.DATABASE_REPLICA_URL:
+            return False
+        if replica_breaker.state == CLOSED:
+            check_due = time.monotonic() - self.replica_checked_at >= settings.DATABASE_REPLICA_LAG_CHECK_SECONDS
+        else:
+            # Reads stay on the primary until the lag check, as the breaker's
+            # probe, finds the replica back
+            check_due = replica_breaker.retry_after() <= 0
+        if check_due:
+            await self.lag_checks.run("replica-lag", self.check_replica_lag)
+        return (
+            replica_breaker.state == CLOSED and
+            self.replica_lag is not None and
+            self.replica_lag <= settings.DATABASE_REPLICA_MAX_LAG_SECONDS
+        )
+    
+    async def use_replica(self, readonly: bool) -> bool:
+        return readonly and await self.replica_serves_reads() and not await reads_need_primary()
+    
+    def replica_status(self) -> Optional[Dict[str, Any]]:
+        if not settings.DATABASE_REPLICA_URL:
+            return None
+        return {
+            "lag_seconds": self.replica_lag,
+            "max_lag_seconds": settings.DATABASE_REPLICA_MAX_LAG_SECONDS,
+            "serving_reads": (
+                replica_breaker.state == CLOSED and
+                self.replica_lag is not None and
+                self.replica_lag <= settings.DATABASE_REPLICA_MAX_LAG_SECONDS
+            ),
+        }
     
-    async def execute_query(self, query: str, *args):
-        pool = await self.create_pool()
-        async with pool.acquire() as connection:
-            return await connection.fetch(query, *args)
+    @asynccontextmanager
+    async def connection(self, readonly: bool = False):
+        """Yield a pooled connection, within the request's time budget and the
+        breaker of the database it comes from. Read-only work may get a replica
+        connection; see app.core.read_routing."""
+        replica = await self.use_replica(readonly)
+        breaker = replica_breaker if replica else database_breaker
+        acquire_timeout = timeout_for()
+        try:
+            with breaker.protect():
+                pool = await (self.create_replica_pool() if replica else self.create_pool())
+                connection = await pool.acquire(timeout=acquire_timeout)
+                try:
+                    yield connection
+                finally:
+                    # Resetting a connection whose statement timed out waits for the
+                    # cancellation; past the budget, drop the connection instead
+                    budget = remaining()
+                    await pool.release(connection, timeout=None if budget is None else max(budget, RELEASE_GRACE_SECONDS))
+        except (asyncio.TimeoutError, asyncpg.QueryCanceledError) as e:
+            if expired():
+                raise DeadlineExceeded() from e
+            raise
     
-    async def execute_one(self, query: str, *args):
-        pool = await self.create_pool()
-        async with pool.acquire() as connection:
-            return await connection.fetchrow(query, *args)
+    async def execute_query(self, query: str, *args, readonly: bool = False):
+        async with self.connection(readonly) as connection:
+            return await connection.fetch(query, *args, timeout=timeout_for())
+    
+    async def execute_one(self, query: str, *args, readonly: bool = False):
+        async with self.connection(readonly) as connection:
+            return await connection.fetchrow(query, *args, timeout=timeout_for())
     
     async def execute_command(self, query: str, *args):
-        pool = await self.create_pool()
-        async with pool.acquire() as connection:
-            return await connection.execute(query, *args)
+        async with self.connection() as connection:
+            return await connection.execute(query, *args, timeout=timeout_for())
+    
+    @asynccontextmanager
+    async def transaction(self, **options):
+        """Yield a connection whose statements run in a single transaction;
+        ``readonly=True`` transactions may run on the replica"""
+        async with self.connection(options.get("readonly", False)) as connection:
+            async with connection.transaction(**options):
+                budget = remaining()
+                if budget is not None:
+                    # The caller runs its own statements; bound them on the server
+                    await connection.execute(f"SET LOCAL statement_timeout = {max(1, int(budget * 1000))}")
+                yield connection
 
 # Global database manager
 db_manager = DatabaseManager()
@@ -0,0 +1,55 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from fastapi import HTTPException, status
+from typing import Optional
+import time
+
+# Monotonic time by which the current request must finish, if it has a budget.
+# Context variables follow the request into threadpool calls, so the sync
+# Supabase client sees the same deadline as async code.
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+# Event loop timers may fire this much before the time they were set for
+# (uvloop rounds to milliseconds)
+TIMER_SLACK_SECONDS = 0.005
+
+class DeadlineExceeded(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="The request ran out of time waiting for a backing service"
+        )
+
+@contextmanager
+def deadline_scope(seconds: float):
+    """Give the code inside a total time budget; a tighter outer budget wins"""
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(deadline if current is None else min(current, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+def remaining() -> Optional[float]:
+    """Seconds left in the current budget, or None outside a request (background jobs)"""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+def expired() -> bool:
+    """Whether the budget is spent, e.g. to tell a budget timeout from any other"""
+    budget = remaining()
+    return budget is not None and budget <= TIMER_SLACK_SECONDS
+
+def timeout_for(ceiling: Optional[float] = None) -> Optional[float]:
+    """Timeout for one downstream call: the remaining budget, capped at ``ceiling``.
+
+    Raises DeadlineExceeded once the budget is spent, so no call is started
+    that could not finish in time.
+    """
+    budget = remaining()
+    if budget is None:
+        return ceiling
+    if budget <= 0:
+        raise DeadlineExceeded()
+    return budget if ceiling is None else min(budget, ceiling)
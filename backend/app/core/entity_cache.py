@@ -0,0 +1,206 @@
+"""Read-through caches of hot rows by id, kept coherent across workers.
+
+Each worker keeps its own bounded LRU cache per table. Triggers on the cached
+tables send ``NOTIFY entity_changes, '<table>:<id>'`` on every update and
+delete (database/17_entity_change_notifications.sql), and each worker
+listens on one dedicated connection and drops the changed rows. Rows are
+only cached while that connection is up: notifications sent while it was
+down are lost, so the caches are cleared whenever it (re)connects.
+
+A row loaded just before a change commits must not be stored after the
+change's notification has been handled, so an invalidation arriving while
+a load of the same id is in flight discards that load's result.
+"""
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
+import asyncpg
+import logging
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.database import db_manager
+from app.core.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+ENTITY_CHANGES_CHANNEL = "entity_changes"
+
+entity_caches: Dict[str, "EntityCache"] = {}
+
+class EntityCache:
+    def __init__(self, table: str, load_sql: str):
+        """``load_sql`` selects one row by id ($1)"""
+        self.table = table
+        self.load_sql = load_sql
+        self._entries: Optional[LRUCache] = None
+        self.loads = SingleFlight()
+        # Ids being loaded: [loads in flight, whether the row changed meanwhile]
+        self.loading: Dict[str, List] = {}
+        self.invalidations = 0
+        entity_caches[table] = self
+
+    @property
+    def entries(self) -> LRUCache:
+        # Sized on first use; the caches are created when their module is imported
+        if self._entries is None:
+            self._entries = LRUCache(settings.ENTITY_CACHE_MAX_ENTRIES)
+        return self._entries
+
+    @property
+    def active(self) -> bool:
+        return settings.ENTITY_CACHE_ENABLED and change_listener.connected
+
+    async def get(self, entity_id, connection: Optional[asyncpg.Connection] = None) -> Optional[Dict[str, Any]]:
+        """The row as a dict, or None if it does not exist.
+
+        Reads through ``connection`` when given, e.g. inside a transaction
+        that has not written the row itself.
+        """
+        key = str(entity_id)
+        if not self.active:
+            return await self.fetch(entity_id, connection)
+
+        row = self.entries.get(key)
+        if row is not None:
+            return row
+
+        if connection is not None:
+            return await self.load(key, entity_id, connection)
+        return await self.loads.run(key, lambda: self.load(key, entity_id, None))
+
+    async def fetch(self, entity_id, connection: Optional[asyncpg.Connection]) -> Optional[Dict[str, Any]]:
+        if connection is not None:
+            record = await connection.fetchrow(self.load_sql, entity_id)
+        else:
+            record = await db_manager.execute_one(self.load_sql, entity_id)
+        return dict(record) if record is not None else None
+
+    async def load(self, key: str, entity_id, connection: Optional[asyncpg.Connection]) -> Optional[Dict[str, Any]]:
+        # A load through a connection may overlap a pooled load of the same id
+        in_flight = self.loading.setdefault(key, [0, False])
+        in_flight[0] += 1
+        try:
+            row = await self.fetch(entity_id, connection)
+            if row is not None and not in_flight[1] and self.active:
+                self.entries.set(key, row)
+            return row
+        finally:
+            in_flight[0] -= 1
+            if not in_flight[0]:
+                del self.loading[key]
+
+    def invalidate(self, entity_id):
+        key = str(entity_id)
+        self.invalidations += 1
+        self.entries.invalidate(key)
+        if key in self.loading:
+            self.loading[key][1] = True
+
+    def clear(self):
+        self.entries.clear()
+        for in_flight in self.loading.values():
+            in_flight[1] = True
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.entries.stats(), "invalidations": self.invalidations}
+
+class EntityChangeListener:
+    """Holds the LISTEN connection and routes notifications to the caches.
+
+    Other in-memory state derived from the database (see
+    app.services.workload) subscribes to further channels on the same
+    connection with ``subscribe``.
+    """
+
+    def __init__(self):
+        self.connected = False
+        self.task: Optional[asyncio.Task] = None
+        self.notifications = 0
+        self.connects = 0
+        self.subscriptions: List[Tuple[str, Callable[[str], None], Callable[[asyncpg.Connection], Awaitable[None]], Callable[[], None]]] = []
+
+    def subscribe(
+        self,
+        channel: str,
+        on_payload: Callable[[str], None],
+        on_connect: Callable[[asyncpg.Connection], Awaitable[None]],
+        on_disconnect: Callable[[], None]
+    ):
+        """``on_connect`` runs after LISTEN on every (re)connect, to rebuild
+        whatever missed notifications may have left stale"""
+        self.subscriptions.append((channel, on_payload, on_connect, on_disconnect))
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self.run(), name="entity-change-listener")
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    def on_notification(self, connection, pid: int, channel: str, payload: str):
+        self.notifications += 1
+        table, _, entity_id = payload.partition(":")
+        cache = entity_caches.get(table)
+        if cache is not None:
+            cache.invalidate(entity_id)
+
+    async def run(self):
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(
+                    settings.DATABASE_URL,
+                    timeout=settings.DATABASE_CONNECT_TIMEOUT_SECONDS
+                )
+                closed = asyncio.Event()
+                connection.add_termination_listener(lambda _: closed.set())
+                await connection.add_listener(ENTITY_CHANGES_CHANNEL, self.on_notification)
+                for channel, on_payload, _, _ in self.subscriptions:
+                    await connection.add_listener(channel, lambda _c, _p, _ch, payload, handle=on_payload: handle(payload))
+                # Changes made while nobody was listening were missed
+                clear_entity_caches()
+                for _, _, on_connect, _ in self.subscriptions:
+                    await on_connect(connection)
+                self.connected = True
+                self.connects += 1
+
+                # A connection that dies silently sends no termination event
+                while not closed.is_set():
+                    try:
+                        await asyncio.wait_for(closed.wait(), settings.ENTITY_CACHE_LISTENER_CHECK_SECONDS)
+                    except asyncio.TimeoutError:
+                        await connection.fetchval("SELECT 1", timeout=settings.DATABASE_CONNECT_TIMEOUT_SECONDS)
+                logger.warning("Entity change listener connection closed; entity caches bypassed")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Entity change listener failed, entity caches bypassed: %r", e)
+            finally:
+                self.connected = False
+                clear_entity_caches()
+                for _, _, _, on_disconnect in self.subscriptions:
+                    on_disconnect()
+                if connection is not None:
+                    connection.terminate()
+
+            await asyncio.sleep(settings.ENTITY_CACHE_RECONNECT_SECONDS)
+
+change_listener = EntityChangeListener()
+
+def clear_entity_caches():
+    for cache in entity_caches.values():
+        cache.clear()
+
+def entity_cache_stats() -> Dict[str, Any]:
+    return {
+        "enabled": settings.ENTITY_CACHE_ENABLED,
+        "listening": change_listener.connected,
+        "notifications": change_listener.notifications,
+        "listener_connects": change_listener.connects,
+        "tables": {table: cache.stats() for table, cache in entity_caches.items()},
+    }
@@ -0,0 +1,127 @@
+from fastapi import HTTPException, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from typing import Any, Optional
+from app.core.config import settings
+from app.core.database import db_manager
+import hashlib
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+
+# Claims a new key, or reclaims an expired one. A concurrent request with the
+# same key blocks on the primary key until the first transaction finishes,
+# then finds the stored response.
+CLAIM_KEY_SQL = """
+    INSERT INTO idempotency_keys (user_id, endpoint, key, request_hash, expires_at)
+    VALUES ($1, $2, $3, $4, now() + make_interval(secs => $5))
+    ON CONFLICT (user_id, endpoint, key) DO UPDATE SET
+        request_hash = EXCLUDED.request_hash,
+        status_code = NULL,
+        response = NULL,
+        created_at = now(),
+        expires_at = EXCLUDED.expires_at
+    WHERE idempotency_keys.expires_at <= now()
+    RETURNING key
+"""
+
+STORED_RESPONSE_SQL = """
+    SELECT request_hash, status_code, response FROM idempotency_keys
+    WHERE user_id = $1 AND endpoint = $2 AND key = $3
+"""
+
+SAVE_RESPONSE_SQL = """
+    UPDATE idempotency_keys SET status_code = $4, response = $5::json
+    WHERE user_id = $1 AND endpoint = $2 AND key = $3
+"""
+
+PURGE_EXPIRED_KEYS_SQL = "DELETE FROM idempotency_keys WHERE expires_at <= now()"
+
+class Idempotency:
+    """Replay protection for one write request.
+
+    ``begin`` and ``complete`` must run on the connection and transaction
+    that perform the write, so the key, the rows it created and the stored
+    response commit or roll back together. Without an Idempotency-Key
+    header both are no-ops.
+    """
+
+    def __init__(self, key: Optional[str], endpoint: str):
+        self.key = key
+        self.endpoint = endpoint
+        self.user_id = None
+
+    async def begin(self, connection, user_id, fingerprint: Any) -> Optional[Response]:
+        """Claim the key, or return the stored response when it was already used"""
+        if self.key is None:
+            return None
+
+        self.user_id = user_id
+        request_hash = hashlib.sha256(
+            json.dumps(jsonable_encoder(fingerprint), sort_keys=True).encode()
+        ).hexdigest()
+
+        claimed = await connection.fetchval(
+            CLAIM_KEY_SQL, user_id, self.endpoint, self.key, request_hash,
+            float(settings.IDEMPOTENCY_KEY_TTL_SECONDS)
+        )
+        if claimed:
+            return None
+
+        stored = await connection.fetchrow(STORED_RESPONSE_SQL, user_id, self.endpoint, self.key)
+
+        if stored["request_hash"] != request_hash:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key was already used with a different request"
+            )
+
+        return JSONResponse(
+            content=json.loads(stored["response"]),
+            status_code=stored["status_code"],
+            headers={"Idempotent-Replayed": "true"}
+        )
+
+    async def complete(self, connection, result: Any, status_code: int = status.HTTP_200_OK):
+        """Store the response to replay for retries of this request"""
+        if self.key is None:
+            return
+
+        await connection.execute(
+            SAVE_RESPONSE_SQL, self.user_id, self.endpoint, self.key,
+            status_code, json.dumps(jsonable_encoder(result))
+        )
+
+def file_digest(fileobj, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 of an upload, rewound afterwards so it can still be parsed"""
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: fileobj.read(chunk_size), b""):
+        digest.update(chunk)
+    fileobj.seek(0)
+    return digest.hexdigest()
+
+def idempotency(request: Request) -> Idempotency:
+    """Dependency reading the optional Idempotency-Key header"""
+    key = request.headers.get(IDEMPOTENCY_KEY_HEADER)
+
+    if key is not None and not 0 < len(key) <= MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{IDEMPOTENCY_KEY_HEADER} must be 1 to {MAX_KEY_LENGTH} characters"
+        )
+
+    return Idempotency(key, f"{request.method} {request.url.path}")
+
+async def purge_expired_idempotency_keys() -> int:
+    """Delete expired keys and their stored responses; returns the count"""
+    result = await db_manager.execute_command(PURGE_EXPIRED_KEYS_SQL)
+    count = int(result.split()[-1])
+
+    if count:
+        logger.info("Purged %d expired idempotency keys", count)
+
+    return count
@@ -0,0 +1,33 @@
+from fastapi import HTTPException, status
+from datetime import datetime
+from typing import Optional, Tuple
+import base64
+import uuid
+
+def encode_cursor(created_at: datetime, row_id) -> str:
+    """Encode a (created_at, id) keyset position as an opaque cursor"""
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, uuid.UUID]]:
+    """Decode a cursor produced by encode_cursor"""
+    if not cursor:
+        return None
+
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, row_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), uuid.UUID(row_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+def next_cursor(rows: list, limit: int) -> Optional[str]:
+    """Return the cursor for the page after rows, or None on the last page"""
+    if len(rows) < limit:
+        return None
+
+    last = rows[-1]
+    return encode_cursor(last["created_at"], last["id"])
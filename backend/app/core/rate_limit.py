@@ -0,0 +1,37 @@
+from fastapi import HTTPException, status, Depends
+from typing import Optional
+from app.core.cache_backend import get_cache_backend
+from app.core.config import settings
+from app.middleware.auth import get_current_user
+import math
+
+def rate_limit(
+    name: str,
+    user_dependency=get_current_user,
+    per_minute: Optional[int] = None,
+    burst: Optional[int] = None
+):
+    """Dependency enforcing a per-user token bucket; returns the current user.
+
+    ``user_dependency`` is the route's own auth dependency (for example a
+    ``require_role`` checker), so role checks still run first. Limits left
+    out are the report limits from settings, read per request.
+    """
+    async def limiter(current_user = Depends(user_dependency)):
+        limit = settings.REPORT_RATE_LIMIT_PER_MINUTE if per_minute is None else per_minute
+        allowed, retry_after = await get_cache_backend().take_token(
+            f"ratelimit:{name}:{current_user['id']}",
+            limit / 60,
+            settings.REPORT_RATE_LIMIT_BURST if burst is None else burst
+        )
+
+        if not allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests for this report; try again shortly",
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+            )
+
+        return current_user
+
+    return limiter
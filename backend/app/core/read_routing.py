@@ -0,0 +1,65 @@
+"""Which reads may go to the read replica (DATABASE_REPLICA_URL).
+
+Queries declared read-only (``readonly=True``) are served by the replica
+unless the request itself writes (any method but GET, HEAD and OPTIONS) or
+the same user wrote within READ_YOUR_WRITES_SECONDS. Recent writers are
+recorded in the shared cache backend before the write's response is sent, so
+a read that follows it on another worker also sees it when
+CACHE_BACKEND=redis. Replica lag and health are checked by DatabaseManager.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+from app.core.cache_backend import get_cache_backend
+from app.core.config import settings
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+class RequestRouting:
+    def __init__(self, method: str):
+        self.method = method
+        self.user_id: Optional[str] = None
+        # Looked up once per request, on its first read-only query
+        self.wrote_recently: Optional[bool] = None
+
+    @property
+    def writes(self) -> bool:
+        return self.method not in SAFE_METHODS
+
+_routing: ContextVar[Optional[RequestRouting]] = ContextVar("request_routing", default=None)
+
+@contextmanager
+def routing_scope(method: str):
+    routing = RequestRouting(method)
+    token = _routing.set(routing)
+    try:
+        yield routing
+    finally:
+        _routing.reset(token)
+
+def set_request_user(user_id: str):
+    """Called once the request is authenticated"""
+    routing = _routing.get()
+    if routing is not None:
+        routing.user_id = str(user_id)
+
+def recent_write_key(user_id: str) -> str:
+    return f"recent-write:{user_id}"
+
+async def reads_need_primary() -> bool:
+    """Whether this request's read-only queries must still see the primary"""
+    routing = _routing.get()
+    if routing is None:
+        # Background jobs have no writes of their own to read back
+        return False
+    if routing.writes:
+        return True
+    if routing.user_id is None:
+        return False
+    if routing.wrote_recently is None:
+        routing.wrote_recently = await get_cache_backend().get(recent_write_key(routing.user_id)) is not None
+    return routing.wrote_recently
+
+async def record_write(routing: RequestRouting):
+    if settings.DATABASE_REPLICA_URL and routing.writes and routing.user_id is not None:
+        await get_cache_backend().set(recent_write_key(routing.user_id), True, settings.READ_YOUR_WRITES_SECONDS)
@@ -0,0 +1,52 @@
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from typing import Any, Callable, Dict
+from app.core.cache import TTLCache
+from app.core.compression import SUPPORTED_ENCODINGS, choose_encoding, compress
+from app.core.config import settings
+from app.core.http_cache import make_etag, is_not_modified, not_modified
+
+class CachedBody:
+    """A rendered JSON body with every supported encoding computed up front"""
+
+    def __init__(self, payload: Any):
+        self.body = JSONResponse(jsonable_encoder(payload)).body
+        self.etag = make_etag(self.body)
+        self.encoded: Dict[str, bytes] = {}
+
+        if len(self.body) >= settings.COMPRESSION_MINIMUM_SIZE:
+            for encoding in SUPPORTED_ENCODINGS:
+                self.encoded[encoding] = compress(self.body, encoding)
+
+    def response(self, request: Request) -> Response:
+        if is_not_modified(request, self.etag, None):
+            return not_modified(self.etag, None)
+
+        headers = {"ETag": self.etag, "Vary": "Accept-Encoding"}
+        body = self.body
+
+        encoding = choose_encoding(request.headers.get("accept-encoding"), list(self.encoded))
+        if encoding:
+            headers["Content-Encoding"] = encoding
+            body = self.encoded[encoding]
+
+        return Response(content=body, media_type="application/json", headers=headers)
+
+class PrecompressedResponseCache:
+    """TTL cache for slow-changing JSON responses, stored already compressed
+    so a hit costs a dictionary lookup rather than serialization and gzip"""
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 256):
+        self.entries = TTLCache(ttl_seconds, max_entries=max_entries)
+
+    def respond(self, request: Request, key, build: Callable[[], Any]) -> Response:
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = CachedBody(build())
+            self.entries.set(key, entry)
+
+        return entry.response(request)
+
+    def clear(self):
+        self.entries.clear()
@@ -0,0 +1,161 @@
+"""Supabase client on one shared, pooled httpx transport.
+
+supabase-py gives its auth and PostgREST clients separate default httpx
+sessions with default limits and timeouts. Here both sessions send through a
+single transport per worker, so connections (and their TLS setup) are reused
+across auth and table calls, HTTP/2 multiplexes concurrent calls over one
+connection when the server negotiates it, and pool limits, keep-alive and
+timeouts come from Settings. Each call's timeouts are also capped at the
+request's remaining budget, and auth and PostgREST calls go through their own
+circuit breakers. Imported on first use by get_supabase.
+"""
+from app.core.config import settings
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.deadline import DeadlineExceeded, expired, timeout_for
+from gotrue.http_clients import SyncClient as AuthSession
+from postgrest import SyncPostgrestClient
+from postgrest.utils import SyncClient as PostgrestSession
+from supabase import Client
+from supabase.lib.auth_client import SupabaseAuthClient
+from supabase.lib.client_options import ClientOptions
+from typing import Any, Dict, Union
+import httpx
+import threading
+
+TIMEOUT_PHASES = ("connect", "read", "write", "pool")
+
+def is_transport_failure(error: BaseException) -> bool:
+    return isinstance(error, httpx.TransportError)
+
+auth_breaker = CircuitBreaker("supabase_auth", "Authentication", is_transport_failure)
+postgrest_breaker = CircuitBreaker("postgrest", "The data service", is_transport_failure)
+
+def breaker_for(request: httpx.Request) -> CircuitBreaker:
+    return auth_breaker if "/auth/v1/" in request.url.path else postgrest_breaker
+
+def cap_timeouts(request: httpx.Request):
+    """Cap every timeout phase of the call at the request's remaining budget"""
+    budget = timeout_for()
+    if budget is None:
+        return
+    limits = request.extensions.get("timeout") or dict.fromkeys(TIMEOUT_PHASES)
+    request.extensions["timeout"] = {
+        phase: budget if limit is None else min(limit, budget) for phase, limit in limits.items()
+    }
+
+class PooledTransport(httpx.HTTPTransport):
+    """HTTP transport that applies request budgets and breakers and counts its requests"""
+
+    def __init__(self, limits: httpx.Limits, **kwargs):
+        super().__init__(limits=limits, **kwargs)
+        self.limits = limits
+        self.requests = 0
+        self.in_flight = 0
+        self._counter_lock = threading.Lock()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        cap_timeouts(request)
+        breaker = breaker_for(request)
+        probe = breaker.before_call()
+        with self._counter_lock:
+            self.requests += 1
+            self.in_flight += 1
+        try:
+            response = super().handle_request(request)
+        except Exception as e:
+            breaker.record(breaker.is_failure(e), probe)
+            if isinstance(e, httpx.TimeoutException) and expired():
+                raise DeadlineExceeded() from e
+            raise
+        finally:
+            with self._counter_lock:
+                self.in_flight -= 1
+        breaker.record(response.status_code >= 500, probe)
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        # httpx keeps the httpcore connection pool on _pool
+        connections = list(self._pool.connections)
+        return {
+            "requests": self.requests,
+            "in_flight": self.in_flight,
+            "connections": len(connections),
+            "idle_connections": sum(1 for connection in connections if connection.is_idle()),
+            "http2_connections": sum(1 for connection in connections if "HTTP/2" in connection.info()),
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+        }
+
+    def close(self):
+        # Sessions close their transport when supabase-py discards them; the
+        # pool is shared, so only SupabaseClient.reset closes it
+        pass
+
+    def shutdown(self):
+        super().close()
+
+def build_transport() -> PooledTransport:
+    return PooledTransport(
+        http2=settings.SUPABASE_HTTP2,
+        limits=httpx.Limits(
+            max_connections=settings.SUPABASE_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.SUPABASE_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.SUPABASE_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        retries=settings.SUPABASE_CONNECT_RETRIES,
+    )
+
+def build_timeout() -> httpx.Timeout:
+    return httpx.Timeout(
+        connect=settings.SUPABASE_CONNECT_TIMEOUT_SECONDS,
+        read=settings.SUPABASE_READ_TIMEOUT_SECONDS,
+        write=settings.SUPABASE_WRITE_TIMEOUT_SECONDS,
+        pool=settings.SUPABASE_POOL_TIMEOUT_SECONDS,
+    )
+
+class PooledPostgrestClient(SyncPostgrestClient):
+    def __init__(self, base_url: str, *, transport: httpx.BaseTransport, **kwargs):
+        # create_session runs inside the base constructor
+        self.transport = transport
+        super().__init__(base_url, **kwargs)
+
+    def create_session(
+        self,
+        base_url: str,
+        headers: Dict[str, str],
+        timeout: Union[int, float, httpx.Timeout],
+    ) -> PostgrestSession:
+        return PostgrestSession(base_url=base_url, headers=headers, timeout=timeout, transport=self.transport)
+
+class PooledClient(Client):
+    """supabase Client whose auth and PostgREST calls share one transport"""
+
+    def __init__(self, supabase_url: str, supabase_key: str, transport: PooledTransport):
+        # Set before the base constructor, which builds the auth client
+        self.transport = transport
+        self.timeout = build_timeout()
+        super().__init__(supabase_url, supabase_key, ClientOptions(postgrest_client_timeout=self.timeout))
+
+    def _init_supabase_auth_client(self, auth_url: str, client_options: ClientOptions) -> SupabaseAuthClient:
+        return SupabaseAuthClient(
+            url=auth_url,
+            auto_refresh_token=client_options.auto_refresh_token,
+            persist_session=client_options.persist_session,
+            storage=client_options.storage,
+            headers=client_options.headers,
+            http_client=AuthSession(timeout=self.timeout, transport=self.transport),
+        )
+
+    def _init_postgrest_client(
+        self,
+        rest_url: str,
+        headers: Dict[str, str],
+        schema: str,
+        timeout: Union[int, float, httpx.Timeout],
+    ) -> SyncPostgrestClient:
+        return PooledPostgrestClient(
+            rest_url, headers=headers, schema=schema, timeout=timeout, transport=self.transport
+        )
+
+def create_pooled_client(supabase_url: str, supabase_key: str) -> PooledClient:
+    return PooledClient(supabase_url, supabase_key, build_transport())
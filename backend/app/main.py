@@ -9,9 +9,23 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from app.core.config import settings
-from app.core.database import get_supabase
-from app.api.v1 import auth, users, projects, tasks, processes, analytics
+from app.core.database import get_supabase, supabase_client, db_manager
+from app.core.cache_backend import get_cache_backend, close_cache_backend
+from app.core.idempotency import purge_expired_idempotency_keys
+from app.core.circuit_breaker import breaker_states
+from app.core.entity_cache import change_listener, entity_cache_stats
+from app.api.v1 import auth, users, projects, tasks, processes, analytics, purchase_requests, boq, invoices, vendors, notifications, search
 from app.middleware.auth import verify_token
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.deadline import DeadlineMiddleware
+from app.middleware.read_routing import ReadRoutingMiddleware
+from app.services.scheduler import scheduler
+from app.services.invoices import sweep_overdue_invoices
+from app.services.task_sync import prune_task_tombstones
+from app.services.task_reminders import sweep_due_tasks
+from app.services.recurrence import generate_recurring_tasks
+from app.services.reports import precompute_reports
+from app.services.forecasts import refresh_all_project_forecasts
 
 security = HTTPBearer()
 
@@ -19,35 +33,105 @@ security = HTTPBearer()
 async def lifespan(app: FastAPI):
     # Startup
     print("🚀 Corporate Interiors ERP API Starting...")
+    # Named from settings here rather than at import
+    app.title = settings.APP_NAME
+    app.version = settings.APP_VERSION
+    # Each worker process builds its own clients, pool and cache connections
+    get_supabase()
+    await db_manager.create_pool()
+    get_cache_backend()
+    change_listener.start()
+    if settings.SCHEDULER_ENABLED:
+        scheduler.add_job(
+            "invoice-overdue-sweep",
+            sweep_overdue_invoices,
+            settings.INVOICE_OVERDUE_SWEEP_INTERVAL_SECONDS,
+            run_at_startup=True
+        )
+        scheduler.add_job(
+            "task-tombstone-prune",
+            prune_task_tombstones,
+            settings.TASK_TOMBSTONE_PRUNE_INTERVAL_SECONDS
+        )
+        scheduler.add_job(
+            "task-due-reminders",
+            sweep_due_tasks,
+            settings.TASK_DUE_REMINDER_INTERVAL_SECONDS,
+            run_at_startup=True
+        )
+        scheduler.add_job(
+            "recurring-task-generation",
+            generate_recurring_tasks,
+            settings.RECURRING_TASK_INTERVAL_SECONDS,
+            run_at_startup=True
+        )
+        scheduler.add_job(
+            "idempotency-key-purge",
+            purge_expired_idempotency_keys,
+            settings.IDEMPOTENCY_KEY_PURGE_INTERVAL_SECONDS
+        )
+        scheduler.add_job(
+            "report-precompute",
+            precompute_reports,
+            settings.REPORT_PRECOMPUTE_INTERVAL_SECONDS,
+            run_at_startup=True
+        )
+        scheduler.add_job(
+            "project-forecast-refresh",
+            refresh_all_project_forecasts,
+            settings.FORECAST_FULL_REFRESH_INTERVAL_SECONDS
+        )
+        await scheduler.start()
     yield
     # Shutdown
     print("⛔ Corporate Interiors ERP API Shutting down...")
+    await scheduler.stop()
+    await change_listener.stop()
+    await close_cache_backend()
+    await db_manager.close_pool()
+    supabase_client.reset()
 
 app = FastAPI(
-    title=settings.APP_NAME,
     description="Corporate Interiors ERP System - Complete workflow management for interior design business",
-    version=settings.APP_VERSION,
     lifespan=lifespan,
     docs_url="/api/docs",
     redoc_url="/api/redoc"
 )
 
-# CORS Configuration
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.CORS_ORIGINS,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# CORS Configuration. Middleware is built on the first request, so the
+# allowed origins are read then.
+def cors_middleware(app):
+    return CORSMiddleware(
+        app,
+        allow_origins=settings.CORS_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+app.add_middleware(cors_middleware)
+
+# Response compression (gzip, or brotli when installed) of bodies from COMPRESSION_MINIMUM_SIZE
+app.add_middleware(CompressionMiddleware)
+
+# Read replica routing and read-your-writes stickiness
+app.add_middleware(ReadRoutingMiddleware)
+
+# Total time budget per request (REQUEST_DEADLINE_SECONDS), inherited by database and Supabase calls
+app.add_middleware(DeadlineMiddleware)
 
 # Health check endpoint
 @app.get("/health")
 async def health_check():
+    circuit_breakers = breaker_states()
     return {
-        "status": "healthy",
+        "status": "degraded" if any(state["state"] != "closed" for state in circuit_breakers.values()) else "healthy",
         "app_name": settings.APP_NAME,
-        "version": settings.APP_VERSION
+        "version": settings.APP_VERSION,
+        "supabase_http": supabase_client.pool_stats(),
+        "database_replica": db_manager.replica_status(),
+        "entity_cache": entity_cache_stats(),
+        "circuit_breakers": circuit_breakers
     }
 
 # Include API routers
@@ -57,11 +141,18 @@ app.include_router(projects.router, prefix="/api/v1/projects", tags=["Projects"]
 app.include_router(tasks.router, prefix="/api/v1/tasks", tags=["Tasks"])
 app.include_router(processes.router, prefix="/api/v1/processes", tags=["Processes"])
 app.include_router(analytics.router, prefix="/api/v1/analytics", tags=["Analytics"])
+app.include_router(purchase_requests.router, prefix="/api/v1/purchase-requests", tags=["Purchase Requests"])
+app.include_router(boq.router, prefix="/api/v1/boq", tags=["BOQ"])
+app.include_router(invoices.router, prefix="/api/v1/invoices", tags=["Invoices"])
+app.include_router(vendors.router, prefix="/api/v1/vendors", tags=["Vendors"])
+app.include_router(notifications.router, prefix="/api/v1/notifications", tags=["Notifications"])
+app.include_router(search.router, prefix="/api/v1/search", tags=["Search"])
 
 if __name__ == "__main__":
+    # Development server; use `python -m app.server` in production
     import uvicorn
     uvicorn.run(
-        "main:app",
+        "app.main:app",
         host="0.0.0.0",
         port=8000,
         reload=settings.DEBUG
@@ -3,6 +3,8 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
 from app.core.config import settings
 from app.core.database import get_supabase
+from app.core.circuit_breaker import unavailable_cause
+from app.core.read_routing import set_request_user
 from typing import Optional
 import uuid
 
@@ -26,15 +28,25 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
         
         return user.user
     
+    except HTTPException:
+        raise
     except Exception as e:
+        # A slow or failing auth service is not the caller's bad credentials
+        unavailable = unavailable_cause(e)
+        if unavailable is not None:
+            raise unavailable
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-async def get_current_user(user_data = Depends(verify_token)):
-    """Get current user with additional profile data"""
+def get_current_user(user_data = Depends(verify_token)):
+    """Get current user with additional profile data
+
+    A plain function so the blocking PostgREST call runs in the threadpool
+    instead of stalling the event loop for every other request.
+    """
     try:
         supabase = get_supabase()
         
@@ -47,6 +59,7 @@ async def get_current_user(user_data = Depends(verify_token)):
                 detail="User profile not found"
             )
         
+        set_request_user(result.data[0]["id"])
         return result.data[0]
     
     except HTTPException:
@@ -0,0 +1,95 @@
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Optional
+from app.core.config import settings
+from app.core.compression import choose_encoding, is_compressible, compress, StreamCompressor
+
+# Responses that never carry a body worth compressing
+BODILESS_STATUSES = {204, 304}
+
+class CompressionMiddleware:
+    """Compress responses with brotli or gzip according to Accept-Encoding.
+
+    Bodies below ``minimum_size`` (COMPRESSION_MINIMUM_SIZE unless given) are
+    sent as-is, and responses that already
+    carry a Content-Encoding (such as precompressed cache entries) pass through
+    untouched.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: Optional[int] = None):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MINIMUM_SIZE if minimum_size is None else minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"))
+        responder = CompressionResponder(send, encoding, self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+class CompressionResponder:
+    def __init__(self, send: Send, encoding: Optional[str], minimum_size: int):
+        self.downstream = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start_message: Optional[Message] = None
+        self.passthrough = False
+        self.compressor: Optional[StreamCompressor] = None
+
+    async def send(self, message: Message):
+        if message["type"] == "http.response.start":
+            # Hold the headers until the first body chunk shows the size
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            self.passthrough = (
+                message["status"] in BODILESS_STATUSES or
+                "content-encoding" in headers or
+                not is_compressible(headers.get("content-type", ""))
+            )
+            if not self.passthrough and "accept-encoding" not in headers.get("vary", "").lower():
+                MutableHeaders(raw=message["headers"]).add_vary_header("Accept-Encoding")
+            return
+
+        if message["type"] != "http.response.body":
+            await self.downstream(message)
+            return
+
+        if self.start_message is not None:
+            await self.send_first_body(message)
+            return
+
+        if self.compressor is None:
+            await self.downstream(message)
+            return
+
+        body = self.compressor.compress(message.get("body", b""))
+        if not message.get("more_body", False):
+            body += self.compressor.finish()
+        await self.downstream({"type": "http.response.body", "body": body, "more_body": message.get("more_body", False)})
+
+    async def send_first_body(self, message: Message):
+        start, self.start_message = self.start_message, None
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.passthrough or self.encoding is None or (not more_body and len(body) < self.minimum_size):
+            await self.downstream(start)
+            await self.downstream(message)
+            return
+
+        headers = MutableHeaders(raw=start["headers"])
+        headers["Content-Encoding"] = self.encoding
+
+        if more_body:
+            # Streaming: compress chunk by chunk without a known length
+            del headers["Content-Length"]
+            self.compressor = StreamCompressor(self.encoding)
+            body = self.compressor.compress(body)
+        else:
+            body = compress(body, self.encoding)
+            headers["Content-Length"] = str(len(body))
+
+        await self.downstream(start)
+        await self.downstream({"type": "http.response.body", "body": body, "more_body": more_body})
@@ -0,0 +1,25 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+from typing import Optional
+from app.core.config import settings
+from app.core.deadline import deadline_scope
+
+class DeadlineMiddleware:
+    """Give every HTTP request a total time budget.
+
+    Downstream calls (asyncpg statements and pool waits, Supabase HTTP calls)
+    take the remaining budget as their timeout, so a slow dependency answers
+    504 within the budget instead of holding a worker until its own timeout.
+    The budget is REQUEST_DEADLINE_SECONDS unless given.
+    """
+
+    def __init__(self, app: ASGIApp, seconds: Optional[float] = None):
+        self.app = app
+        self.seconds = settings.REQUEST_DEADLINE_SECONDS if seconds is None else seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with deadline_scope(self.seconds):
+            await self.app(scope, receive, send)
@@ -0,0 +1,26 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.read_routing import record_write, routing_scope
+
+class ReadRoutingMiddleware:
+    """Track what each request needs from the read replica.
+
+    Read-only queries of safe requests may go to the replica. A successful
+    write marks its user as a recent writer before the response goes out, so
+    the user's next reads stay on the primary until the replica has caught up.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with routing_scope(scope["method"]) as routing:
+            async def send_after_recording(message: Message):
+                if message["type"] == "http.response.start" and message["status"] < 400:
+                    await record_write(routing)
+                await send(message)
+
+            await self.app(scope, receive, send_after_recording if routing.writes else send)
@@ -33,6 +33,24 @@ class Priority(str, Enum):
     HIGH = "high"
     URGENT = "urgent"
 
+class PurchaseRequestStatus(str, Enum):
+    PENDING = "pending"
+    APPROVED = "approved"
+    REJECTED = "rejected"
+    ORDERED = "ordered"
+    RECEIVED = "received"
+
+class InvoiceStatus(str, Enum):
+    PENDING = "pending"
+    APPROVED = "approved"
+    PAID = "paid"
+    OVERDUE = "overdue"
+
+class ApprovalLevel(str, Enum):
+    UNDER_10K = "under_10k"
+    MID_RANGE = "mid_range"
+    HIGH_VALUE = "high_value"
+
 # User Schemas
 class UserBase(BaseModel):
     email: EmailStr
@@ -100,19 +118,43 @@ class ProjectUpdate(BaseModel):
     start_date: Optional[date] = None
     end_date: Optional[date] = None
     budget: Optional[float] = None
-    actual_cost: Optional[float] = None
+    version: Optional[int] = Field(None, description="Apply only if the project is still at this version")
 
 class ProjectResponse(ProjectBase):
     id: uuid.UUID
     project_manager_id: Optional[uuid.UUID] = None
     status: ProjectStatus
     actual_cost: float
+    version: int
     created_at: datetime
     updated_at: datetime
 
     class Config:
         from_attributes = True
 
+class ProjectCostSummary(BaseModel):
+    project_id: uuid.UUID
+    budget: Optional[float] = None
+    actual_cost: float
+    committed_amount: float
+    invoiced_amount: float
+    paid_amount: float
+    remaining_budget: Optional[float] = None
+    updated_at: Optional[datetime] = None
+
+class CategoryVariance(BaseModel):
+    category: Optional[str] = None
+    boq_amount: float
+    committed_amount: float
+    variance: float
+    variance_percentage: Optional[float] = None
+
+class ProjectVarianceReport(BaseModel):
+    costs: ProjectCostSummary
+    boq_total: float
+    committed_total: float
+    categories: List[CategoryVariance]
+
 # Task Schemas
 class TaskBase(BaseModel):
     title: str
@@ -122,6 +164,7 @@ class TaskBase(BaseModel):
     estimated_hours: Optional[int] = None
 
 class TaskCreate(TaskBase):
+    estimated_hours: Optional[int] = Field(None, ge=0)
     project_id: uuid.UUID
     process_id: str
     assigned_to: uuid.UUID
@@ -132,31 +175,49 @@ class TaskUpdate(BaseModel):
     status: Optional[TaskStatus] = None
     priority: Optional[Priority] = None
     due_date: Optional[datetime] = None
-    estimated_hours: Optional[int] = None
-    actual_hours: Optional[int] = None
+    estimated_hours: Optional[int] = Field(None, ge=0)
+    actual_hours: Optional[int] = Field(None, ge=0)
+    version: Optional[int] = Field(None, description="Apply only if the task is still at this version")
 
 class TaskResponse(TaskBase):
     id: uuid.UUID
-    project_id: uuid.UUID
+    project_id: Optional[uuid.UUID] = None  # None for recurring process tasks
     process_id: str
     assigned_to: uuid.UUID
-    created_by: uuid.UUID
+    created_by: Optional[uuid.UUID] = None
     status: TaskStatus
     completed_at: Optional[datetime] = None
     actual_hours: Optional[int] = None
+    version: int
     created_at: datetime
     updated_at: datetime
 
     class Config:
         from_attributes = True
 
+class TaskSyncResponse(BaseModel):
+    tasks: List[TaskResponse]
+    deleted: List[uuid.UUID]
+    cursor: Optional[str] = None
+    has_more: bool
+
+class AssigneeRecommendation(BaseModel):
+    user_id: uuid.UUID
+    full_name: str
+    email: str
+    open_tasks: int
+    pending_tasks: int
+    in_progress_tasks: int
+    estimated_hours_due: int = Field(..., description="Estimated hours of open tasks due within the horizon, overdue included")
+
 # Purchase Request Schemas
 class PurchaseRequestBase(BaseModel):
     item_name: str
     description: Optional[str] = None
-    quantity: int
-    unit_price: float
+    quantity: int = Field(..., gt=0)
+    unit_price: float = Field(..., ge=0)
     vendor_name: Optional[str] = None
+    category: Optional[str] = Field(None, max_length=100, description="BOQ category this purchase draws against")
 
 class PurchaseRequestCreate(PurchaseRequestBase):
     project_id: uuid.UUID
@@ -179,6 +240,156 @@ class PurchaseRequestResponse(PurchaseRequestBase):
     class Config:
         from_attributes = True
 
+class PurchaseRequestDecision(BaseModel):
+    decision: PurchaseRequestStatus
+
+    @validator("decision")
+    def decision_must_be_final(cls, v):
+        if v not in (PurchaseRequestStatus.APPROVED, PurchaseRequestStatus.REJECTED):
+            raise ValueError("decision must be 'approved' or 'rejected'")
+        return v
+
+class PurchaseRequestBulkDecision(PurchaseRequestDecision):
+    request_ids: List[uuid.UUID] = Field(..., min_length=1, max_length=500)
+
+class PurchaseRequestBulkDecisionResponse(BaseModel):
+    decision: PurchaseRequestStatus
+    processed: List[uuid.UUID]
+    skipped: List[uuid.UUID]
+
+class PurchaseRequestQueue(BaseModel):
+    approval_level: ApprovalLevel
+    items: List[PurchaseRequestResponse]
+    next_cursor: Optional[str] = None
+
+# Vendor Schemas
+class VendorBase(BaseModel):
+    name: str = Field(..., min_length=1, max_length=255)
+    contact_person: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = Field(None, max_length=20)
+    address: Optional[str] = None
+    category: Optional[str] = Field(None, max_length=100)
+    rating: float = Field(0, ge=0, le=5)
+
+class VendorCreate(VendorBase):
+    is_active: bool = True
+
+class VendorUpdate(BaseModel):
+    name: Optional[str] = Field(None, min_length=1, max_length=255)
+    contact_person: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = Field(None, max_length=20)
+    address: Optional[str] = None
+    category: Optional[str] = Field(None, max_length=100)
+    rating: Optional[float] = Field(None, ge=0, le=5)
+    is_active: Optional[bool] = None
+
+class VendorResponse(VendorBase):
+    id: uuid.UUID
+    is_active: bool
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class VendorSearchResult(BaseModel):
+    id: uuid.UUID
+    name: str
+    category: Optional[str] = None
+    rating: float
+    score: float
+
+class VendorBulkUpsert(BaseModel):
+    vendors: List[VendorCreate] = Field(..., min_length=1, max_length=5000)
+
+class VendorBulkResult(BaseModel):
+    inserted: int
+    updated: int
+
+# Invoice Schemas
+class InvoiceBase(BaseModel):
+    vendor_id: Optional[uuid.UUID] = None
+    project_id: Optional[uuid.UUID] = None
+    invoice_number: str = Field(..., min_length=1, max_length=100)
+    invoice_date: date
+    due_date: Optional[date] = None
+    subtotal: float = Field(..., ge=0)
+    tax_amount: float = Field(0, ge=0)
+
+class InvoiceCreate(InvoiceBase):
+    total_amount: Optional[float] = Field(None, ge=0, description="Defaults to subtotal + tax_amount")
+
+class InvoiceUpdate(BaseModel):
+    status: Optional[InvoiceStatus] = None
+    due_date: Optional[date] = None
+    paid_date: Optional[date] = None
+
+class InvoiceResponse(InvoiceBase):
+    id: uuid.UUID
+    total_amount: float
+    status: InvoiceStatus
+    processed_by: Optional[uuid.UUID] = None
+    paid_date: Optional[date] = None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class InvoiceBulkCreate(BaseModel):
+    invoices: List[InvoiceCreate] = Field(..., min_length=1, max_length=1000)
+
+class InvoiceBulkResult(BaseModel):
+    inserted: int
+    updated: int
+    unchanged: int
+    invoices: List[InvoiceResponse]
+
+class PurchaseRequestMatch(PurchaseRequestResponse):
+    amount_difference: float
+
+# BOQ Schemas
+class BOQItemResponse(BaseModel):
+    id: uuid.UUID
+    project_id: uuid.UUID
+    created_by: Optional[uuid.UUID] = None
+    item_description: str
+    unit: str
+    quantity: float
+    rate: float
+    amount: float
+    category: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class BOQCategorySubtotal(BaseModel):
+    category: Optional[str] = None
+    line_items: int
+    subtotal: float
+
+class BOQSummary(BaseModel):
+    project_id: uuid.UUID
+    categories: List[BOQCategorySubtotal]
+    line_items: int
+    total_amount: float
+    budget: Optional[float] = None
+    budget_variance: Optional[float] = None
+    within_budget: Optional[bool] = None
+
+class BOQRowError(BaseModel):
+    row: int
+    error: str
+
+class BOQImportResult(BaseModel):
+    rows_imported: int
+    rows_rejected: int
+    errors: List[BOQRowError]
+    summary: BOQSummary
+
 # Authentication Schemas
 class LoginRequest(BaseModel):
     email: EmailStr
@@ -208,9 +419,47 @@ class ProjectProgress(BaseModel):
     progress_percentage: float
     tasks_completed: int
     total_tasks: int
+    estimated_hours: int = 0
+    actual_hours: int = 0
     budget_used: float
     total_budget: float
 
+class ProjectForecast(BaseModel):
+    project_id: uuid.UUID
+    project_name: str
+    status: str
+    open_tasks: int
+    remaining_estimated_hours: float
+    adjusted_remaining_hours: float = Field(..., description="Remaining estimates scaled by each assignee's actual/estimated ratio")
+    daily_throughput_hours: float = Field(..., description="Hours completed per day over the throughput window")
+    percent_complete: float
+    forecast_completion_date: Optional[date] = Field(None, description="Null while the project has delivered nothing in the window")
+    budget: float
+    actual_cost: float
+    cost_performance_index: Optional[float] = None
+    estimated_cost_at_completion: float
+    variance_at_completion: float
+    computed_at: datetime
+
+# Search Schemas
+class SearchResultType(str, Enum):
+    PROJECT = "project"
+    TASK = "task"
+
+class SearchResult(BaseModel):
+    type: SearchResultType
+    id: uuid.UUID
+    title: str
+    snippet: str
+    rank: float
+    project_id: Optional[uuid.UUID] = None
+    status: Optional[str] = None
+
+class SearchResponse(BaseModel):
+    query: str
+    results: List[SearchResult]
+    has_more: bool
+
 # Notification Schemas
 class NotificationBase(BaseModel):
     title: str
@@ -225,8 +474,23 @@ class NotificationCreate(NotificationBase):
 class NotificationResponse(NotificationBase):
     id: uuid.UUID
     user_id: uuid.UUID
+    related_table: Optional[str] = None
+    related_id: Optional[uuid.UUID] = None
     is_read: bool
     created_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class NotificationPage(BaseModel):
+    items: List[NotificationResponse]
+    next_cursor: Optional[str] = None
+    unread_count: int
+
+class NotificationMarkRead(BaseModel):
+    ids: Optional[List[uuid.UUID]] = Field(None, min_length=1, max_length=1000)
+    before: Optional[datetime] = Field(None, description="Mark everything created at or before this time as read")
+
+class NotificationMarkReadResult(BaseModel):
+    updated: int
+    unread_count: int
\ No newline at end of file
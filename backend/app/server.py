@@ -0,0 +1,208 @@
+"""Production server: gunicorn supervising uvicorn workers.
+
+    python -m app.server                     # WEB_CONCURRENCY workers (default: one per core)
+    python -m app.server --workers 4 --loop uvloop --http httptools
+    python -m app.server --bench             # serve, load-test, report requests/sec per core
+
+Each worker imports the app itself and opens its own database pool and cache
+connections in the lifespan, so nothing is shared across a fork. Send SIGHUP
+to the master process for a graceful reload: new workers start with the
+current code and settings while old workers finish their in-flight requests.
+"""
+from gunicorn.app.base import BaseApplication
+from uvicorn.workers import UvicornWorker
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.config import get_settings, settings
+import argparse
+import asyncio
+import importlib.util
+import multiprocessing
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+def resolve_loop(loop: str) -> str:
+    """The event loop uvicorn will pick for "auto" """
+    if loop == "auto":
+        return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    return loop
+
+def resolve_http(http: str) -> str:
+    """The HTTP parser uvicorn will pick for "auto" """
+    if http == "auto":
+        return "httptools" if importlib.util.find_spec("httptools") else "h11"
+    return http
+
+def default_workers() -> int:
+    return settings.WEB_CONCURRENCY or os.cpu_count() or 1
+
+class ServerWorker(UvicornWorker):
+    """Uvicorn worker configured from settings.
+
+    Gunicorn loads this class by its dotted path, which under
+    ``python -m app.server`` is a second copy of this module, so the
+    configuration comes from settings (see configure_worker) rather than
+    from state set in the master.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.CONFIG_KWARGS = {
+            "loop": settings.SERVER_LOOP,
+            "http": settings.SERVER_HTTP,
+            "lifespan": "on",
+            "timeout_graceful_shutdown": settings.SERVER_GRACEFUL_TIMEOUT_SECONDS,
+        }
+        super().__init__(*args, **kwargs)
+
+def configure_worker(loop: str, http: str):
+    """Make the command line choices the settings workers start with"""
+    os.environ["SERVER_LOOP"] = loop
+    os.environ["SERVER_HTTP"] = http
+    get_settings.cache_clear()
+
+class Server(BaseApplication):
+    def __init__(self, options: Dict[str, Any]):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from app.main import app
+        return app
+
+def server_options(workers: int, host: str, port: int) -> Dict[str, Any]:
+    return {
+        "bind": f"{host}:{port}",
+        "workers": workers,
+        "worker_class": "app.server.ServerWorker",
+        # Workers must not inherit the master's pools or event loop
+        "preload_app": False,
+        "keepalive": settings.SERVER_KEEPALIVE_SECONDS,
+        "graceful_timeout": settings.SERVER_GRACEFUL_TIMEOUT_SECONDS,
+        "max_requests": settings.SERVER_MAX_REQUESTS,
+        "max_requests_jitter": settings.SERVER_MAX_REQUESTS // 10,
+        "proc_name": "erp-api",
+    }
+
+def serve(workers: int, host: str, port: int, loop: str, http: str):
+    configure_worker(loop, http)
+    print(f"Serving on {host}:{port} with {workers} workers (loop={resolve_loop(loop)}, http={resolve_http(http)})")
+    Server(server_options(workers, host, port)).run()
+
+# Benchmark
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def wait_until_ready(port: int, path: str, timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1) as sock:
+                sock.sendall(f"GET {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n".encode())
+                if sock.recv(64).startswith(b"HTTP/1.1 200"):
+                    return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server did not answer {path} within {timeout:.0f}s")
+
+async def keepalive_client(port: int, request: bytes, stop_at: float, latencies: List[float]) -> int:
+    """Send requests over one keep-alive connection until stop_at; returns errors"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    errors = 0
+    try:
+        while time.perf_counter() < stop_at:
+            started = time.perf_counter()
+            writer.write(request)
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - started)
+            if not head.startswith(b"HTTP/1.1 200"):
+                errors += 1
+    finally:
+        writer.close()
+    return errors
+
+def load_process(port: int, path: str, duration: float, connections: int, headers: str = "") -> Tuple[List[float], int]:
+    request = f"GET {path} HTTP/1.1\r\nHost: localhost\r\n{headers}\r\n".encode()
+
+    async def run():
+        latencies: List[float] = []
+        stop_at = time.perf_counter() + duration
+        errors = await asyncio.gather(*[
+            keepalive_client(port, request, stop_at, latencies) for _ in range(connections)
+        ])
+        return latencies, sum(errors)
+
+    return asyncio.run(run())
+
+def percentile(values: List[float], fraction: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+def bench(workers: int, loop: str, http: str, path: str, duration: float, concurrency: int, clients: Optional[int]):
+    """Start the server on a free port, drive it with keep-alive clients and report throughput"""
+    port = free_port()
+    cores = os.cpu_count() or 1
+    clients = clients or max(1, min(cores // 2, concurrency))
+    command = [
+        sys.executable, "-m", "app.server", "--workers", str(workers), "--host", "127.0.0.1",
+        "--port", str(port), "--loop", loop, "--http", http
+    ]
+    server = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+
+    try:
+        wait_until_ready(port, path, timeout=60)
+        # Warm up every worker before measuring
+        load_process(port, path, 1.0, workers)
+
+        with multiprocessing.Pool(clients) as pool:
+            results = pool.starmap(load_process, [(port, path, duration, max(1, concurrency // clients))] * clients)
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=settings.SERVER_GRACEFUL_TIMEOUT_SECONDS + 10)
+
+    latencies = sorted(latency for process_latencies, _ in results for latency in process_latencies)
+    errors = sum(process_errors for _, process_errors in results)
+    throughput = len(latencies) / duration
+    # Clients share the machine, so count only the cores the server could use
+    server_cores = min(workers, cores)
+
+    print(f"workers={workers} loop={resolve_loop(loop)} http={resolve_http(http)} cores={cores} clients={clients}x{max(1, concurrency // clients)}")
+    print(f"GET {path}: {len(latencies)} requests in {duration:.1f}s, {errors} errors")
+    print(f"throughput {throughput:,.0f} req/s, {throughput / server_cores:,.0f} req/s per core")
+    print(f"latency p50 {percentile(latencies, 0.50) * 1000:.2f} ms, p99 {percentile(latencies, 0.99) * 1000:.2f} ms")
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(prog="python -m app.server", description="Run the ERP API in production mode")
+    parser.add_argument("--workers", type=int, default=default_workers(), help="worker processes (default: WEB_CONCURRENCY or one per core)")
+    parser.add_argument("--host", default=settings.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    parser.add_argument("--loop", choices=["auto", "uvloop", "asyncio"], default=settings.SERVER_LOOP)
+    parser.add_argument("--http", choices=["auto", "httptools", "h11"], default=settings.SERVER_HTTP)
+    parser.add_argument("--bench", action="store_true", help="start the server, load-test it and report requests/sec per core")
+    parser.add_argument("--bench-path", default="/health")
+    parser.add_argument("--bench-duration", type=float, default=10.0)
+    parser.add_argument("--bench-concurrency", type=int, default=64)
+    parser.add_argument("--bench-clients", type=int, default=None, help="load generator processes (default: half the cores)")
+    args = parser.parse_args(argv)
+
+    if args.bench:
+        bench(args.workers, args.loop, args.http, args.bench_path, args.bench_duration, args.bench_concurrency, args.bench_clients)
+    else:
+        serve(args.workers, args.host, args.port, args.loop, args.http)
+
+if __name__ == "__main__":
+    main()
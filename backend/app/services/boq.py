@@ -0,0 +1,237 @@
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import asyncio
+import codecs
+import csv
+
+# Columns written by COPY; id and created_at come from table defaults
+BOQ_COPY_COLUMNS = ["project_id", "created_by", "item_description", "unit", "quantity", "rate", "amount", "category"]
+
+# Spreadsheet headers accepted for each BOQ field (compared lower-cased)
+HEADER_ALIASES = {
+    "item_description": ["item_description", "description", "item", "particulars"],
+    "unit": ["unit", "uom"],
+    "quantity": ["quantity", "qty"],
+    "rate": ["rate", "unit_rate", "unit rate"],
+    "category": ["category", "section", "trade"],
+}
+
+REQUIRED_FIELDS = ["item_description", "unit", "quantity", "rate"]
+
+# Limits of the boq DECIMAL(10,2) columns
+MAX_QUANTITY = Decimal("99999999.99")
+MAX_RATE = Decimal("99999999.99")
+# Limit of the DECIMAL(15,2) amount column, which quantity x rate can exceed
+MAX_AMOUNT = Decimal("9999999999999.99")
+
+COPY_BATCH_SIZE = 2000
+MAX_REPORTED_ERRORS = 100
+
+CENTS = Decimal("0.01")
+
+class BOQImportError(Exception):
+    """Raised when an upload cannot be imported"""
+
+    def __init__(self, message: str, errors: Optional[List[Dict[str, Any]]] = None):
+        super().__init__(message)
+        self.errors = errors or []
+
+def _resolve_headers(headers: List[Any]) -> Dict[str, int]:
+    """Map BOQ fields to column positions in the uploaded header row"""
+    normalized = [str(header or "").strip().lower() for header in headers]
+    positions = {}
+
+    for field, aliases in HEADER_ALIASES.items():
+        for alias in aliases:
+            if alias in normalized:
+                positions[field] = normalized.index(alias)
+                break
+
+    missing = [field for field in REQUIRED_FIELDS if field not in positions]
+    if missing:
+        raise BOQImportError(f"Missing required columns: {', '.join(missing)}")
+
+    return positions
+
+def _rows_from_table(rows: Iterator[Tuple]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Turn positional rows (header first) into field dicts numbered by their
+    row in the upload, skipping blank lines"""
+    try:
+        headers = next(rows)
+    except StopIteration:
+        raise BOQImportError("Uploaded file is empty")
+
+    positions = _resolve_headers(list(headers))
+
+    # Data rows start on row 2, after the header
+    for row_number, row in enumerate(rows, start=2):
+        if not row or all(cell in (None, "") for cell in row):
+            continue
+        yield row_number, {
+            field: row[position] if position < len(row) else None
+            for field, position in positions.items()
+        }
+
+def iter_csv_rows(fileobj) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Stream rows from a CSV upload without reading it into memory"""
+    text = codecs.getreader("utf-8-sig")(fileobj)
+    try:
+        yield from _rows_from_table(csv.reader(text))
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise BOQImportError(f"Could not read CSV file: {str(e)}")
+
+def iter_xlsx_rows(fileobj) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Stream rows from the first sheet of an XLSX upload"""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise BOQImportError("XLSX import requires the openpyxl package")
+
+    try:
+        workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    except Exception as e:
+        raise BOQImportError(f"Could not read XLSX file: {str(e)}")
+
+    try:
+        yield from _rows_from_table(workbook.worksheets[0].iter_rows(values_only=True))
+    finally:
+        workbook.close()
+
+def iter_upload_rows(filename: str, fileobj) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return iter_csv_rows(fileobj)
+    if name.endswith(".xlsx"):
+        return iter_xlsx_rows(fileobj)
+    raise BOQImportError("Unsupported file type, upload a .csv or .xlsx file")
+
+def _parse_decimal(value: Any, field: str, maximum: Decimal) -> Decimal:
+    if isinstance(value, (int, float, Decimal)):
+        number = Decimal(str(value))
+    else:
+        cleaned = str(value or "").replace(",", "").replace("₹", "").strip()
+        if not cleaned:
+            raise ValueError(f"{field} is required")
+        try:
+            number = Decimal(cleaned)
+        except InvalidOperation:
+            raise ValueError(f"{field} must be a number")
+
+    if not number.is_finite() or number < 0:
+        raise ValueError(f"{field} must be a non-negative number")
+    if number > maximum:
+        raise ValueError(f"{field} exceeds {maximum}")
+
+    return number.quantize(CENTS, rounding=ROUND_HALF_UP)
+
+def parse_row(raw: Dict[str, Any]) -> Tuple[str, str, Decimal, Decimal, Decimal, Optional[str]]:
+    """Validate one BOQ row and compute its amount"""
+    description = str(raw.get("item_description") or "").strip()
+    unit = str(raw.get("unit") or "").strip()
+
+    if not description:
+        raise ValueError("item_description is required")
+    if not unit:
+        raise ValueError("unit is required")
+    if len(unit) > 50:
+        raise ValueError("unit must be at most 50 characters")
+
+    quantity = _parse_decimal(raw.get("quantity"), "quantity", MAX_QUANTITY)
+    rate = _parse_decimal(raw.get("rate"), "rate", MAX_RATE)
+    amount = (quantity * rate).quantize(CENTS, rounding=ROUND_HALF_UP)
+    if amount > MAX_AMOUNT:
+        raise ValueError(f"amount (quantity x rate) exceeds {MAX_AMOUNT}")
+    category = str(raw.get("category") or "").strip()[:100] or None
+
+    return description, unit, quantity, rate, amount, category
+
+async def import_boq_rows(
+    connection,
+    project_id,
+    user_id,
+    rows: Iterator[Tuple[int, Dict[str, Any]]],
+    replace: bool = False,
+    strict: bool = True
+) -> Dict[str, Any]:
+    """Validate rows as they stream in and load them with COPY in batches.
+
+    Must run inside a transaction so a strict import that hits invalid rows,
+    or a replace that fails half way, leaves the existing BOQ untouched.
+    """
+    if replace:
+        await connection.execute("DELETE FROM boq WHERE project_id = $1", project_id)
+
+    batch = []
+    errors = []
+    rows_imported = 0
+    rows_rejected = 0
+
+    for row_number, raw in rows:
+        try:
+            description, unit, quantity, rate, amount, category = parse_row(raw)
+        except ValueError as e:
+            rows_rejected += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({"row": row_number, "error": str(e)})
+            continue
+
+        batch.append((project_id, user_id, description, unit, quantity, rate, amount, category))
+
+        if len(batch) >= COPY_BATCH_SIZE:
+            if not (strict and rows_rejected):
+                await connection.copy_records_to_table("boq", records=batch, columns=BOQ_COPY_COLUMNS)
+            rows_imported += len(batch)
+            batch = []
+            # Parsing is synchronous; let other requests run between batches
+            await asyncio.sleep(0)
+
+    if strict and rows_rejected:
+        raise BOQImportError(f"{rows_rejected} rows failed validation", errors)
+
+    if batch:
+        await connection.copy_records_to_table("boq", records=batch, columns=BOQ_COPY_COLUMNS)
+        rows_imported += len(batch)
+
+    return {
+        "rows_imported": rows_imported,
+        "rows_rejected": rows_rejected,
+        "errors": errors,
+    }
+
+async def fetch_boq_summary(connection, project_id) -> Optional[Dict[str, Any]]:
+    """Aggregate BOQ amounts by category and compare them with the project budget"""
+    project = await connection.fetchrow("SELECT id, budget FROM projects WHERE id = $1", project_id)
+    if not project:
+        return None
+
+    # Served by idx_boq_project_category
+    rows = await connection.fetch(
+        """
+        SELECT category, count(*) AS line_items, coalesce(sum(amount), 0) AS subtotal
+        FROM boq
+        WHERE project_id = $1
+        GROUP BY category
+        ORDER BY category NULLS LAST
+        """,
+        project_id
+    )
+
+    total_amount = sum((row["subtotal"] for row in rows), Decimal("0"))
+    budget = project["budget"]
+
+    return {
+        "project_id": project["id"],
+        "categories": [
+            {
+                "category": row["category"],
+                "line_items": row["line_items"],
+                "subtotal": row["subtotal"],
+            }
+            for row in rows
+        ],
+        "line_items": sum(row["line_items"] for row in rows),
+        "total_amount": total_amount,
+        "budget": budget,
+        "budget_variance": (budget - total_amount) if budget is not None else None,
+        "within_budget": (total_amount <= budget) if budget is not None else None,
+    }
@@ -0,0 +1,75 @@
+from decimal import Decimal
+from typing import Any, Dict, Optional
+
+# Purchase request statuses that count as committed spend
+COMMITTED_STATUSES = ["approved", "ordered", "received"]
+
+async def fetch_project_costs(connection, project_id) -> Optional[Dict[str, Any]]:
+    """Read a project's rolled-up committed, invoiced and paid totals"""
+    row = await connection.fetchrow(
+        """
+        SELECT p.id AS project_id, p.project_manager_id, p.budget,
+               COALESCE(p.actual_cost, 0) AS actual_cost,
+               COALESCE(pc.committed_amount, 0) AS committed_amount,
+               COALESCE(pc.invoiced_amount, 0) AS invoiced_amount,
+               COALESCE(pc.paid_amount, 0) AS paid_amount,
+               pc.updated_at
+        FROM projects p
+        LEFT JOIN project_costs pc ON pc.project_id = p.id
+        WHERE p.id = $1
+        """,
+        project_id
+    )
+
+    if not row:
+        return None
+
+    costs = dict(row)
+    budget = costs["budget"]
+    costs["remaining_budget"] = (budget - costs["committed_amount"]) if budget is not None else None
+    return costs
+
+async def fetch_category_variance(connection, project_id) -> Dict[str, Any]:
+    """Compare BOQ amounts with committed spend for each category"""
+    rows = await connection.fetch(
+        """
+        WITH estimated AS (
+            SELECT COALESCE(category, '') AS category, SUM(amount) AS boq_amount
+            FROM boq
+            WHERE project_id = $1
+            GROUP BY COALESCE(category, '')
+        )
+        SELECT COALESCE(e.category, c.category) AS category,
+               COALESCE(e.boq_amount, 0) AS boq_amount,
+               COALESCE(c.committed_amount, 0) AS committed_amount
+        FROM estimated e
+        FULL OUTER JOIN (
+            SELECT category, committed_amount FROM project_category_costs WHERE project_id = $1
+        ) c ON c.category = e.category
+        ORDER BY 1
+        """,
+        project_id
+    )
+
+    categories = []
+    for row in rows:
+        boq_amount = row["boq_amount"]
+        committed_amount = row["committed_amount"]
+        variance = boq_amount - committed_amount
+        categories.append({
+            "category": row["category"] or None,
+            "boq_amount": boq_amount,
+            "committed_amount": committed_amount,
+            "variance": variance,
+            "variance_percentage": round(float(variance / boq_amount * 100), 2) if boq_amount else None,
+        })
+
+    return {
+        "categories": categories,
+        "boq_total": sum((c["boq_amount"] for c in categories), Decimal("0")),
+        "committed_total": sum((c["committed_amount"] for c in categories), Decimal("0")),
+    }
+
+async def refresh_project_costs(connection, project_id):
+    """Rebuild a project's rollups from purchase requests and invoices"""
+    await connection.execute("SELECT refresh_project_costs($1)", project_id)
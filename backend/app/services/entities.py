@@ -0,0 +1,16 @@
+"""Column lists and row caches for projects and tasks, shared by the routers"""
+from app.core.entity_cache import EntityCache
+
+PROJECT_COLUMNS = """
+    p.id, p.name, p.description, p.client_name, p.project_manager_id, p.status,
+    p.start_date, p.end_date, p.budget, p.actual_cost, p.version, p.created_at, p.updated_at
+"""
+
+TASK_COLUMNS = """
+    t.id, t.project_id, t.process_id, t.assigned_to, t.created_by, t.title, t.description,
+    t.status, t.priority, t.due_date, t.completed_at, t.estimated_hours, t.actual_hours,
+    t.version, t.created_at, t.updated_at
+"""
+
+project_cache = EntityCache("projects", f"SELECT {PROJECT_COLUMNS} FROM projects p WHERE p.id = $1")
+task_cache = EntityCache("tasks", f"SELECT {TASK_COLUMNS} FROM tasks t WHERE t.id = $1")
@@ -0,0 +1,177 @@
+"""Completion date and cost at completion per active project.
+
+A forecast combines the project's remaining estimated hours, each
+assignee's historical actual/estimated ratio, the hours the project
+delivered over the throughput window and its budget burn. All projects
+being refreshed are computed together in one statement and the results are
+kept in project_forecasts. Writes that can move a forecast mark the project
+in project_forecast_dirty (database/19_project_forecasts.sql), so a read
+only recomputes the projects that changed. The scheduled full refresh moves
+every forecast along with the calendar, since the throughput window slides
+even when no task changes.
+"""
+from typing import List, Optional
+from app.core.config import settings
+from app.core.database import db_manager
+from app.core.single_flight import SingleFlight
+
+ACTIVE_PROJECT_STATUSES = ("planning", "in_progress")
+
+# Completion dates further out than this are left empty, so no estimate can
+# overflow the date arithmetic and fail the refresh for every project
+FORECAST_HORIZON_DAYS = 36500
+
+forecast_flights = SingleFlight()
+
+# Markers are claimed in their own statement, locking them in key order as
+# the triggers do. A write that marks a project while the claim runs holds
+# its marker's row lock until it commits, so the claim waits for it, and
+# the recompute that follows starts a new snapshot that includes the write.
+CLAIM_DIRTY_PROJECTS_SQL = """
+    DELETE FROM project_forecast_dirty
+    WHERE project_id IN (
+        SELECT project_id FROM project_forecast_dirty ORDER BY project_id FOR UPDATE
+    )
+    RETURNING project_id
+"""
+
+# $1 active project statuses, $2 refresh every project, $3 throughput window
+# in days, $4 prior weight in hours for the assignee ratios, $5 the claimed
+# projects, $6 the forecast horizon in days. Estimated hours are adjusted by the assignee's ratio of actual
+# to estimated hours on completed tasks, pulled towards 1 by the prior so a
+# short history does not swing the forecast. Without delivered hours in the window, or
+# beyond the horizon, there is no completion date. Cost at completion scales the cost so far by the share of
+# estimated hours completed (earned value); before any cost or progress it
+# is the larger of budget and cost so far.
+REFRESH_FORECASTS_SQL = """
+    WITH targets AS (
+        SELECT p.id, p.status, COALESCE(p.budget, 0) AS budget, COALESCE(p.actual_cost, 0) AS actual_cost
+        FROM projects p
+        WHERE $2 OR p.id = ANY($5::uuid[])
+    ),
+    active AS (
+        SELECT * FROM targets WHERE status = ANY($1::text[])
+    ),
+    retired AS (
+        DELETE FROM project_forecasts f
+        WHERE f.project_id IN (SELECT id FROM targets)
+          AND f.project_id NOT IN (SELECT id FROM active)
+    ),
+    ratios AS (
+        SELECT t.assigned_to,
+               (SUM(t.actual_hours) + $4::numeric) / (SUM(t.estimated_hours) + $4::numeric) AS ratio
+        FROM tasks t
+        WHERE t.status = 'completed' AND t.estimated_hours > 0 AND t.actual_hours IS NOT NULL
+          AND t.assigned_to IN (
+              SELECT o.assigned_to
+              FROM tasks o
+              JOIN active a ON a.id = o.project_id
+              WHERE o.status IN ('pending', 'in_progress')
+          )
+        GROUP BY t.assigned_to
+    ),
+    work AS (
+        SELECT t.project_id,
+               COUNT(*) FILTER (WHERE t.status IN ('pending', 'in_progress')) AS open_tasks,
+               SUM(COALESCE(t.estimated_hours, 0)) AS total_hours,
+               SUM(COALESCE(t.estimated_hours, 0)) FILTER (WHERE t.status = 'completed') AS completed_hours,
+               SUM(COALESCE(t.estimated_hours, 0)) FILTER (WHERE t.status IN ('pending', 'in_progress')) AS remaining_hours,
+               SUM(COALESCE(t.estimated_hours, 0) * COALESCE(r.ratio, 1))
+                   FILTER (WHERE t.status IN ('pending', 'in_progress')) AS adjusted_hours,
+               SUM(COALESCE(t.actual_hours, t.estimated_hours, 0))
+                   FILTER (WHERE t.status = 'completed' AND t.completed_at >= NOW() - make_interval(days => $3::int)) AS recent_hours
+        FROM tasks t
+        JOIN active a ON a.id = t.project_id
+        LEFT JOIN ratios r ON r.assigned_to = t.assigned_to
+        WHERE t.status <> 'rejected'
+        GROUP BY t.project_id
+    ),
+    progress AS (
+        SELECT a.id, a.budget, a.actual_cost,
+               COALESCE(w.open_tasks, 0) AS open_tasks,
+               COALESCE(w.remaining_hours, 0) AS remaining_hours,
+               COALESCE(w.adjusted_hours, 0) AS adjusted_hours,
+               COALESCE(w.recent_hours, 0)::numeric / $3::int AS throughput,
+               CASE WHEN w.total_hours > 0 THEN COALESCE(w.completed_hours, 0)::numeric / w.total_hours ELSE 0 END AS done
+        FROM active a
+        LEFT JOIN work w ON w.project_id = a.id
+    )
+    INSERT INTO project_forecasts (
+        project_id, open_tasks, remaining_estimated_hours, adjusted_remaining_hours,
+        daily_throughput_hours, percent_complete, forecast_completion_date,
+        cost_performance_index, estimated_cost_at_completion, computed_at
+    )
+    SELECT id, open_tasks, remaining_hours, round(adjusted_hours, 2),
+           round(throughput, 2), round(done * 100, 2),
+           CASE
+               WHEN adjusted_hours = 0 THEN CURRENT_DATE
+               WHEN throughput > 0 AND adjusted_hours / throughput <= $6
+                   THEN CURRENT_DATE + ceil(adjusted_hours / throughput)::int
+           END,
+           CASE WHEN actual_cost > 0 AND done > 0 THEN round(budget * done / actual_cost, 3) END,
+           CASE WHEN actual_cost > 0 AND done > 0 THEN round(actual_cost / done, 2) ELSE GREATEST(budget, actual_cost) END,
+           NOW()
+    FROM progress
+    ON CONFLICT (project_id) DO UPDATE SET
+        open_tasks = EXCLUDED.open_tasks,
+        remaining_estimated_hours = EXCLUDED.remaining_estimated_hours,
+        adjusted_remaining_hours = EXCLUDED.adjusted_remaining_hours,
+        daily_throughput_hours = EXCLUDED.daily_throughput_hours,
+        percent_complete = EXCLUDED.percent_complete,
+        forecast_completion_date = EXCLUDED.forecast_completion_date,
+        cost_performance_index = EXCLUDED.cost_performance_index,
+        estimated_cost_at_completion = EXCLUDED.estimated_cost_at_completion,
+        computed_at = EXCLUDED.computed_at
+    RETURNING project_id
+"""
+
+async def refresh_project_forecasts(full: bool = False) -> int:
+    """Recompute the forecasts of changed projects, or of every project; returns how many were written"""
+    async with db_manager.transaction() as connection:
+        claimed = [row["project_id"] for row in await connection.fetch(CLAIM_DIRTY_PROJECTS_SQL)]
+        if not claimed and not full:
+            return 0
+
+        rows = await connection.fetch(
+            REFRESH_FORECASTS_SQL,
+            list(ACTIVE_PROJECT_STATUSES), full,
+            settings.FORECAST_THROUGHPUT_WINDOW_DAYS, settings.FORECAST_RATIO_PRIOR_HOURS,
+            claimed, FORECAST_HORIZON_DAYS
+        )
+    return len(rows)
+
+async def refresh_all_project_forecasts() -> int:
+    return await forecast_flights.run("full", lambda: refresh_project_forecasts(full=True))
+
+async def fetch_project_forecasts(project_manager_id: Optional[str] = None) -> List[dict]:
+    """Forecasts of active projects, brought up to date first"""
+    # Concurrent readers in this worker share one refresh
+    await forecast_flights.run("changed", refresh_project_forecasts)
+
+    query = """
+        SELECT f.*, p.name AS project_name, p.status, p.budget, p.actual_cost
+        FROM project_forecasts f
+        JOIN projects p ON p.id = f.project_id
+    """
+    args = []
+
+    if project_manager_id:
+        query += " WHERE p.project_manager_id = $1"
+        args.append(project_manager_id)
+
+    query += " ORDER BY f.forecast_completion_date NULLS LAST, p.name"
+
+    # Read where the refresh just wrote
+    rows = await db_manager.execute_query(query, *args)
+
+    forecasts = []
+    for row in rows:
+        budget = float(row["budget"] or 0)
+        cost_at_completion = float(row["estimated_cost_at_completion"])
+        forecasts.append({
+            **dict(row),
+            "budget": budget,
+            "actual_cost": float(row["actual_cost"] or 0),
+            "variance_at_completion": round(budget - cost_at_completion, 2),
+        })
+    return forecasts
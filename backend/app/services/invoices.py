@@ -0,0 +1,82 @@
+from datetime import date
+from decimal import Decimal
+from typing import Any, Callable, Dict, List
+from app.core.database import db_manager
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Purchase request totals within this fraction of the invoice total count as a match
+MATCH_TOLERANCE = Decimal("0.05")
+
+# Re-uploading an invoice only rewrites it while accounts has not acted on it,
+# and only when something changed, so repeat uploads are no-ops.
+UPSERT_INVOICES_SQL = """
+    INSERT INTO invoices (
+        vendor_id, project_id, invoice_number, invoice_date, due_date,
+        subtotal, tax_amount, total_amount
+    )
+    SELECT * FROM unnest(
+        $1::uuid[], $2::uuid[], $3::text[], $4::date[], $5::date[],
+        $6::numeric[], $7::numeric[], $8::numeric[]
+    )
+    ON CONFLICT (invoice_number) DO UPDATE SET
+        vendor_id = EXCLUDED.vendor_id,
+        project_id = EXCLUDED.project_id,
+        invoice_date = EXCLUDED.invoice_date,
+        due_date = EXCLUDED.due_date,
+        subtotal = EXCLUDED.subtotal,
+        tax_amount = EXCLUDED.tax_amount,
+        total_amount = EXCLUDED.total_amount
+    WHERE invoices.status = 'pending'
+      AND (invoices.vendor_id, invoices.project_id, invoices.invoice_date, invoices.due_date,
+           invoices.subtotal, invoices.tax_amount, invoices.total_amount)
+          IS DISTINCT FROM
+          (EXCLUDED.vendor_id, EXCLUDED.project_id, EXCLUDED.invoice_date, EXCLUDED.due_date,
+           EXCLUDED.subtotal, EXCLUDED.tax_amount, EXCLUDED.total_amount)
+    RETURNING *, (xmax = 0) AS inserted
+"""
+
+# Served by the partial index idx_invoices_unpaid_due_date. The statuses an
+# invoice can still go overdue from are written out to match the index
+# predicate (database/08_invoice_processing.sql); as a parameter they would
+# not let the planner use it.
+OVERDUE_SWEEP_SQL = """
+    UPDATE invoices SET status = 'overdue'
+    WHERE status IN ('pending', 'approved') AND due_date < $1
+"""
+
+# Served by idx_purchase_requests_project_vendor
+MATCH_PURCHASE_REQUESTS_SQL = """
+    SELECT pr.*, abs(pr.total_amount - i.total_amount) AS amount_difference
+    FROM invoices i
+    JOIN vendors v ON v.id = i.vendor_id
+    JOIN purchase_requests pr
+      ON pr.project_id = i.project_id
+     AND lower(pr.vendor_name) = lower(v.name)
+    WHERE i.id = $1
+      AND pr.status IN ('approved', 'ordered', 'received')
+      AND abs(pr.total_amount - i.total_amount) <= i.total_amount * $2
+    ORDER BY amount_difference, pr.created_at
+    LIMIT 10
+"""
+
+async def upsert_invoices(connection, invoices: List[Dict[str, Any]]):
+    """Insert or refresh a batch of invoices in one statement"""
+    columns = ["vendor_id", "project_id", "invoice_number", "invoice_date", "due_date",
+               "subtotal", "tax_amount", "total_amount"]
+    arrays = [[invoice[column] for invoice in invoices] for column in columns]
+    return await connection.fetch(UPSERT_INVOICES_SQL, *arrays)
+
+async def find_purchase_request_matches(connection, invoice_id):
+    return await connection.fetch(MATCH_PURCHASE_REQUESTS_SQL, invoice_id, MATCH_TOLERANCE)
+
+async def sweep_overdue_invoices(clock: Callable[[], date] = date.today) -> int:
+    """Mark unpaid invoices past their due date as overdue; returns the count"""
+    result = await db_manager.execute_command(OVERDUE_SWEEP_SQL, clock())
+    count = int(result.split()[-1])
+
+    if count:
+        logger.info("Marked %d invoices overdue", count)
+
+    return count
@@ -0,0 +1,85 @@
+"""Recurring tasks generated from process frequencies.
+
+Daily, weekly and monthly processes describe duties each user of the role
+performs every period. One statement generates the due tasks for all of
+them: for each recurring process it takes the periods after its watermark
+in process_recurrences (at most RECURRING_TASK_CATCH_UP_DAYS back) up to
+the current one, crosses them with the active users of the role and inserts
+the tasks in one go. The current period is always included, so users who
+joined since the last run get their task for it. Each task's recurrence key
+(process, user, period start) makes reruns and concurrent runs insert it
+once (database/21_recurring_process_tasks.sql).
+"""
+from datetime import date, timedelta
+from typing import Callable
+from app.core.config import settings
+from app.core.database import db_manager
+import logging
+
+logger = logging.getLogger(__name__)
+
+# processes.frequency (case-insensitive) to the period it recurs over;
+# "Per Project" and "As Required" processes are not scheduled
+RECURRENCE_UNITS = {"daily": "day", "weekly": "week", "monthly": "month"}
+
+# $1/$2 frequencies and their units, $3 today, $4 the earliest day missed
+# periods are caught up from. Weeks start on Monday. A task is due when its
+# period ends.
+GENERATE_RECURRING_TASKS_SQL = """
+    WITH schedule AS (
+        SELECT p.id, p.role_id, p.name, p.description, f.unit,
+               ('1 ' || f.unit)::interval AS step,
+               date_trunc(f.unit, $3::timestamp) AS current_period,
+               w.generated_through
+        FROM processes p
+        JOIN unnest($1::text[], $2::text[]) AS f(frequency, unit) ON f.frequency = lower(p.frequency)
+        LEFT JOIN process_recurrences w ON w.process_id = p.id
+    ),
+    periods AS (
+        SELECT s.id, s.role_id, s.name, s.description, s.step, period::date AS period_start
+        FROM schedule s
+        CROSS JOIN LATERAL generate_series(
+            LEAST(
+                GREATEST(
+                    COALESCE(s.generated_through + s.step, s.current_period),
+                    date_trunc(s.unit, $4::timestamp)
+                ),
+                s.current_period
+            ),
+            s.current_period,
+            s.step
+        ) AS period
+    ),
+    advanced AS (
+        INSERT INTO process_recurrences AS r (process_id, generated_through)
+        SELECT id, max(period_start) FROM periods GROUP BY id
+        ON CONFLICT (process_id) DO UPDATE SET
+            generated_through = GREATEST(r.generated_through, EXCLUDED.generated_through),
+            updated_at = NOW()
+    )
+    INSERT INTO tasks (process_id, assigned_to, title, description, priority, due_date, recurrence_key)
+    SELECT pe.id, u.id,
+           left(pe.name || ' (' || to_char(pe.period_start, 'YYYY-MM-DD') || ')', 255),
+           pe.description, 'medium',
+           (pe.period_start + pe.step)::timestamptz,
+           pe.id || ':' || u.id || ':' || pe.period_start
+    FROM periods pe
+    JOIN users u ON u.role_id = pe.role_id AND u.is_active
+    ORDER BY pe.period_start, pe.id, u.id
+    ON CONFLICT (recurrence_key) DO NOTHING
+    RETURNING id
+"""
+
+async def generate_recurring_tasks(clock: Callable[[], date] = date.today) -> int:
+    """Create the recurring tasks due up to today; returns the number created"""
+    today = clock()
+    rows = await db_manager.execute_query(
+        GENERATE_RECURRING_TASKS_SQL,
+        list(RECURRENCE_UNITS), list(RECURRENCE_UNITS.values()),
+        today, today - timedelta(days=settings.RECURRING_TASK_CATCH_UP_DAYS)
+    )
+
+    if rows:
+        logger.info("Created %d recurring tasks", len(rows))
+
+    return len(rows)
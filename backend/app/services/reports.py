@@ -0,0 +1,369 @@
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from app.models.schemas import DashboardStats, ProjectProgress
+from app.core.cache_backend import get_cache_backend
+from app.core.config import settings
+from app.core.database import get_supabase, db_manager
+from app.core.http_cache import http_date
+from app.core.single_flight import SingleFlight
+from app.services.costs import COMMITTED_STATUSES
+from starlette.concurrency import run_in_threadpool
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Concurrent requests for the same report share one computation
+report_flights = SingleFlight()
+
+MANAGER_ROLES = ["businessOwner", "projectManager"]
+
+# Matches the default limit of GET /analytics/projects/progress
+DEFAULT_PROGRESS_LIMIT = 10
+
+PRECOMPUTE_LEASE_KEY = "lease:report-precompute"
+
+def report_key(name: str, scope: str, params: Dict[str, Any]) -> str:
+    query = urlencode(sorted((key, "" if value is None else str(value)) for key, value in params.items()))
+    return f"report:{name}:{scope}:{query}"
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+async def store_report(key: str, compute: Callable[[], Awaitable[Any]], ttl_seconds: float) -> Dict[str, Any]:
+    """Compute a report and cache it as a snapshot stamped with its computation time"""
+    snapshot = {
+        "data": jsonable_encoder(await compute()),
+        "computed_at": utc_now().isoformat()
+    }
+    await get_cache_backend().set(key, snapshot, ttl_seconds)
+    return snapshot
+
+async def cached_report(name: str, scope: str, params: Dict[str, Any], compute: Callable[[], Awaitable[Any]]) -> Dict[str, Any]:
+    """Serve a report snapshot from the cache, computing it at most once per key at a time.
+
+    ``scope`` must capture everything about the caller that changes the
+    result (the role, plus the user for per-user reports). Returns
+    ``{"data": ..., "computed_at": ...}``.
+    """
+    key = report_key(name, scope, params)
+
+    cached = await get_cache_backend().get(key)
+    if cached is not None:
+        return cached
+
+    return await report_flights.run(key, lambda: store_report(key, compute, settings.REPORT_CACHE_TTL_SECONDS))
+
+def set_freshness_headers(response: Response, snapshot: Dict[str, Any]):
+    computed_at = datetime.fromisoformat(snapshot["computed_at"])
+    response.headers["Last-Modified"] = http_date(computed_at)
+    response.headers["X-Report-Computed-At"] = snapshot["computed_at"]
+
+async def compute_executive_dashboard() -> DashboardStats:
+    """Get executive dashboard for Business Owner"""
+    # Counts and budget totals aggregated in the database in one round trip
+    row = await db_manager.execute_one(
+        """
+        SELECT p.total_projects, p.active_projects, p.total_budget, p.actual_spend,
+               (SELECT count(*) FROM tasks WHERE status = 'pending') AS pending_tasks,
+               (SELECT count(*) FROM tasks WHERE status = 'completed') AS completed_tasks,
+               (SELECT count(*) FROM purchase_requests WHERE status = 'pending') AS pending_approvals
+        FROM (
+            SELECT count(*) AS total_projects,
+                   count(*) FILTER (WHERE status IN ('planning', 'in_progress')) AS active_projects,
+                   COALESCE(SUM(budget), 0) AS total_budget,
+                   COALESCE(SUM(actual_cost), 0) AS actual_spend
+            FROM projects
+        ) p
+        """,
+        readonly=True
+    )
+
+    return DashboardStats(
+        total_projects=row["total_projects"],
+        active_projects=row["active_projects"],
+        pending_tasks=row["pending_tasks"],
+        completed_tasks=row["completed_tasks"],
+        pending_approvals=row["pending_approvals"],
+        total_budget=float(row["total_budget"]),
+        actual_spend=float(row["actual_spend"])
+    )
+
+def compute_manager_dashboard(manager_id: str) -> DashboardStats:
+    """Get dashboard for Project Manager"""
+    supabase = get_supabase()
+    
+    # Projects managed by this PM
+    total_projects_result = supabase.table("projects").select("id", count="exact").eq("project_manager_id", manager_id).execute()
+    
+    active_projects_result = supabase.table("projects").select("id", count="exact").eq("project_manager_id", manager_id).in_("status", ["planning", "in_progress"]).execute()
+    
+    # Tasks in PM's projects
+    project_ids_result = supabase.table("projects").select("id").eq("project_manager_id", manager_id).execute()
+    project_ids = [p["id"] for p in project_ids_result.data]
+    
+    if project_ids:
+        pending_tasks_result = supabase.table("tasks").select("id", count="exact").in_("project_id", project_ids).eq("status", "pending").execute()
+        completed_tasks_result = supabase.table("tasks").select("id", count="exact").in_("project_id", project_ids).eq("status", "completed").execute()
+        
+        # Purchase requests for PM's projects
+        pending_approvals_result = supabase.table("purchase_requests").select("id", count="exact").in_("project_id", project_ids).eq("status", "pending").execute()
+        
+        # Budget for PM's projects
+        budget_result = supabase.table("projects").select("budget, actual_cost").eq("project_manager_id", manager_id).execute()
+    else:
+        pending_tasks_result = type('obj', (object,), {'count': 0})
+        completed_tasks_result = type('obj', (object,), {'count': 0})
+        pending_approvals_result = type('obj', (object,), {'count': 0})
+        budget_result = type('obj', (object,), {'data': []})
+    
+    total_budget = sum(float(p.get("budget", 0) or 0) for p in budget_result.data)
+    actual_spend = sum(float(p.get("actual_cost", 0) or 0) for p in budget_result.data)
+    
+    return DashboardStats(
+        total_projects=total_projects_result.count,
+        active_projects=active_projects_result.count,
+        pending_tasks=pending_tasks_result.count,
+        completed_tasks=completed_tasks_result.count,
+        pending_approvals=pending_approvals_result.count,
+        total_budget=total_budget,
+        actual_spend=actual_spend
+    )
+
+async def compute_projects_progress(limit: int, project_manager_id: Optional[str] = None) -> List[ProjectProgress]:
+    """Task completion and budget use per project, from the trigger-maintained task counters"""
+    query = """
+        SELECT p.id, p.name, p.budget, p.actual_cost,
+               COALESCE(s.total_tasks, 0) AS total_tasks,
+               COALESCE(s.completed_tasks, 0) AS completed_tasks,
+               COALESCE(s.estimated_hours, 0) AS estimated_hours,
+               COALESCE(s.actual_hours, 0) AS actual_hours
+        FROM projects p
+        LEFT JOIN project_task_stats s ON s.project_id = p.id
+    """
+    args = []
+
+    if project_manager_id:
+        query += " WHERE p.project_manager_id = $1"
+        args.append(project_manager_id)
+
+    query += f" ORDER BY p.created_at, p.id LIMIT ${len(args) + 1}"
+    args.append(limit)
+
+    rows = await db_manager.execute_query(query, *args, readonly=True)
+
+    progress_list = []
+
+    for row in rows:
+        total_tasks = row["total_tasks"]
+        completed_tasks = row["completed_tasks"]
+
+        progress_percentage = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
+
+        progress_list.append(ProjectProgress(
+            project_id=row["id"],
+            project_name=row["name"],
+            progress_percentage=round(progress_percentage, 2),
+            tasks_completed=completed_tasks,
+            total_tasks=total_tasks,
+            estimated_hours=row["estimated_hours"],
+            actual_hours=row["actual_hours"],
+            budget_used=float(row["actual_cost"] or 0),
+            total_budget=float(row["budget"] or 0)
+        ))
+
+    return progress_list
+
+async def compute_financial_report(start_date: date, end_date: date) -> Dict[str, Any]:
+    """Project and purchase totals for projects and requests created in the window"""
+    # Window bounds: whole days, end date inclusive
+    window_start = datetime.combine(start_date, time.min, tzinfo=timezone.utc)
+    window_end = datetime.combine(end_date + timedelta(days=1), time.min, tzinfo=timezone.utc)
+
+    # Project totals come from the trigger-maintained project_costs rollups
+    projects_row = await db_manager.execute_one(
+        """
+        SELECT count(*) AS count,
+               COALESCE(SUM(p.budget), 0) AS total_budget,
+               COALESCE(SUM(p.actual_cost), 0) AS total_spent,
+               COALESCE(SUM(pc.committed_amount), 0) AS committed,
+               COALESCE(SUM(pc.invoiced_amount), 0) AS invoiced,
+               COALESCE(SUM(pc.paid_amount), 0) AS paid
+        FROM projects p
+        LEFT JOIN project_costs pc ON pc.project_id = p.id
+        WHERE p.created_at >= $1 AND p.created_at < $2
+        """,
+        window_start, window_end,
+        readonly=True
+    )
+
+    # Purchase activity in the window, aggregated in the database
+    purchases_row = await db_manager.execute_one(
+        """
+        SELECT count(*) AS total_requests,
+               COALESCE(SUM(total_amount), 0) AS total_value,
+               count(*) FILTER (WHERE status = ANY($3::text[])) AS approved_requests,
+               COALESCE(SUM(total_amount) FILTER (WHERE status = ANY($3::text[])), 0) AS approved_value
+        FROM purchase_requests
+        WHERE created_at >= $1 AND created_at < $2
+        """,
+        window_start, window_end, COMMITTED_STATUSES,
+        readonly=True
+    )
+
+    total_budget = float(projects_row["total_budget"])
+    total_spent = float(projects_row["total_spent"])
+    total_requests = purchases_row["total_requests"]
+
+    return {
+        "period": {
+            "start_date": start_date,
+            "end_date": end_date
+        },
+        "projects": {
+            "count": projects_row["count"],
+            "total_budget": total_budget,
+            "total_spent": total_spent,
+            "committed": float(projects_row["committed"]),
+            "invoiced": float(projects_row["invoiced"]),
+            "paid": float(projects_row["paid"]),
+            "budget_utilization": (total_spent / total_budget * 100) if total_budget > 0 else 0
+        },
+        "purchases": {
+            "total_requests": total_requests,
+            "total_value": float(purchases_row["total_value"]),
+            "approved_value": float(purchases_row["approved_value"]),
+            "approval_rate": (purchases_row["approved_requests"] / total_requests * 100) if total_requests else 0
+        }
+    }
+
+async def compute_productivity_report(role_id: Optional[str] = None) -> Dict[str, Any]:
+    """Task counts and completion rate per active user, from the trigger-maintained task counters"""
+    query = """
+        SELECT u.id, u.full_name, u.role_id,
+               COALESCE(s.total_tasks, 0) AS total_tasks,
+               COALESCE(s.completed_tasks, 0) AS completed_tasks,
+               COALESCE(s.pending_tasks, 0) AS pending_tasks,
+               COALESCE(s.in_progress_tasks, 0) AS in_progress_tasks,
+               COALESCE(s.actual_hours, 0) AS actual_hours
+        FROM users u
+        LEFT JOIN user_task_stats s ON s.user_id = u.id
+        WHERE u.is_active = true
+    """
+    args = []
+
+    if role_id:
+        query += " AND u.role_id = $1"
+        args.append(role_id)
+
+    rows = await db_manager.execute_query(query + " ORDER BY u.full_name, u.id", *args, readonly=True)
+
+    productivity_data = []
+
+    for row in rows:
+        # Calculate productivity metrics
+        completion_rate = (row["completed_tasks"] / row["total_tasks"] * 100) if row["total_tasks"] > 0 else 0
+
+        productivity_data.append({
+            "user_id": str(row["id"]),
+            "full_name": row["full_name"],
+            "role_id": row["role_id"],
+            "total_tasks": row["total_tasks"],
+            "completed_tasks": row["completed_tasks"],
+            "pending_tasks": row["pending_tasks"],
+            "in_progress_tasks": row["in_progress_tasks"],
+            "actual_hours": row["actual_hours"],
+            "completion_rate": round(completion_rate, 2)
+        })
+
+    return {
+        "role_filter": role_id,
+        "users": productivity_data,
+        "summary": {
+            "total_users": len(productivity_data),
+            "average_completion_rate": round(sum(u["completion_rate"] for u in productivity_data) / len(productivity_data), 2) if productivity_data else 0
+        }
+    }
+
+def standard_financial_windows(today: date) -> List[Tuple[date, date]]:
+    """The windows dashboards ask for: the default last 30 days, and month to date"""
+    return [
+        (today - timedelta(days=30), today),
+        (today.replace(day=1), today)
+    ]
+
+def list_project_manager_ids() -> List[str]:
+    supabase = get_supabase()
+
+    result = supabase.table("users").select("id").eq("role_id", "projectManager").eq("is_active", True).execute()
+
+    return [user["id"] for user in result.data]
+
+async def precompute_reports(clock: Callable[[], date] = date.today) -> int:
+    """Refresh the standard report snapshots; returns how many were stored.
+
+    Snapshots outlive the refresh interval so requests between runs never
+    fall through to a live computation. With a shared backend, a lease lets
+    only one worker refresh per interval.
+    """
+    backend = get_cache_backend()
+    interval = settings.REPORT_PRECOMPUTE_INTERVAL_SECONDS
+
+    if not await backend.add(PRECOMPUTE_LEASE_KEY, utc_now().isoformat(), interval * 0.9):
+        return 0
+
+    ttl_seconds = interval * 2
+    today = clock()
+    try:
+        manager_ids = await run_in_threadpool(list_project_manager_ids)
+    except Exception:
+        logger.exception("Failed to list project managers for report precomputation")
+        manager_ids = []
+
+    reports = [
+        ("dashboard", "businessOwner", {}, compute_executive_dashboard),
+        ("projects-progress", "businessOwner:all", {"limit": DEFAULT_PROGRESS_LIMIT},
+         lambda: compute_projects_progress(DEFAULT_PROGRESS_LIMIT)),
+    ]
+
+    for start_date, end_date in standard_financial_windows(today):
+        reports.append((
+            "financial", "businessOwner", {"start_date": start_date, "end_date": end_date},
+            lambda start_date=start_date, end_date=end_date: compute_financial_report(start_date, end_date)
+        ))
+
+    # Productivity does not depend on the caller, but is cached per role;
+    # compute it once and store it under each role's key
+    productivity = {}
+
+    async def compute_productivity_once():
+        if "report" not in productivity:
+            productivity["report"] = await compute_productivity_report()
+        return productivity["report"]
+
+    for role in MANAGER_ROLES:
+        reports.append(("productivity", role, {"role_id": None}, compute_productivity_once))
+
+    for manager_id in manager_ids:
+        reports.append((
+            "dashboard", f"projectManager:{manager_id}", {},
+            lambda manager_id=manager_id: run_in_threadpool(compute_manager_dashboard, manager_id)
+        ))
+        reports.append((
+            "projects-progress", f"projectManager:{manager_id}", {"limit": DEFAULT_PROGRESS_LIMIT},
+            lambda manager_id=manager_id: compute_projects_progress(DEFAULT_PROGRESS_LIMIT, manager_id)
+        ))
+
+    stored = 0
+    for name, scope, params, compute in reports:
+        try:
+            key = report_key(name, scope, params)
+            await report_flights.run(key, lambda: store_report(key, compute, ttl_seconds))
+            stored += 1
+        except Exception:
+            logger.exception("Failed to precompute %s report for %s", name, scope)
+
+    logger.info("Precomputed %d report snapshots", stored)
+    return stored
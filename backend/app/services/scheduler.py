@@ -0,0 +1,55 @@
+from typing import Awaitable, Callable, List, Optional
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ScheduledJob:
+    def __init__(self, name: str, func: Callable[[], Awaitable], interval_seconds: float, run_at_startup: bool):
+        self.name = name
+        self.func = func
+        self.interval_seconds = interval_seconds
+        self.run_at_startup = run_at_startup
+
+class Scheduler:
+    """Runs coroutine jobs at fixed intervals on the application's event loop.
+
+    Every worker runs its own scheduler, so jobs must be safe to run
+    concurrently from several processes (set-based, idempotent statements).
+    """
+
+    def __init__(self):
+        self._jobs: List[ScheduledJob] = []
+        self._tasks: List[asyncio.Task] = []
+
+    def add_job(self, name: str, func: Callable[[], Awaitable], interval_seconds: float, run_at_startup: bool = False):
+        self._jobs.append(ScheduledJob(name, func, interval_seconds, run_at_startup))
+
+    async def run_job(self, job: ScheduledJob):
+        try:
+            await job.func()
+        except Exception:
+            logger.exception("Scheduled job %s failed", job.name)
+
+    async def _loop(self, job: ScheduledJob):
+        if job.run_at_startup:
+            await self.run_job(job)
+        while True:
+            await asyncio.sleep(job.interval_seconds)
+            await self.run_job(job)
+
+    def get_job(self, name: str) -> Optional[ScheduledJob]:
+        return next((job for job in self._jobs if job.name == name), None)
+
+    async def start(self):
+        for job in self._jobs:
+            self._tasks.append(asyncio.create_task(self._loop(job), name=f"scheduler:{job.name}"))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+# Global scheduler, started from the application lifespan
+scheduler = Scheduler()
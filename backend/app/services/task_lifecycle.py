@@ -0,0 +1,25 @@
+from fastapi import HTTPException, status
+from typing import Dict, List, Set
+from app.models.schemas import TaskStatus
+
+# Allowed status changes. Completed and rejected tasks can be reopened;
+# keeping the current status is always allowed so client retries are no-ops.
+TASK_TRANSITIONS: Dict[TaskStatus, Set[TaskStatus]] = {
+    TaskStatus.PENDING: {TaskStatus.IN_PROGRESS, TaskStatus.COMPLETED, TaskStatus.REJECTED},
+    TaskStatus.IN_PROGRESS: {TaskStatus.PENDING, TaskStatus.COMPLETED, TaskStatus.REJECTED},
+    TaskStatus.COMPLETED: {TaskStatus.IN_PROGRESS},
+    TaskStatus.REJECTED: {TaskStatus.PENDING},
+}
+
+def can_transition(current: TaskStatus, target: TaskStatus) -> bool:
+    return current == target or target in TASK_TRANSITIONS[current]
+
+def allowed_sources(target: TaskStatus) -> List[str]:
+    """Statuses a task may be in for an update to ``target`` to apply"""
+    return [current.value for current in TaskStatus if can_transition(current, target)]
+
+def transition_conflict(current: TaskStatus, target: TaskStatus) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"Cannot move a {current.value} task to {target.value}"
+    )
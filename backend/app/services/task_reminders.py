@@ -0,0 +1,81 @@
+"""Reminders for open tasks that are overdue or due soon.
+
+Each sweep is one statement: it finds assigned open tasks due before the end
+of the horizon (idx_tasks_open_due_date), claims the reminders not yet sent
+for their current due date in task_due_reminders, and writes one digest
+notification per assignee for the claimed tasks. Running it again, or from
+several workers at once, sends nothing twice.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+from app.core.config import settings
+from app.core.database import db_manager
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Tasks named in a digest; the rest are counted
+DIGEST_TITLES = 5
+
+# $1 now, $2 end of the due-soon horizon, $3 titles per digest. The status
+# and assignee conditions match the partial index predicate. Reminders
+# already sent are skipped before the insert; the conflict clause only
+# settles races between concurrent sweeps.
+SWEEP_DUE_TASKS_SQL = """
+    WITH due AS (
+        SELECT id, assigned_to, title, due_date,
+               CASE WHEN due_date < $1 THEN 'overdue' ELSE 'due_soon' END AS kind
+        FROM tasks
+        WHERE status IN ('pending', 'in_progress') AND assigned_to IS NOT NULL
+          AND due_date < $2
+    ),
+    claimed AS (
+        INSERT INTO task_due_reminders AS r (task_id, kind, due_date, sent_at)
+        SELECT id, kind, due_date, $1 FROM due
+        WHERE NOT EXISTS (
+            SELECT 1 FROM task_due_reminders sent
+            WHERE sent.task_id = due.id AND sent.kind = due.kind AND sent.due_date = due.due_date
+        )
+        ON CONFLICT (task_id, kind) DO UPDATE SET due_date = EXCLUDED.due_date, sent_at = EXCLUDED.sent_at
+        WHERE r.due_date IS DISTINCT FROM EXCLUDED.due_date
+        RETURNING task_id, kind
+    ),
+    digests AS (
+        SELECT d.assigned_to,
+               count(*) AS tasks,
+               count(*) FILTER (WHERE d.kind = 'overdue') AS overdue,
+               count(*) FILTER (WHERE d.kind = 'due_soon') AS due_soon,
+               (array_agg(d.title ORDER BY d.due_date, d.id))[1:$3] AS titles,
+               min(d.id::text)::uuid AS first_task_id
+        FROM due d
+        JOIN claimed c ON c.task_id = d.id AND c.kind = d.kind
+        GROUP BY d.assigned_to
+    )
+    INSERT INTO notifications (user_id, title, message, type, related_table, related_id)
+    SELECT assigned_to,
+           CASE WHEN overdue > 0 THEN 'Overdue Tasks' ELSE 'Tasks Due Soon' END,
+           concat_ws(', ',
+               CASE WHEN overdue > 0 THEN overdue || ' overdue' END,
+               CASE WHEN due_soon > 0 THEN due_soon || ' due soon' END
+           ) || ': ' || array_to_string(titles, ', ')
+             || CASE WHEN tasks > cardinality(titles) THEN ' and ' || (tasks - cardinality(titles)) || ' more' ELSE '' END,
+           'reminder', 'tasks',
+           CASE WHEN tasks = 1 THEN first_task_id END
+    FROM digests
+    RETURNING user_id
+"""
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+async def sweep_due_tasks(clock: Callable[[], datetime] = utc_now) -> int:
+    """Send reminder digests for newly overdue and due-soon tasks; returns the number of digests"""
+    now = clock()
+    rows = await db_manager.execute_query(
+        SWEEP_DUE_TASKS_SQL, now, now + timedelta(hours=settings.TASK_DUE_SOON_HOURS), DIGEST_TITLES
+    )
+
+    if rows:
+        logger.info("Sent task reminder digests to %d users", len(rows))
+
+    return len(rows)
@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional, Tuple
+from fastapi import HTTPException, status
+from app.core.config import settings
+from app.core.database import db_manager
+import base64
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+PRUNE_TOMBSTONES_SQL = "DELETE FROM task_tombstones WHERE deleted_at < $1"
+
+# Transactions below this id have all finished, and every later write gets a
+# higher one (database/22_task_sync_transaction_ids.sql). As the first
+# statement of a repeatable read transaction it is the xmin of the snapshot
+# the sync reads with.
+SYNC_HORIZON_SQL = "SELECT pg_snapshot_xmin(pg_current_snapshot())"
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+def tombstone_horizon(clock: Callable[[], datetime] = utc_now) -> datetime:
+    """Oldest sync position that still has complete tombstones"""
+    return clock() - timedelta(days=settings.TASK_TOMBSTONE_RETENTION_DAYS)
+
+def encode_sync_cursor(changed_at: datetime, change_xid: int, row_id) -> str:
+    """Encode the last change a sync returned: its time, for expiry, and its
+    (transaction id, row id) position"""
+    raw = f"{changed_at.isoformat()}|{change_xid}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_sync_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, int, uuid.UUID]]:
+    """Decode a cursor produced by encode_sync_cursor"""
+    if not cursor:
+        return None
+
+    try:
+        parts = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+    except (ValueError, UnicodeDecodeError):
+        parts = []
+
+    if len(parts) == 2:
+        # Issued before changes recorded their transaction ids
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Sync cursor has expired; fetch /tasks/my-tasks in full"
+        )
+
+    try:
+        changed_at, change_xid, row_id = parts
+        return datetime.fromisoformat(changed_at), int(change_xid), uuid.UUID(row_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid sync cursor"
+        )
+
+async def prune_task_tombstones(clock: Callable[[], datetime] = utc_now) -> int:
+    """Delete tombstones older than the retention window; returns the count"""
+    result = await db_manager.execute_command(PRUNE_TOMBSTONES_SQL, tombstone_horizon(clock))
+    count = int(result.split()[-1])
+
+    if count:
+        logger.info("Pruned %d task tombstones", count)
+
+    return count
@@ -0,0 +1,173 @@
+"""Open workload per assignee, kept in memory for assignee recommendations.
+
+The index holds every open (pending or in-progress) task's assignee, status,
+due date and estimate. It is loaded when the change listener connects and
+then follows the task_workload notifications
+(database/18_task_workload_notifications.sql), so ranking candidates reads
+a few dict entries per user instead of counting their tasks. While the
+listener is disconnected the index is not trusted and the same numbers are
+computed from the database.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, NamedTuple, Optional
+import asyncpg
+import json
+from app.core.database import db_manager
+from app.core.entity_cache import change_listener
+
+TASK_WORKLOAD_CHANNEL = "task_workload"
+
+OPEN_STATUSES = ("pending", "in_progress")
+
+OPEN_TASKS_SQL = """
+    SELECT id, assigned_to, status, due_date, estimated_hours
+    FROM tasks
+    WHERE status = ANY($1::text[]) AND assigned_to IS NOT NULL
+"""
+
+CANDIDATES_SQL = """
+    SELECT pr.role_id, u.id, u.full_name, u.email
+    FROM processes pr
+    LEFT JOIN users u ON u.role_id = pr.role_id AND u.is_active
+    WHERE pr.id = $1
+"""
+
+class OpenTask(NamedTuple):
+    status: str
+    due_date: Optional[datetime]
+    estimated_hours: int
+
+class Workload(NamedTuple):
+    pending_tasks: int
+    in_progress_tasks: int
+    estimated_hours_due: int
+
+    @property
+    def open_tasks(self) -> int:
+        return self.pending_tasks + self.in_progress_tasks
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+def summarize(tasks, due_before: datetime) -> Workload:
+    pending = in_progress = hours = 0
+    for task in tasks:
+        if task.status == "pending":
+            pending += 1
+        else:
+            in_progress += 1
+        if task.due_date is not None and task.due_date <= due_before:
+            hours += task.estimated_hours
+    return Workload(pending, in_progress, hours)
+
+class WorkloadIndex:
+    def __init__(self):
+        self.ready = False
+        self.assignees: Dict[str, str] = {}  # task id -> assignee
+        self.by_assignee: Dict[str, Dict[str, OpenTask]] = {}
+        # Notifications that arrive while the index is being loaded
+        self.buffered: Optional[List[str]] = None
+
+    def apply(self, task_id: str, assigned_to: Optional[str], status: Optional[str],
+              due_date: Optional[datetime], estimated_hours: Optional[int]):
+        """Record a task's current state; closed and deleted tasks leave the index"""
+        previous = self.assignees.pop(task_id, None)
+        if previous is not None:
+            tasks = self.by_assignee[previous]
+            del tasks[task_id]
+            if not tasks:
+                del self.by_assignee[previous]
+
+        if status in OPEN_STATUSES and assigned_to is not None:
+            self.assignees[task_id] = assigned_to
+            self.by_assignee.setdefault(assigned_to, {})[task_id] = OpenTask(status, due_date, estimated_hours or 0)
+
+    def on_payload(self, payload: str):
+        if self.buffered is not None:
+            self.buffered.append(payload)
+            return
+
+        change = json.loads(payload)
+        due_epoch = change.get("due_epoch")
+        self.apply(
+            change["id"],
+            change.get("assigned_to"),
+            change["status"],
+            datetime.fromtimestamp(due_epoch, timezone.utc) if due_epoch is not None else None,
+            change.get("estimated_hours")
+        )
+
+    async def load(self, connection: asyncpg.Connection):
+        """Rebuild from the table; changes notified meanwhile are replayed after,
+        in commit order, so the newest state of each task wins"""
+        self.ready = False
+        self.buffered = []
+        try:
+            rows = await connection.fetch(OPEN_TASKS_SQL, list(OPEN_STATUSES))
+            self.assignees.clear()
+            self.by_assignee.clear()
+            for row in rows:
+                self.apply(str(row["id"]), str(row["assigned_to"]), row["status"], row["due_date"], row["estimated_hours"])
+        finally:
+            buffered, self.buffered = self.buffered, None
+
+        for payload in buffered:
+            self.on_payload(payload)
+        self.ready = True
+
+    def reset(self):
+        self.ready = False
+
+    def workload(self, user_id: str, due_before: datetime) -> Workload:
+        return summarize(self.by_assignee.get(user_id, {}).values(), due_before)
+
+workload_index = WorkloadIndex()
+change_listener.subscribe(TASK_WORKLOAD_CHANNEL, workload_index.on_payload, workload_index.load, workload_index.reset)
+
+async def workloads_from_database(user_ids: List[str], due_before: datetime) -> Dict[str, Workload]:
+    rows = await db_manager.execute_query(
+        """
+        SELECT assigned_to, status, due_date, COALESCE(estimated_hours, 0) AS estimated_hours
+        FROM tasks
+        WHERE assigned_to = ANY($1::uuid[]) AND status = ANY($2::text[])
+        """,
+        user_ids, list(OPEN_STATUSES),
+        readonly=True
+    )
+    tasks: Dict[str, List[OpenTask]] = {}
+    for row in rows:
+        tasks.setdefault(str(row["assigned_to"]), []).append(
+            OpenTask(row["status"], row["due_date"], row["estimated_hours"])
+        )
+    return {user_id: summarize(tasks.get(user_id, []), due_before) for user_id in user_ids}
+
+async def recommend_assignees(process_id: str, horizon_days: int,
+                              clock: Callable[[], datetime] = utc_now) -> Optional[List[dict]]:
+    """Active users of the process's role, least loaded first; None if the process does not exist"""
+    rows = await db_manager.execute_query(CANDIDATES_SQL, process_id, readonly=True)
+    if not rows:
+        return None
+
+    candidates = [row for row in rows if row["id"] is not None]
+    due_before = clock() + timedelta(days=horizon_days)
+
+    if workload_index.ready:
+        workloads = {str(row["id"]): workload_index.workload(str(row["id"]), due_before) for row in candidates}
+    else:
+        workloads = await workloads_from_database([str(row["id"]) for row in candidates], due_before)
+
+    recommendations = []
+    for row in candidates:
+        workload = workloads[str(row["id"])]
+        recommendations.append({
+            "user_id": row["id"],
+            "full_name": row["full_name"],
+            "email": row["email"],
+            "open_tasks": workload.open_tasks,
+            "pending_tasks": workload.pending_tasks,
+            "in_progress_tasks": workload.in_progress_tasks,
+            "estimated_hours_due": workload.estimated_hours_due,
+        })
+
+    recommendations.sort(key=lambda r: (r["open_tasks"], r["estimated_hours_due"], r["full_name"]))
+    return recommendations
@@ -0,0 +1,96 @@
+"""Compare bytes on the wire and CPU per request for response compression.
+
+Serves representative list payloads through CompressionMiddleware, once
+rendered and compressed per request and once from the precompressed
+reference cache, for each Accept-Encoding a client may send.
+
+    cd backend && python -m benchmarks.compression_benchmark --requests 200
+"""
+import argparse
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+
+# Settings are read on first use; benchmarks need no real services
+for name in ["SUPABASE_URL", "SUPABASE_ANON_KEY", "SUPABASE_SERVICE_ROLE_KEY", "JWT_SECRET_KEY", "DATABASE_URL"]:
+    os.environ.setdefault(name, "benchmark")
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from app.core.compression import SUPPORTED_ENCODINGS
+from app.core.response_cache import PrecompressedResponseCache
+from app.middleware.compression import CompressionMiddleware
+
+STATUSES = ["pending", "in_progress", "completed", "rejected"]
+PRIORITIES = ["low", "medium", "high", "urgent"]
+
+def task_rows(count: int) -> list:
+    now = datetime.now(timezone.utc).isoformat()
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "project_id": str(uuid.uuid4()),
+            "process_id": "task-execution",
+            "assigned_to": str(uuid.uuid4()),
+            "created_by": str(uuid.uuid4()),
+            "title": f"Install partition panels, floor {i % 12}",
+            "description": "Fit and align panels per drawing set; check plumb and fixings",
+            "status": STATUSES[i % len(STATUSES)],
+            "priority": PRIORITIES[i % len(PRIORITIES)],
+            "due_date": now,
+            "estimated_hours": 8,
+            "actual_hours": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(count)
+    ]
+
+def build_app(payload: list, minimum_size: int) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=minimum_size)
+    cache = PrecompressedResponseCache(ttl_seconds=3600)
+
+    @app.get("/live")
+    async def live():
+        return payload
+
+    @app.get("/cached")
+    async def cached(request: Request):
+        return cache.respond(request, "payload", lambda: payload)
+
+    return app
+
+def measure(client: TestClient, path: str, accept_encoding: str, requests: int):
+    headers = {"Accept-Encoding": accept_encoding}
+    client.get(path, headers=headers)  # warm up, and fill the cache
+
+    wire_bytes = 0
+    started = time.process_time()
+    for _ in range(requests):
+        response = client.get(path, headers=headers)
+        wire_bytes = response.num_bytes_downloaded
+    cpu_ms = (time.process_time() - started) * 1000 / requests
+
+    return wire_bytes, response.headers.get("content-encoding", "identity"), cpu_ms
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000, help="Tasks in the list payload")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per measurement")
+    parser.add_argument("--minimum-size", type=int, default=1024)
+    args = parser.parse_args()
+
+    client = TestClient(build_app(task_rows(args.rows), args.minimum_size))
+    encodings = ["identity"] + SUPPORTED_ENCODINGS
+
+    print(f"{args.rows} tasks, {args.requests} requests each (CPU includes the test client)")
+    print(f"{'path':<8} {'accept':<9} {'encoding':<9} {'bytes':>10} {'cpu ms/req':>11}")
+    for path in ["/live", "/cached"]:
+        for accept in encodings:
+            wire_bytes, encoding, cpu_ms = measure(client, path, accept, args.requests)
+            print(f"{path:<8} {accept:<9} {encoding:<9} {wire_bytes:>10} {cpu_ms:>11.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""Check entity cache coherence across app instances and measure its effect on task reads.
+
+Boots several production servers against one database and the Supabase
+stand-in from supabase_transport_benchmark, then:
+
+    coherence   edits one task alternately through each instance (PUT) and
+                directly in the database, and after every edit polls
+                GET /api/v1/tasks/{id} on every instance until it returns the
+                new version; reports how long instances served the old row
+    throughput  drives GET /api/v1/tasks/{id} on one instance with
+                ENTITY_CACHE_ENABLED=false and =true
+
+Needs DATABASE_URL with the entity change triggers applied
+(database/17_entity_change_notifications.sql), at least one task and an
+active business owner.
+
+    cd backend && python -m benchmarks.entity_cache_benchmark --instances 3 --edits 50
+"""
+from app.core.config import settings
+from app.server import free_port, load_process, percentile, wait_until_ready
+from benchmarks.supabase_transport_benchmark import get_json, load_fixture, start_stand_in
+from typing import Any, Dict, List, Tuple
+import argparse
+import asyncio
+import asyncpg
+import http.client
+import json
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import time
+
+AUTH_HEADERS = {"Authorization": "Bearer benchmark", "Content-Type": "application/json"}
+
+def request(port: int, method: str, path: str, body: Any = None) -> Tuple[int, Any]:
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    try:
+        connection.request(method, path, json.dumps(body) if body is not None else None, AUTH_HEADERS)
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+def start_server(stand_in_port: int, workers: int, overrides: Dict[str, str]) -> Tuple[subprocess.Popen, int]:
+    port = free_port()
+    env = {
+        **os.environ,
+        "SUPABASE_URL": f"http://127.0.0.1:{stand_in_port}",
+        "SUPABASE_SERVICE_ROLE_KEY": "benchmark.service.key",
+        "SCHEDULER_ENABLED": "false",
+        **overrides,
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "app.server", "--workers", str(workers), "--host", "127.0.0.1", "--port", str(port)],
+        stdout=subprocess.DEVNULL, env=env
+    )
+    return server, port
+
+def stop_servers(servers: List[subprocess.Popen]):
+    for server in servers:
+        server.send_signal(signal.SIGTERM)
+    for server in servers:
+        server.wait(timeout=settings.SERVER_GRACEFUL_TIMEOUT_SECONDS + 10)
+
+def wait_for_listeners(ports: List[int], timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    for port in ports:
+        while not get_json(port, "/health")["entity_cache"]["listening"]:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Instance on port {port} is not listening for entity changes")
+            time.sleep(0.1)
+
+async def edit_in_database(task_id: str, title: str) -> int:
+    connection = await asyncpg.connect(settings.DATABASE_URL)
+    try:
+        return await connection.fetchval("UPDATE tasks SET title = $2 WHERE id = $1 RETURNING version", task_id, title)
+    finally:
+        await connection.close()
+
+def converge(ports: List[int], path: str, version: int, timeout: float) -> Tuple[List[float], int]:
+    """Poll every instance until it serves ``version``; (seconds until each did, stale reads seen)"""
+    started = time.perf_counter()
+    times = []
+    stale = 0
+    for port in ports:
+        while True:
+            status, task = request(port, "GET", path)
+            if status == 200 and task["version"] >= version:
+                times.append(time.perf_counter() - started)
+                break
+            stale += 1
+            if time.perf_counter() - started > timeout:
+                raise RuntimeError(f"Instance on port {port} still serves version {task.get('version')} < {version}")
+            time.sleep(0.001)
+    return times, stale
+
+def run_coherence(stand_in_port: int, task_id: str, args):
+    servers, ports = [], []
+    for _ in range(args.instances):
+        server, port = start_server(stand_in_port, args.workers, {})
+        servers.append(server)
+        ports.append(port)
+    path = f"/api/v1/tasks/{task_id}"
+    try:
+        for port in ports:
+            wait_until_ready(port, "/health", timeout=60)
+        wait_for_listeners(ports)
+
+        convergence: List[float] = []
+        stale_reads = 0
+        for edit in range(args.edits):
+            # Every instance has the current row cached before the edit
+            for port in ports:
+                for _ in range(args.workers * 2):
+                    request(port, "GET", path)
+
+            title = f"coherence edit {edit}"
+            if edit % (args.instances + 1) == args.instances:
+                version = asyncio.run(edit_in_database(task_id, title))
+            else:
+                status, task = request(ports[edit % (args.instances + 1)], "PUT", path, {"title": title})
+                if status != 200:
+                    raise RuntimeError(f"PUT {path} answered {status}: {task}")
+                version = task["version"]
+
+            times, stale = converge(ports, path, version, args.timeout)
+            convergence.extend(times)
+            stale_reads += stale
+
+        convergence.sort()
+        print(
+            f"coherence: {args.edits} edits over {args.instances} instances x {args.workers} workers; "
+            f"every instance served the new version after p50 {percentile(convergence, 0.50) * 1000:.1f} ms, "
+            f"p99 {percentile(convergence, 0.99) * 1000:.1f} ms, max {convergence[-1] * 1000:.1f} ms; "
+            f"{stale_reads} stale reads while converging"
+        )
+        for port in ports:
+            stats = get_json(port, "/health")["entity_cache"]
+            print(f"  instance :{port} (one worker) tasks cache {stats['tables']['tasks']}")
+    finally:
+        stop_servers(servers)
+
+def run_throughput(stand_in_port: int, task_id: str, args):
+    path = f"/api/v1/tasks/{task_id}"
+    headers = "Authorization: Bearer benchmark\r\n"
+    for enabled in ["false", "true"]:
+        server, port = start_server(stand_in_port, args.workers, {"ENTITY_CACHE_ENABLED": enabled})
+        try:
+            wait_until_ready(port, "/health", timeout=60)
+            load_process(port, path, 1.0, args.workers, headers)
+            with multiprocessing.Pool(args.clients) as pool:
+                per_client = max(1, args.concurrency // args.clients)
+                results = pool.starmap(load_process, [(port, path, args.duration, per_client, headers)] * args.clients)
+        finally:
+            stop_servers([server])
+
+        latencies = sorted(latency for client_latencies, _ in results for latency in client_latencies)
+        print(
+            f"throughput, cache {'on ' if enabled == 'true' else 'off'}: {len(latencies) / args.duration:,.0f} req/s, "
+            f"p50 {percentile(latencies, 0.50) * 1000:.1f} ms, p99 {percentile(latencies, 0.99) * 1000:.1f} ms, "
+            f"{sum(errors for _, errors in results)} errors"
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--parts", nargs="+", choices=["coherence", "throughput"], default=["coherence", "throughput"])
+    parser.add_argument("--instances", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=1, help="workers per instance")
+    parser.add_argument("--edits", type=int, default=50)
+    parser.add_argument("--timeout", type=float, default=5.0, help="fail if an instance serves an old row this long")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--clients", type=int, default=2, help="load generator processes")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="emulated round trip per Supabase call")
+    args = parser.parse_args()
+
+    task_id, profile = asyncio.run(load_fixture())
+    stand_in_port = free_port()
+    stand_in = start_stand_in(stand_in_port, profile, args.latency_ms / 1000, 0.0)
+    try:
+        if "coherence" in args.parts:
+            run_coherence(stand_in_port, task_id, args)
+        if "throughput" in args.parts:
+            run_throughput(stand_in_port, task_id, args)
+    finally:
+        stand_in.terminate()
+        stand_in.join()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Check that importing the app stays within a time budget and stays lazy.
+
+Runs ``python -X importtime -c "import app.main"`` in a fresh interpreter
+(several times, keeping the fastest run), prints the slowest modules, and
+exits non-zero when the total exceeds the budget, when a module that must
+only load on first use (the Supabase client stack, openpyxl, redis) was
+imported, or when the import read settings. The import runs with the
+required settings unset, so it needs no .env or running services and can
+gate CI.
+
+    cd backend && python -m benchmarks.import_budget --budget-ms 2500
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# Imported on first use by get_supabase, the XLSX importer and the Redis backend
+LAZY_MODULES = ["supabase", "gotrue", "postgrest", "storage3", "realtime", "h2", "openpyxl", "redis"]
+
+REQUIRED_SETTINGS = ["SUPABASE_URL", "SUPABASE_ANON_KEY", "SUPABASE_SERVICE_ROLE_KEY", "JWT_SECRET_KEY", "DATABASE_URL"]
+
+# Prints whether the import built Settings (get_settings is cached)
+IMPORT_SCRIPT = "import {module}; from app.core.config import get_settings; print(get_settings.cache_info().currsize)"
+
+def import_times(module: str) -> Tuple[Dict[str, Tuple[int, int]], bool]:
+    """Map each imported module to (self, cumulative) microseconds; and
+    whether importing read settings"""
+    env = {name: value for name, value in os.environ.items() if name not in REQUIRED_SETTINGS}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", IMPORT_SCRIPT.format(module=module)],
+        capture_output=True, text=True, env=env
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr}")
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times, result.stdout.strip() != "0"
+
+def top_level_packages(times: Dict[str, Tuple[int, int]]) -> List[str]:
+    return sorted({name.split(".")[0] for name in times})
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--budget-ms", type=float, default=2500)
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters to try; the fastest counts")
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules to list")
+    args = parser.parse_args()
+
+    runs = [import_times(args.module) for _ in range(args.runs)]
+    times, read_settings = min(runs, key=lambda run: run[0][args.module][1])
+    total_ms = times[args.module][1] / 1000
+
+    print(f"import {args.module}: {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms, best of {args.runs})")
+    print(f"{'self ms':>8} {'cumulative ms':>14}  module")
+    slowest = sorted(times.items(), key=lambda item: item[1][0], reverse=True)[:args.top]
+    for name, (self_us, cumulative_us) in slowest:
+        print(f"{self_us / 1000:>8.1f} {cumulative_us / 1000:>14.1f}  {name}")
+
+    failures = []
+    if total_ms > args.budget_ms:
+        failures.append(f"import took {total_ms:.0f} ms, over the {args.budget_ms:.0f} ms budget")
+
+    eager = [name for name in LAZY_MODULES if name in top_level_packages(times)]
+    if eager:
+        failures.append(f"imported at startup but should load on first use: {', '.join(eager)}")
+
+    if read_settings:
+        failures.append("importing read settings; read them on first use instead")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""Check read routing between the primary and a lagging read replica.
+
+Boots two production servers against a primary and its streaming replica
+(DATABASE_REPLICA_URL) and the Supabase stand-in from
+supabase_transport_benchmark. The writer instance edits a task; the reader
+instance has not written, so its reads may go to the replica. Recent writers
+are kept in the local cache backend, so the two instances behave as two
+users. Then:
+
+    routing  per round, lets the replica catch up, pauses its WAL replay and
+             edits the task through the writer (PUT). GET /api/v1/tasks/ on
+             the writer must return the edit at once (read-your-writes); on
+             the reader it returns the old title from the replica until the
+             lag exceeds DATABASE_REPLICA_MAX_LAG_SECONDS, then the edit from
+             the primary. Replay is resumed and the reader must go back to
+             the replica
+    offload  drives GET /api/v1/tasks/ on the reader and counts the
+             transactions each database committed meanwhile
+
+Needs DATABASE_URL and DATABASE_REPLICA_URL, a superuser on the replica
+(to pause replay), at least one task and an active business owner.
+
+    cd backend && python -m benchmarks.replica_routing_benchmark --rounds 5 --max-lag 2
+"""
+from app.core.config import settings
+from app.server import free_port, load_process, percentile, wait_until_ready
+from benchmarks.entity_cache_benchmark import request, start_server, stop_servers
+from benchmarks.supabase_transport_benchmark import get_json, load_fixture, start_stand_in
+from typing import List, Optional
+import argparse
+import asyncio
+import asyncpg
+import multiprocessing
+import time
+
+async def database_fetchval(dsn: str, query: str, *args):
+    connection = await asyncpg.connect(dsn)
+    try:
+        return await connection.fetchval(query, *args)
+    finally:
+        await connection.close()
+
+async def database_fetchrow(dsn: str, query: str, *args):
+    connection = await asyncpg.connect(dsn)
+    try:
+        return await connection.fetchrow(query, *args)
+    finally:
+        await connection.close()
+
+def primary(query: str, *args):
+    return asyncio.run(database_fetchval(settings.DATABASE_URL, query, *args))
+
+def replica(query: str, *args):
+    return asyncio.run(database_fetchval(settings.DATABASE_REPLICA_URL, query, *args))
+
+def tasks_path(task_id: str) -> str:
+    """GET /api/v1/tasks/ narrowed to the task's project or assignee, so the list stays short"""
+    task = asyncio.run(database_fetchrow(
+        settings.DATABASE_URL, "SELECT project_id, assigned_to FROM tasks WHERE id = $1", task_id
+    ))
+    if task["project_id"]:
+        return f"/api/v1/tasks/?project_id={task['project_id']}"
+    if task["assigned_to"]:
+        return f"/api/v1/tasks/?assigned_to={task['assigned_to']}"
+    return "/api/v1/tasks/"
+
+def listed_title(port: int, path: str, task_id: str) -> Optional[str]:
+    status, tasks = request(port, "GET", path)
+    if status != 200:
+        raise RuntimeError(f"GET {path} on port {port} answered {status}: {tasks}")
+    return next((task["title"] for task in tasks if task["id"] == task_id), None)
+
+def wait_for(condition, timeout: float, message: str):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise RuntimeError(message)
+        time.sleep(0.05)
+
+def catch_up(task_id: str, title: str, timeout: float):
+    """Edit the task on the primary and wait until the replica has replayed it"""
+    primary("UPDATE tasks SET title = $2 WHERE id = $1", task_id, title)
+    wait_for(
+        lambda: replica("SELECT title FROM tasks WHERE id = $1", task_id) == title,
+        timeout, "The replica did not replay the edit"
+    )
+
+def serving_reads(port: int, path: str) -> bool:
+    # The lag is only checked when a read needs it
+    request(port, "GET", path)
+    status = get_json(port, "/health")["database_replica"]
+    return bool(status and status["serving_reads"])
+
+def run_routing(writer: int, reader: int, path: str, task_id: str, args):
+    stale_reads: List[int] = []
+    fallbacks: List[float] = []
+    recoveries: List[float] = []
+    for round_number in range(args.rounds):
+        wait_for(lambda: serving_reads(reader, path), args.timeout, "The reader does not read from the replica")
+        # The lag counts from the last transaction replayed before the pause
+        catch_up(task_id, f"replica round {round_number} baseline", args.timeout)
+
+        replica("SELECT pg_wal_replay_pause()")
+        try:
+            title = f"replica round {round_number} edit"
+            status, task = request(writer, "PUT", f"/api/v1/tasks/{task_id}", {"title": title})
+            if status != 200:
+                raise RuntimeError(f"PUT answered {status}: {task}")
+            edited = time.monotonic()
+
+            if listed_title(writer, path, task_id) != title:
+                raise RuntimeError("The writer did not read its own write")
+
+            stale = 0
+            while listed_title(reader, path, task_id) != title:
+                stale += 1
+                if time.monotonic() - edited > args.max_lag + args.timeout:
+                    raise RuntimeError("The reader kept reading the lagging replica")
+                time.sleep(0.05)
+            if not stale:
+                raise RuntimeError("The reader never read from the replica")
+            # Replay is paused, so the edit can only have come from the primary
+            stale_reads.append(stale)
+            fallbacks.append(time.monotonic() - edited)
+        finally:
+            replica("SELECT pg_wal_replay_resume()")
+
+        resumed = time.monotonic()
+        wait_for(lambda: serving_reads(reader, path), args.timeout, "The reader did not go back to the replica")
+        recoveries.append(time.monotonic() - resumed)
+
+    print(
+        f"routing: {args.rounds} rounds, max lag {args.max_lag:g} s; the writer read its own write every round; "
+        f"the reader served the old title {sum(stale_reads)} times from the paused replica, then the edit from "
+        f"the primary after p50 {percentile(sorted(fallbacks), 0.50):.2f} s, max {max(fallbacks):.2f} s; "
+        f"back on the replica p50 {percentile(sorted(recoveries), 0.50):.2f} s after replay resumed"
+    )
+
+def committed(query) -> int:
+    return query("SELECT xact_commit FROM pg_stat_database WHERE datname = current_database()")
+
+def run_offload(reader: int, path: str, args):
+    headers = "Authorization: Bearer benchmark\r\n"
+    wait_for(lambda: serving_reads(reader, path), args.timeout, "The reader does not read from the replica")
+    before = committed(primary), committed(replica)
+    with multiprocessing.Pool(args.clients) as pool:
+        per_client = max(1, args.concurrency // args.clients)
+        results = pool.starmap(load_process, [(reader, path, args.duration, per_client, headers)] * args.clients)
+    # Statistics reach pg_stat_database when backends go idle
+    time.sleep(1.0)
+    after = committed(primary), committed(replica)
+
+    latencies = sorted(latency for client_latencies, _ in results for latency in client_latencies)
+    print(
+        f"offload: {len(latencies):,} reads at {len(latencies) / args.duration:,.0f} req/s, "
+        f"p50 {percentile(latencies, 0.50) * 1000:.1f} ms, {sum(errors for _, errors in results)} errors; "
+        f"transactions committed meanwhile: primary {after[0] - before[0]:,}, replica {after[1] - before[1]:,}"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--parts", nargs="+", choices=["routing", "offload"], default=["routing", "offload"])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--max-lag", type=float, default=2.0, help="DATABASE_REPLICA_MAX_LAG_SECONDS for the servers")
+    parser.add_argument("--lag-check", type=float, default=0.2, help="DATABASE_REPLICA_LAG_CHECK_SECONDS for the servers")
+    parser.add_argument("--timeout", type=float, default=10.0, help="fail if a step takes this much longer than expected")
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--clients", type=int, default=2, help="load generator processes")
+    args = parser.parse_args()
+
+    if not settings.DATABASE_REPLICA_URL:
+        parser.error("DATABASE_REPLICA_URL is not set")
+
+    task_id, profile = asyncio.run(load_fixture())
+    original_title = primary("SELECT title FROM tasks WHERE id = $1", task_id)
+    stand_in_port = free_port()
+    stand_in = start_stand_in(stand_in_port, profile, 0.0, 0.0)
+    overrides = {
+        "CACHE_BACKEND": "local",
+        "DATABASE_REPLICA_MAX_LAG_SECONDS": str(args.max_lag),
+        "DATABASE_REPLICA_LAG_CHECK_SECONDS": str(args.lag_check),
+    }
+    # One worker each, so the writer's recent write is seen by all its requests
+    servers, ports = [], []
+    try:
+        for _ in range(2):
+            server, port = start_server(stand_in_port, 1, overrides)
+            servers.append(server)
+            ports.append(port)
+        for port in ports:
+            wait_until_ready(port, "/health", timeout=60)
+        writer, reader = ports
+
+        path = tasks_path(task_id)
+        if "routing" in args.parts:
+            run_routing(writer, reader, path, task_id, args)
+        if "offload" in args.parts:
+            run_offload(reader, path, args)
+    finally:
+        stop_servers(servers)
+        stand_in.terminate()
+        stand_in.join()
+        primary("UPDATE tasks SET title = $2 WHERE id = $1", task_id, original_title)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""Inject latency into the database, Supabase auth or PostgREST and watch budgets and breakers.
+
+Each scenario boots the production server against the Supabase stand-in from
+supabase_transport_benchmark and a TCP proxy in front of Postgres, with a
+short request budget, and drives GET /api/v1/tasks/{id} through three phases:
+
+    healthy    normal latency
+    degraded   one dependency answers slower than the request budget
+    recovered  normal latency again
+
+Each phase reports responses by status with their latency and the breaker
+state from /health. Requests that reach the slow dependency end with 504 at
+the budget instead of waiting out the dependency; once the breaker opens the
+rest fail at once with 503 until a probe finds the dependency healthy again.
+Rerun with ``--threshold 1000000`` to see the same load with budgets only.
+Needs DATABASE_URL with at least one task and an active business owner.
+
+    cd backend && python -m benchmarks.resilience_benchmark --scenarios database auth postgrest
+"""
+from app.core.config import settings
+from app.server import free_port, percentile, wait_until_ready
+from benchmarks.supabase_transport_benchmark import get_json, load_fixture, start_stand_in
+from collections import Counter
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urlsplit, urlunsplit
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+SCENARIOS = ["database", "auth", "postgrest"]
+
+class LatencyProxy:
+    """TCP proxy to Postgres that holds every reply for ``delay`` seconds"""
+
+    def __init__(self, dsn: str):
+        parts = urlsplit(dsn)
+        query = parse_qs(parts.query)
+        host = query.pop("host", [parts.hostname or "localhost"])[0]
+        port = parts.port or 5432
+        self.target = ("unix", f"{host}/.s.PGSQL.{port}") if host.startswith("/") else ("tcp", host, port)
+        self.port = free_port()
+        user = parts.netloc.rsplit("@", 1)[0] + "@" if "@" in parts.netloc else ""
+        query_string = urlencode({name: values[0] for name, values in query.items()})
+        self.dsn = urlunsplit((parts.scheme, f"{user}127.0.0.1:{self.port}", parts.path, query_string, ""))
+        self.delay = 0.0
+
+    async def open_upstream(self):
+        if self.target[0] == "unix":
+            return await asyncio.open_unix_connection(self.target[1])
+        return await asyncio.open_connection(self.target[1], self.target[2])
+
+    async def pipe(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, delayed: bool):
+        try:
+            while data := await reader.read(65536):
+                if delayed and self.delay:
+                    await asyncio.sleep(self.delay)
+                writer.write(data)
+                await writer.drain()
+        except OSError:
+            pass
+        finally:
+            writer.close()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        upstream_reader, upstream_writer = await self.open_upstream()
+        await asyncio.gather(
+            self.pipe(reader, upstream_writer, delayed=False),
+            self.pipe(upstream_reader, writer, delayed=True)
+        )
+
+    def start(self):
+        ready = threading.Event()
+
+        async def serve():
+            server = await asyncio.start_server(self.handle, "127.0.0.1", self.port)
+            ready.set()
+            async with server:
+                await server.serve_forever()
+
+        threading.Thread(target=asyncio.run, args=(serve(),), daemon=True).start()
+        ready.wait(10)
+
+async def status_client(port: int, request: bytes, stop_at: float, results: List[Tuple[int, float, float]]):
+    """Send requests over one keep-alive connection; record (status, latency, finished at)"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        while time.perf_counter() < stop_at:
+            started = time.perf_counter()
+            writer.write(request)
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            await reader.readexactly(length)
+            finished = time.perf_counter()
+            results.append((int(head[9:12]), finished - started, finished))
+    finally:
+        writer.close()
+
+def run_phase(port: int, path: str, duration: float, concurrency: int) -> Tuple[List[Tuple[int, float, float]], float]:
+    request = f"GET {path} HTTP/1.1\r\nHost: localhost\r\nAuthorization: Bearer benchmark\r\n\r\n".encode()
+
+    async def run():
+        results: List[Tuple[int, float, float]] = []
+        started = time.perf_counter()
+        await asyncio.gather(*[
+            status_client(port, request, started + duration, results) for _ in range(concurrency)
+        ])
+        return results, started
+
+    return asyncio.run(run())
+
+def report(phase: str, results: List[Tuple[int, float, float]], started: float, breaker: dict):
+    statuses = Counter(status for status, _, _ in results)
+    by_status = ", ".join(f"{status}x{count}" for status, count in sorted(statuses.items()))
+    latencies = sorted(latency for _, latency, _ in results)
+    first_ok: Optional[float] = min((finished for status, _, finished in results if status == 200), default=None)
+    first_ok_text = f", first 200 after {first_ok - started:.1f}s" if first_ok is not None else ""
+    print(
+        f"  {phase:>9}: {by_status or 'no responses'}; p50 {percentile(latencies, 0.50) * 1000:.0f} ms, "
+        f"p99 {percentile(latencies, 0.99) * 1000:.0f} ms{first_ok_text}; "
+        f"breaker {breaker['state']} (trips {breaker['trips']}, rejected {breaker['rejected']})"
+    )
+
+def run_scenario(scenario: str, proxy: LatencyProxy, stand_in_port: int, task_id: str, args):
+    port = free_port()
+    env = {
+        **os.environ,
+        "SUPABASE_URL": f"http://127.0.0.1:{stand_in_port}",
+        "SUPABASE_SERVICE_ROLE_KEY": "benchmark.service.key",
+        "DATABASE_URL": proxy.dsn,
+        "SCHEDULER_ENABLED": "false",
+        "REQUEST_DEADLINE_SECONDS": str(args.deadline),
+        "CIRCUIT_BREAKER_FAILURE_THRESHOLD": str(args.threshold),
+        "CIRCUIT_BREAKER_RECOVERY_SECONDS": str(args.recovery),
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "app.server", "--workers", "1", "--host", "127.0.0.1", "--port", str(port)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env
+    )
+    breaker_name = {"database": "database", "auth": "supabase_auth", "postgrest": "postgrest"}[scenario]
+    path = f"/api/v1/tasks/{task_id}"
+    slow_ms = args.slow_seconds * 1000
+
+    def set_latency(slow: bool):
+        if scenario == "database":
+            proxy.delay = args.slow_seconds if slow else 0.0
+        else:
+            service = "auth" if scenario == "auth" else "rest"
+            get_json(stand_in_port, f"/_latency?{service}_ms={slow_ms if slow else args.latency_ms}")
+
+    print(f"{scenario}: budget {args.deadline:.0f}s, slow replies {args.slow_seconds:.0f}s, "
+          f"breaker opens after {args.threshold} failures for {args.recovery:.0f}s")
+    try:
+        wait_until_ready(port, "/health", timeout=60)
+        for phase, slow, duration in [
+            ("healthy", False, args.phase_seconds),
+            ("degraded", True, args.degraded_seconds),
+            ("recovered", False, args.phase_seconds + args.recovery),
+        ]:
+            set_latency(slow)
+            results, started = run_phase(port, path, duration, args.concurrency)
+            breaker = get_json(port, "/health")["circuit_breakers"][breaker_name]
+            report(phase, results, started, breaker)
+    finally:
+        set_latency(False)
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=settings.SERVER_GRACEFUL_TIMEOUT_SECONDS + 10)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--deadline", type=float, default=2.0, help="REQUEST_DEADLINE_SECONDS for the server")
+    parser.add_argument("--threshold", type=int, default=5, help="CIRCUIT_BREAKER_FAILURE_THRESHOLD for the server")
+    parser.add_argument("--recovery", type=float, default=3.0, help="CIRCUIT_BREAKER_RECOVERY_SECONDS for the server")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="normal Supabase stand-in latency")
+    parser.add_argument("--slow-seconds", type=float, default=10.0, help="injected latency while degraded")
+    parser.add_argument("--phase-seconds", type=float, default=3.0)
+    parser.add_argument("--degraded-seconds", type=float, default=8.0)
+    args = parser.parse_args()
+
+    task_id, profile = asyncio.run(load_fixture())
+    proxy = LatencyProxy(settings.DATABASE_URL)
+    proxy.start()
+    stand_in_port = free_port()
+    stand_in = start_stand_in(stand_in_port, profile, args.latency_ms / 1000, 0.0)
+    try:
+        for scenario in args.scenarios:
+            run_scenario(scenario, proxy, stand_in_port, task_id, args)
+    finally:
+        stand_in.terminate()
+        stand_in.join()
+
+if __name__ == "__main__":
+    main()
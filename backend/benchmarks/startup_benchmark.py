@@ -0,0 +1,81 @@
+"""Measure time from process start to the first healthy response.
+
+Boots the production server (``python -m app.server``) repeatedly and polls
+GET /health until it answers 200. With ``--workers 1`` this is the boot
+time of one worker, including the import, the lifespan (Supabase client,
+database pool, cache backend) and the gunicorn master. Larger worker counts
+show how boot time grows when workers start side by side. Needs the .env
+(or environment) the server itself needs, including a reachable database.
+
+    cd backend && python -m benchmarks.startup_benchmark --runs 5 --workers 1
+"""
+import argparse
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from typing import Optional
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def healthy(port: int) -> bool:
+    try:
+        with socket.create_connection(("127.0.0.1", port), timeout=0.5) as sock:
+            sock.sendall(b"GET /health HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n")
+            return sock.recv(64).startswith(b"HTTP/1.1 200")
+    except OSError:
+        return False
+
+def time_to_healthy(workers: int, timeout: float) -> Optional[float]:
+    """Seconds from spawning the server until /health answers, or None on timeout"""
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "app.server", "--workers", str(workers), "--host", "127.0.0.1", "--port", str(port)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        # Background jobs would compete with the boot being measured
+        env={**os.environ, "SCHEDULER_ENABLED": "false"}
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"server exited with code {server.returncode}; run python -m app.server to see why")
+            if healthy(port):
+                return time.perf_counter() - started
+            time.sleep(0.005)
+        return None
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=60)
+    args = parser.parse_args()
+
+    samples = []
+    for run in range(1, args.runs + 1):
+        elapsed = time_to_healthy(args.workers, args.timeout)
+        if elapsed is None:
+            print(f"run {run}: not healthy within {args.timeout:.0f}s")
+            continue
+        samples.append(elapsed)
+        print(f"run {run}: {elapsed * 1000:.0f} ms")
+
+    if samples:
+        print(
+            f"workers={args.workers} time to first healthy response: "
+            f"min {min(samples) * 1000:.0f} ms, median {statistics.median(samples) * 1000:.0f} ms, "
+            f"max {max(samples) * 1000:.0f} ms"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""Measure GET /api/v1/tasks/{id} latency under concurrency with a local Supabase stand-in.
+
+Every authenticated request makes two Supabase calls (auth.get_user and the
+users profile lookup). This starts a small stand-in that answers both, with
+an emulated network latency per call and an emulated setup cost (TCP + TLS)
+for each new connection, then boots the production server against it and
+the real database and drives get_task with keep-alive clients. Each mode
+runs the server with different transport settings:
+
+    pooled        the configured Settings (shared keep-alive pool)
+    no-keepalive  SUPABASE_MAX_KEEPALIVE_CONNECTIONS=0, a new connection per call
+
+The stand-in speaks plain HTTP/1.1, so HTTP/2 is not negotiated here; against
+Supabase it is negotiated over TLS. Needs DATABASE_URL with at least one task
+and an active business owner.
+
+    cd backend && python -m benchmarks.supabase_transport_benchmark --concurrency 32
+"""
+from app.core.config import settings
+from app.server import free_port, load_process, percentile, wait_until_ready
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from typing import Any, Dict, Tuple
+import argparse
+import asyncio
+import asyncpg
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+MODES = {
+    "pooled": {},
+    "no-keepalive": {"SUPABASE_MAX_KEEPALIVE_CONNECTIONS": "0"},
+}
+
+async def load_fixture() -> Tuple[str, Dict[str, Any]]:
+    """A task id and a business owner profile row to serve from the stand-in"""
+    connection = await asyncpg.connect(settings.DATABASE_URL)
+    try:
+        task_id = await connection.fetchval("SELECT id FROM tasks ORDER BY created_at LIMIT 1")
+        user = await connection.fetchrow(
+            "SELECT * FROM users WHERE role_id = 'businessOwner' AND is_active ORDER BY created_at LIMIT 1"
+        )
+    finally:
+        await connection.close()
+    if task_id is None or user is None:
+        raise RuntimeError("The database needs at least one task and an active business owner")
+    # Round-trip through JSON the way PostgREST would serialize the row
+    return str(task_id), json.loads(json.dumps(dict(user), default=str))
+
+def stand_in_app(profile: Dict[str, Any], latency: float, connect_delay: float) -> Starlette:
+    """Answers auth.get_user and the profile lookup for ``profile``.
+
+    GET /_stats reports calls and connections seen (``?reset=1`` clears them);
+    GET /_latency?auth_ms=..&rest_ms=.. changes the emulated latency per service.
+    """
+    seen_connections = set()
+    counters = {"requests": 0}
+    latencies = {"auth": latency, "rest": latency}
+
+    async def emulate_network(request: Request, service: str):
+        counters["requests"] += 1
+        if request.client not in seen_connections:
+            seen_connections.add(request.client)
+            await asyncio.sleep(connect_delay)
+        await asyncio.sleep(latencies[service])
+
+    async def auth_user(request: Request):
+        await emulate_network(request, "auth")
+        return JSONResponse({
+            "id": profile["id"],
+            "aud": "authenticated",
+            "role": "authenticated",
+            "email": profile.get("email"),
+            "app_metadata": {},
+            "user_metadata": {},
+            "created_at": "2024-01-01T00:00:00Z",
+        })
+
+    async def rest_users(request: Request):
+        await emulate_network(request, "rest")
+        return JSONResponse([profile])
+
+    async def stats(request: Request):
+        result = {"requests": counters["requests"], "connections": len(seen_connections)}
+        if request.query_params.get("reset"):
+            seen_connections.clear()
+            counters["requests"] = 0
+        return JSONResponse(result)
+
+    async def set_latency(request: Request):
+        for service in latencies:
+            if f"{service}_ms" in request.query_params:
+                latencies[service] = float(request.query_params[f"{service}_ms"]) / 1000
+        return JSONResponse({f"{service}_ms": value * 1000 for service, value in latencies.items()})
+
+    return Starlette(routes=[
+        Route("/auth/v1/user", auth_user),
+        Route("/rest/v1/users", rest_users),
+        Route("/_stats", stats),
+        Route("/_latency", set_latency),
+    ])
+
+def run_stand_in(port: int, profile: Dict[str, Any], latency: float, connect_delay: float):
+    import uvicorn
+    uvicorn.run(stand_in_app(profile, latency, connect_delay), host="127.0.0.1", port=port, log_level="warning")
+
+def start_stand_in(port: int, profile: Dict[str, Any], latency: float, connect_delay: float) -> multiprocessing.Process:
+    stand_in = multiprocessing.Process(target=run_stand_in, args=(port, profile, latency, connect_delay), daemon=True)
+    stand_in.start()
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            get_json(port, "/_stats")
+            return stand_in
+        except OSError:
+            if time.monotonic() > deadline:
+                stand_in.terminate()
+                raise
+            time.sleep(0.1)
+
+def get_json(port: int, path: str) -> Any:
+    with socket.create_connection(("127.0.0.1", port), timeout=5) as sock:
+        sock.sendall(f"GET {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n".encode())
+        response = b""
+        while chunk := sock.recv(65536):
+            response += chunk
+    return json.loads(response.split(b"\r\n\r\n", 1)[1])
+
+def run_mode(name: str, overrides: Dict[str, str], stand_in_port: int, task_id: str, args) -> Dict[str, Any]:
+    port = free_port()
+    env = {
+        **os.environ,
+        "SUPABASE_URL": f"http://127.0.0.1:{stand_in_port}",
+        # Only the shape is checked by supabase-py; the stand-in accepts any key
+        "SUPABASE_SERVICE_ROLE_KEY": "benchmark.service.key",
+        "SCHEDULER_ENABLED": "false",
+        **overrides,
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "app.server", "--workers", str(args.workers), "--host", "127.0.0.1", "--port", str(port)],
+        stdout=subprocess.DEVNULL, env=env
+    )
+    path = f"/api/v1/tasks/{task_id}"
+    headers = "Authorization: Bearer benchmark\r\n"
+    try:
+        wait_until_ready(port, "/health", timeout=60)
+        # Warm up every worker, then count only the measured run
+        load_process(port, path, 1.0, args.workers, headers)
+        get_json(stand_in_port, "/_stats?reset=1")
+
+        with multiprocessing.Pool(args.clients) as pool:
+            per_client = max(1, args.concurrency // args.clients)
+            results = pool.starmap(load_process, [(port, path, args.duration, per_client, headers)] * args.clients)
+        stand_in = get_json(stand_in_port, "/_stats?reset=1")
+        pool_stats = get_json(port, "/health").get("supabase_http")
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=settings.SERVER_GRACEFUL_TIMEOUT_SECONDS + 10)
+
+    latencies = sorted(latency for client_latencies, _ in results for latency in client_latencies)
+    return {
+        "mode": name,
+        "requests": len(latencies),
+        "errors": sum(errors for _, errors in results),
+        "throughput": len(latencies) / args.duration,
+        "p50": percentile(latencies, 0.50),
+        "p99": percentile(latencies, 0.99),
+        "supabase_calls": stand_in["requests"],
+        "connections": stand_in["connections"],
+        "pool": pool_stats,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--clients", type=int, default=2, help="load generator processes")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="emulated round trip per Supabase call")
+    parser.add_argument("--connect-ms", type=float, default=20.0, help="emulated setup cost per new connection")
+    args = parser.parse_args()
+
+    task_id, profile = asyncio.run(load_fixture())
+    stand_in_port = free_port()
+    stand_in = start_stand_in(stand_in_port, profile, args.latency_ms / 1000, args.connect_ms / 1000)
+    try:
+        print(
+            f"GET /api/v1/tasks/{{id}} workers={args.workers} concurrency={args.concurrency} "
+            f"stand-in latency={args.latency_ms:.0f}ms connect={args.connect_ms:.0f}ms"
+        )
+        for name in args.modes:
+            result = run_mode(name, MODES[name], stand_in_port, task_id, args)
+            calls_per_connection = result["supabase_calls"] / max(1, result["connections"])
+            print(
+                f"{result['mode']:>13}: {result['throughput']:,.0f} req/s, "
+                f"p50 {result['p50'] * 1000:.1f} ms, p99 {result['p99'] * 1000:.1f} ms, "
+                f"{result['errors']} errors, {result['supabase_calls']} Supabase calls over "
+                f"{result['connections']} connections ({calls_per_connection:.0f} per connection)"
+            )
+            print(f"{'':>13}  pool after run (one worker): {result['pool']}")
+    finally:
+        stand_in.terminate()
+        stand_in.join()
+
+if __name__ == "__main__":
+    main()
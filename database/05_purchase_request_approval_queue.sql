@@ -0,0 +1,5 @@
+-- Purchase request approval queues
+-- "My approval queue" filters pending requests by approval tier and pages by
+-- (created_at, id); this index serves that keyset scan without sorting.
+CREATE INDEX IF NOT EXISTS idx_purchase_requests_approval_queue
+    ON purchase_requests(status, approval_level, created_at, id);
@@ -0,0 +1,4 @@
+-- BOQ costing
+-- Project summaries aggregate line items by category; this index keeps that a
+-- range scan over one project's rows.
+CREATE INDEX IF NOT EXISTS idx_boq_project_category ON boq(project_id, category);
@@ -0,0 +1,147 @@
+-- Project cost rollups
+-- Committed (approved purchase requests), invoiced and paid totals are kept
+-- per project by triggers, so reports read one row instead of rescanning
+-- purchase_requests and invoices. projects.actual_cost follows the invoiced
+-- total.
+
+-- Purchase requests can be tagged with the BOQ category they draw against
+ALTER TABLE purchase_requests ADD COLUMN IF NOT EXISTS category VARCHAR(100);
+
+CREATE TABLE IF NOT EXISTS public.project_costs (
+    project_id UUID PRIMARY KEY REFERENCES projects(id) ON DELETE CASCADE,
+    committed_amount DECIMAL(15,2) NOT NULL DEFAULT 0,
+    invoiced_amount DECIMAL(15,2) NOT NULL DEFAULT 0,
+    paid_amount DECIMAL(15,2) NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Committed spend per BOQ category; '' holds requests without a category
+CREATE TABLE IF NOT EXISTS public.project_category_costs (
+    project_id UUID REFERENCES projects(id) ON DELETE CASCADE,
+    category VARCHAR(100) NOT NULL DEFAULT '',
+    committed_amount DECIMAL(15,2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (project_id, category)
+);
+
+CREATE INDEX IF NOT EXISTS idx_purchase_requests_created_at ON purchase_requests(created_at);
+CREATE INDEX IF NOT EXISTS idx_invoices_project_id ON invoices(project_id);
+
+ALTER TABLE project_costs ENABLE ROW LEVEL SECURITY;
+ALTER TABLE project_category_costs ENABLE ROW LEVEL SECURITY;
+
+CREATE OR REPLACE FUNCTION apply_project_cost_delta(
+    p_project_id UUID,
+    p_category VARCHAR,
+    p_committed DECIMAL,
+    p_invoiced DECIMAL,
+    p_paid DECIMAL
+)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO project_costs (project_id, committed_amount, invoiced_amount, paid_amount)
+    VALUES (p_project_id, p_committed, p_invoiced, p_paid)
+    ON CONFLICT (project_id) DO UPDATE SET
+        committed_amount = project_costs.committed_amount + EXCLUDED.committed_amount,
+        invoiced_amount = project_costs.invoiced_amount + EXCLUDED.invoiced_amount,
+        paid_amount = project_costs.paid_amount + EXCLUDED.paid_amount,
+        updated_at = NOW();
+
+    IF p_committed <> 0 THEN
+        INSERT INTO project_category_costs (project_id, category, committed_amount)
+        VALUES (p_project_id, COALESCE(p_category, ''), p_committed)
+        ON CONFLICT (project_id, category) DO UPDATE SET
+            committed_amount = project_category_costs.committed_amount + EXCLUDED.committed_amount;
+    END IF;
+
+    IF p_invoiced <> 0 THEN
+        UPDATE projects p SET actual_cost = pc.invoiced_amount
+        FROM project_costs pc
+        WHERE p.id = p_project_id AND pc.project_id = p_project_id;
+    END IF;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION rollup_purchase_request_costs()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.project_id IS NOT NULL
+       AND OLD.status IN ('approved', 'ordered', 'received') THEN
+        PERFORM apply_project_cost_delta(OLD.project_id, OLD.category, -OLD.total_amount, 0, 0);
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.project_id IS NOT NULL
+       AND NEW.status IN ('approved', 'ordered', 'received') THEN
+        PERFORM apply_project_cost_delta(NEW.project_id, NEW.category, NEW.total_amount, 0, 0);
+    END IF;
+
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION rollup_invoice_costs()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.project_id IS NOT NULL THEN
+        PERFORM apply_project_cost_delta(
+            OLD.project_id, NULL, 0, -OLD.total_amount,
+            CASE WHEN OLD.status = 'paid' THEN -OLD.total_amount ELSE 0 END
+        );
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.project_id IS NOT NULL THEN
+        PERFORM apply_project_cost_delta(
+            NEW.project_id, NULL, 0, NEW.total_amount,
+            CASE WHEN NEW.status = 'paid' THEN NEW.total_amount ELSE 0 END
+        );
+    END IF;
+
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+-- Only changes to the rolled-up columns need to touch the totals
+DROP TRIGGER IF EXISTS rollup_purchase_request_costs ON purchase_requests;
+CREATE TRIGGER rollup_purchase_request_costs
+    AFTER INSERT OR DELETE OR UPDATE OF project_id, status, total_amount, category ON purchase_requests
+    FOR EACH ROW EXECUTE FUNCTION rollup_purchase_request_costs();
+
+DROP TRIGGER IF EXISTS rollup_invoice_costs ON invoices;
+CREATE TRIGGER rollup_invoice_costs
+    AFTER INSERT OR DELETE OR UPDATE OF project_id, status, total_amount ON invoices
+    FOR EACH ROW EXECUTE FUNCTION rollup_invoice_costs();
+
+-- Rebuild one project's rollups from the raw rows (backfill and drift repair)
+CREATE OR REPLACE FUNCTION refresh_project_costs(p_project_id UUID)
+RETURNS VOID AS $$
+BEGIN
+    DELETE FROM project_category_costs WHERE project_id = p_project_id;
+
+    INSERT INTO project_category_costs (project_id, category, committed_amount)
+    SELECT project_id, COALESCE(category, ''), SUM(total_amount)
+    FROM purchase_requests
+    WHERE project_id = p_project_id AND status IN ('approved', 'ordered', 'received')
+    GROUP BY project_id, COALESCE(category, '');
+
+    INSERT INTO project_costs (project_id, committed_amount, invoiced_amount, paid_amount)
+    SELECT
+        p_project_id,
+        COALESCE((SELECT SUM(committed_amount) FROM project_category_costs WHERE project_id = p_project_id), 0),
+        COALESCE(SUM(total_amount), 0),
+        COALESCE(SUM(total_amount) FILTER (WHERE status = 'paid'), 0)
+    FROM invoices
+    WHERE project_id = p_project_id
+    ON CONFLICT (project_id) DO UPDATE SET
+        committed_amount = EXCLUDED.committed_amount,
+        invoiced_amount = EXCLUDED.invoiced_amount,
+        paid_amount = EXCLUDED.paid_amount,
+        updated_at = NOW();
+
+    UPDATE projects p SET actual_cost = pc.invoiced_amount
+    FROM project_costs pc
+    WHERE p.id = p_project_id AND pc.project_id = p_project_id
+      AND p.actual_cost IS DISTINCT FROM pc.invoiced_amount;
+END;
+$$ language 'plpgsql';
+
+-- Backfill existing projects
+SELECT refresh_project_costs(id) FROM projects;
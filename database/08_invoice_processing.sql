@@ -0,0 +1,9 @@
+-- Invoice processing
+-- The overdue sweeper only ever looks at unpaid invoices; a partial index on
+-- their due dates keeps the sweep proportional to the unpaid backlog.
+CREATE INDEX IF NOT EXISTS idx_invoices_unpaid_due_date
+    ON invoices(due_date) WHERE status IN ('pending', 'approved');
+
+-- Invoice-to-purchase-request matching by project and vendor
+CREATE INDEX IF NOT EXISTS idx_purchase_requests_project_vendor
+    ON purchase_requests(project_id, lower(vendor_name));
@@ -0,0 +1,38 @@
+-- Vendor directory search
+-- Type-ahead lookups match name prefixes first and fall back to trigram
+-- similarity for typos; both are answered from indexes on lower(name).
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Vendor names are unique ignoring case; bulk catalog imports upsert on this.
+-- Existing names that differ only in case keep the oldest vendor's name;
+-- the others get their id prefix appended, keeping their rows and invoices,
+-- and are listed in a notice so they can be merged by hand.
+DO $$
+DECLARE
+    renamed TEXT;
+BEGIN
+    WITH ranked AS (
+        SELECT id, name, row_number() OVER (PARTITION BY lower(name) ORDER BY created_at, id) AS position
+        FROM vendors
+    ),
+    updated AS (
+        UPDATE vendors v
+        SET name = left(r.name, 244) || ' (' || left(r.id::text, 8) || ')'
+        FROM ranked r
+        WHERE v.id = r.id AND r.position > 1
+        RETURNING v.name
+    )
+    SELECT string_agg(name, ', ') INTO renamed FROM updated;
+
+    IF renamed IS NOT NULL THEN
+        RAISE NOTICE 'Renamed vendors whose names differed only in case: %', renamed;
+    END IF;
+END $$;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_vendors_name_unique ON vendors(lower(name));
+
+-- Prefix matches (LIKE 'abc%'), including one and two character queries
+CREATE INDEX IF NOT EXISTS idx_vendors_name_prefix ON vendors(lower(name) text_pattern_ops);
+
+-- Fuzzy matches (lower(name) % 'query')
+CREATE INDEX IF NOT EXISTS idx_vendors_name_trgm ON vendors USING gin(lower(name) gin_trgm_ops);
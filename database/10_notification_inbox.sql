@@ -0,0 +1,106 @@
+-- Notification inbox
+-- Unread counts live in one row per user, kept current by statement-level
+-- triggers, so polling the badge is a primary-key lookup rather than a
+-- count(*) over notifications. A bulk mark-read adjusts each user's counter
+-- once per statement, not once per row.
+CREATE TABLE IF NOT EXISTS public.notification_counters (
+    user_id UUID PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    unread_count INTEGER NOT NULL DEFAULT 0
+);
+
+ALTER TABLE notification_counters ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "Users can view their notification counters" ON notification_counters FOR SELECT USING (user_id = auth.uid());
+
+CREATE OR REPLACE FUNCTION apply_unread_deltas(deltas JSONB)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO notification_counters (user_id, unread_count)
+    SELECT key::uuid, GREATEST(value::int, 0)
+    FROM jsonb_each_text(deltas)
+    ON CONFLICT (user_id) DO UPDATE SET
+        unread_count = GREATEST(notification_counters.unread_count + (deltas ->> EXCLUDED.user_id::text)::int, 0);
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION count_inserted_unread_notifications()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM apply_unread_deltas(jsonb_object_agg(user_id, delta))
+    FROM (
+        SELECT user_id, count(*) AS delta
+        FROM new_rows
+        WHERE NOT is_read AND user_id IS NOT NULL
+        GROUP BY user_id
+    ) d
+    HAVING count(*) > 0;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION count_updated_unread_notifications()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM apply_unread_deltas(jsonb_object_agg(user_id, delta))
+    FROM (
+        SELECT user_id, sum(delta) AS delta
+        FROM (
+            SELECT o.user_id, -1 AS delta FROM old_rows o WHERE NOT o.is_read AND o.user_id IS NOT NULL
+            UNION ALL
+            SELECT n.user_id, 1 AS delta FROM new_rows n WHERE NOT n.is_read AND n.user_id IS NOT NULL
+        ) changes
+        GROUP BY user_id
+        HAVING sum(delta) <> 0
+    ) d
+    HAVING count(*) > 0;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION count_deleted_unread_notifications()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM apply_unread_deltas(jsonb_object_agg(user_id, -delta))
+    FROM (
+        SELECT user_id, count(*) AS delta
+        FROM old_rows
+        WHERE NOT is_read AND user_id IS NOT NULL
+        GROUP BY user_id
+    ) d
+    HAVING count(*) > 0;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS count_inserted_unread_notifications ON notifications;
+CREATE TRIGGER count_inserted_unread_notifications
+    AFTER INSERT ON notifications
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION count_inserted_unread_notifications();
+
+DROP TRIGGER IF EXISTS count_updated_unread_notifications ON notifications;
+CREATE TRIGGER count_updated_unread_notifications
+    AFTER UPDATE ON notifications
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION count_updated_unread_notifications();
+
+DROP TRIGGER IF EXISTS count_deleted_unread_notifications ON notifications;
+CREATE TRIGGER count_deleted_unread_notifications
+    AFTER DELETE ON notifications
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION count_deleted_unread_notifications();
+
+-- Backfill counters from existing notifications
+INSERT INTO notification_counters (user_id, unread_count)
+SELECT user_id, count(*) FROM notifications
+WHERE NOT is_read AND user_id IS NOT NULL
+GROUP BY user_id
+ON CONFLICT (user_id) DO UPDATE SET unread_count = EXCLUDED.unread_count;
+
+-- Inbox indexes: the per-user keyset listing and a partial index over unread
+-- rows replace the separate user_id and is_read indexes.
+DROP INDEX IF EXISTS idx_notifications_user_id;
+DROP INDEX IF EXISTS idx_notifications_is_read;
+CREATE INDEX IF NOT EXISTS idx_notifications_user_created
+    ON notifications(user_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_notifications_user_unread
+    ON notifications(user_id, created_at DESC, id DESC) WHERE NOT is_read;
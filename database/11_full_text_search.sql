@@ -0,0 +1,53 @@
+-- Full-text search over projects and tasks
+-- Each table carries a weighted tsvector maintained by a BEFORE trigger and
+-- indexed with GIN, so /search never scans or re-parses row text.
+ALTER TABLE projects ADD COLUMN IF NOT EXISTS search_vector tsvector;
+ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector;
+
+CREATE OR REPLACE FUNCTION projects_search_vector_update()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', COALESCE(NEW.name, '')), 'A') ||
+        setweight(to_tsvector('english', COALESCE(NEW.client_name, '')), 'B') ||
+        setweight(to_tsvector('english', COALESCE(NEW.description, '')), 'C');
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION tasks_search_vector_update()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', COALESCE(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('english', COALESCE(NEW.description, '')), 'C');
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS projects_search_vector_update ON projects;
+CREATE TRIGGER projects_search_vector_update
+    BEFORE INSERT OR UPDATE OF name, client_name, description ON projects
+    FOR EACH ROW EXECUTE FUNCTION projects_search_vector_update();
+
+DROP TRIGGER IF EXISTS tasks_search_vector_update ON tasks;
+CREATE TRIGGER tasks_search_vector_update
+    BEFORE INSERT OR UPDATE OF title, description ON tasks
+    FOR EACH ROW EXECUTE FUNCTION tasks_search_vector_update();
+
+-- Backfill existing rows without bumping updated_at or writing activity logs
+ALTER TABLE projects DISABLE TRIGGER USER;
+UPDATE projects SET search_vector =
+    setweight(to_tsvector('english', COALESCE(name, '')), 'A') ||
+    setweight(to_tsvector('english', COALESCE(client_name, '')), 'B') ||
+    setweight(to_tsvector('english', COALESCE(description, '')), 'C');
+ALTER TABLE projects ENABLE TRIGGER USER;
+
+ALTER TABLE tasks DISABLE TRIGGER USER;
+UPDATE tasks SET search_vector =
+    setweight(to_tsvector('english', COALESCE(title, '')), 'A') ||
+    setweight(to_tsvector('english', COALESCE(description, '')), 'C');
+ALTER TABLE tasks ENABLE TRIGGER USER;
+
+CREATE INDEX IF NOT EXISTS idx_projects_search_vector ON projects USING gin(search_vector);
+CREATE INDEX IF NOT EXISTS idx_tasks_search_vector ON tasks USING gin(search_vector);
@@ -0,0 +1,8 @@
+-- Indexes behind the SQL access policy (backend/app/core/access_policy.py)
+-- Supervisors' "tasks in their domain" resolves to a handful of process ids,
+-- so it becomes an index scan on process_id instead of a full scan of tasks.
+-- created_by backs the "tasks I created" branch for non-manager roles.
+CREATE INDEX IF NOT EXISTS idx_tasks_process_created ON tasks(process_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_tasks_created_by ON tasks(created_by);
+CREATE INDEX IF NOT EXISTS idx_processes_role_id ON processes(role_id);
+CREATE INDEX IF NOT EXISTS idx_process_connections_from_role ON process_connections(from_role, connection_type);
@@ -0,0 +1,56 @@
+-- Delta sync for task lists
+-- Clients pass the (updated_at, id) of the last change they saw and receive
+-- only newer rows, so the sync query is a range scan on
+-- idx_tasks_assigned_updated. A task leaves an assignee's list when it is
+-- deleted or reassigned; both are recorded as tombstones keyed by the
+-- assignee it left.
+CREATE TABLE IF NOT EXISTS public.task_tombstones (
+    task_id UUID NOT NULL,
+    assigned_to UUID NOT NULL,
+    deleted_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (assigned_to, task_id)
+);
+
+ALTER TABLE task_tombstones ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "Users can view their task tombstones" ON task_tombstones FOR SELECT USING (assigned_to = auth.uid());
+
+CREATE INDEX IF NOT EXISTS idx_task_tombstones_assigned_deleted
+    ON task_tombstones(assigned_to, deleted_at, task_id);
+CREATE INDEX IF NOT EXISTS idx_task_tombstones_deleted_at ON task_tombstones(deleted_at);
+
+CREATE INDEX IF NOT EXISTS idx_tasks_assigned_updated ON tasks(assigned_to, updated_at, id);
+
+CREATE OR REPLACE FUNCTION record_deleted_task_tombstones()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO task_tombstones (task_id, assigned_to)
+    SELECT id, assigned_to FROM old_rows WHERE assigned_to IS NOT NULL
+    ON CONFLICT (assigned_to, task_id) DO UPDATE SET deleted_at = EXCLUDED.deleted_at;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION record_reassigned_task_tombstones()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO task_tombstones (task_id, assigned_to)
+    SELECT o.id, o.assigned_to
+    FROM old_rows o
+    JOIN new_rows n ON n.id = o.id
+    WHERE o.assigned_to IS NOT NULL AND n.assigned_to IS DISTINCT FROM o.assigned_to
+    ON CONFLICT (assigned_to, task_id) DO UPDATE SET deleted_at = EXCLUDED.deleted_at;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS record_deleted_task_tombstones ON tasks;
+CREATE TRIGGER record_deleted_task_tombstones
+    AFTER DELETE ON tasks
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION record_deleted_task_tombstones();
+
+DROP TRIGGER IF EXISTS record_reassigned_task_tombstones ON tasks;
+CREATE TRIGGER record_reassigned_task_tombstones
+    AFTER UPDATE ON tasks
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION record_reassigned_task_tombstones();
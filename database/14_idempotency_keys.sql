@@ -0,0 +1,20 @@
+-- Idempotency keys for create and bulk endpoints
+-- A retried request with the same Idempotency-Key replays the stored
+-- response instead of writing again. Keys are claimed in the same
+-- transaction as the write, so a failed request leaves no key behind.
+CREATE TABLE IF NOT EXISTS public.idempotency_keys (
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    endpoint VARCHAR(255) NOT NULL,
+    key VARCHAR(255) NOT NULL,
+    request_hash CHAR(64) NOT NULL,
+    status_code INTEGER,
+    response JSON, -- json rather than jsonb keeps the original key order on replay
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    PRIMARY KEY (user_id, endpoint, key)
+);
+
+-- Only the API touches this table
+ALTER TABLE idempotency_keys ENABLE ROW LEVEL SECURITY;
+
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_expires_at ON idempotency_keys(expires_at);
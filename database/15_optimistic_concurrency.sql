@@ -0,0 +1,31 @@
+-- Optimistic concurrency for task and project edits
+-- Every edit bumps the row's version. Clients send the version they last
+-- read (If-Match or a version field) and the update only applies when it
+-- still matches, so concurrent edits fail with 412 instead of silently
+-- overwriting each other. Derived columns (actual_cost from the cost
+-- rollups, search_vector) are left out of the trigger column lists so
+-- background maintenance never invalidates a client's copy.
+ALTER TABLE tasks ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
+ALTER TABLE projects ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
+
+CREATE OR REPLACE FUNCTION bump_row_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.version = OLD.version + 1;
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS bump_tasks_version ON tasks;
+CREATE TRIGGER bump_tasks_version
+    BEFORE UPDATE OF project_id, process_id, assigned_to, title, description, status,
+                     priority, due_date, completed_at, estimated_hours, actual_hours
+    ON tasks
+    FOR EACH ROW EXECUTE FUNCTION bump_row_version();
+
+DROP TRIGGER IF EXISTS bump_projects_version ON projects;
+CREATE TRIGGER bump_projects_version
+    BEFORE UPDATE OF name, description, client_name, project_manager_id, status,
+                     start_date, end_date, budget
+    ON projects
+    FOR EACH ROW EXECUTE FUNCTION bump_row_version();
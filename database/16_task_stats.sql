@@ -0,0 +1,185 @@
+-- Task lifecycle bookkeeping and status counters
+-- completed_at is stamped when a task enters 'completed' and cleared when it
+-- is reopened, whichever code path writes the row. Per-project and per-user
+-- counters of tasks by status, with estimated and actual hour totals, are
+-- maintained by statement-level triggers in the same statement as the task
+-- write, so progress and productivity reports read one row per project or
+-- user instead of counting tasks.
+CREATE OR REPLACE FUNCTION stamp_task_completed_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.status = 'completed' THEN
+        IF TG_OP = 'INSERT' OR OLD.status IS DISTINCT FROM 'completed' THEN
+            NEW.completed_at = COALESCE(NEW.completed_at, NOW());
+        END IF;
+    ELSE
+        NEW.completed_at = NULL;
+    END IF;
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS stamp_task_completed_at ON tasks;
+CREATE TRIGGER stamp_task_completed_at
+    BEFORE INSERT OR UPDATE OF status, completed_at ON tasks
+    FOR EACH ROW EXECUTE FUNCTION stamp_task_completed_at();
+
+-- A reopened task that was completed before keeps no stale timestamp
+UPDATE tasks SET completed_at = NULL WHERE status <> 'completed' AND completed_at IS NOT NULL;
+UPDATE tasks SET completed_at = updated_at WHERE status = 'completed' AND completed_at IS NULL;
+
+CREATE TABLE IF NOT EXISTS public.project_task_stats (
+    project_id UUID PRIMARY KEY REFERENCES projects(id) ON DELETE CASCADE,
+    total_tasks INTEGER NOT NULL DEFAULT 0,
+    pending_tasks INTEGER NOT NULL DEFAULT 0,
+    in_progress_tasks INTEGER NOT NULL DEFAULT 0,
+    completed_tasks INTEGER NOT NULL DEFAULT 0,
+    rejected_tasks INTEGER NOT NULL DEFAULT 0,
+    estimated_hours BIGINT NOT NULL DEFAULT 0,
+    actual_hours BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS public.user_task_stats (
+    user_id UUID PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    total_tasks INTEGER NOT NULL DEFAULT 0,
+    pending_tasks INTEGER NOT NULL DEFAULT 0,
+    in_progress_tasks INTEGER NOT NULL DEFAULT 0,
+    completed_tasks INTEGER NOT NULL DEFAULT 0,
+    rejected_tasks INTEGER NOT NULL DEFAULT 0,
+    estimated_hours BIGINT NOT NULL DEFAULT 0,
+    actual_hours BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+ALTER TABLE project_task_stats ENABLE ROW LEVEL SECURITY;
+ALTER TABLE user_task_stats ENABLE ROW LEVEL SECURITY;
+
+DO $$
+BEGIN
+    CREATE TYPE task_stats_delta AS (
+        project_id UUID,
+        assigned_to UUID,
+        status VARCHAR(50),
+        estimated_hours INTEGER,
+        actual_hours INTEGER,
+        sign INTEGER
+    );
+EXCEPTION WHEN duplicate_object THEN NULL;
+END $$;
+
+-- Applies one statement's changes: old rows count -1, new rows +1. Rows whose
+-- project, assignee, status and hours did not change cancel out, so edits to
+-- titles or descriptions never touch the counter rows. Counter rows are
+-- locked in key order so concurrent multi-task statements cannot deadlock.
+CREATE OR REPLACE FUNCTION apply_task_stats_delta(deltas task_stats_delta[])
+RETURNS VOID AS $$
+    WITH net AS (
+        SELECT project_id, assigned_to, status, estimated_hours, actual_hours, SUM(sign) AS sign
+        FROM unnest(deltas)
+        GROUP BY project_id, assigned_to, status, estimated_hours, actual_hours
+        HAVING SUM(sign) <> 0
+    ), projects AS (
+        INSERT INTO project_task_stats AS s (
+            project_id, total_tasks, pending_tasks, in_progress_tasks, completed_tasks,
+            rejected_tasks, estimated_hours, actual_hours
+        )
+        SELECT project_id,
+               SUM(sign),
+               COALESCE(SUM(sign) FILTER (WHERE status = 'pending'), 0),
+               COALESCE(SUM(sign) FILTER (WHERE status = 'in_progress'), 0),
+               COALESCE(SUM(sign) FILTER (WHERE status = 'completed'), 0),
+               COALESCE(SUM(sign) FILTER (WHERE status = 'rejected'), 0),
+               COALESCE(SUM(sign * estimated_hours), 0),
+               COALESCE(SUM(sign * actual_hours), 0)
+        FROM net
+        WHERE project_id IS NOT NULL
+        GROUP BY project_id
+        ORDER BY project_id
+        ON CONFLICT (project_id) DO UPDATE SET
+            total_tasks = s.total_tasks + EXCLUDED.total_tasks,
+            pending_tasks = s.pending_tasks + EXCLUDED.pending_tasks,
+            in_progress_tasks = s.in_progress_tasks + EXCLUDED.in_progress_tasks,
+            completed_tasks = s.completed_tasks + EXCLUDED.completed_tasks,
+            rejected_tasks = s.rejected_tasks + EXCLUDED.rejected_tasks,
+            estimated_hours = s.estimated_hours + EXCLUDED.estimated_hours,
+            actual_hours = s.actual_hours + EXCLUDED.actual_hours,
+            updated_at = NOW()
+    )
+    INSERT INTO user_task_stats AS s (
+        user_id, total_tasks, pending_tasks, in_progress_tasks, completed_tasks,
+        rejected_tasks, estimated_hours, actual_hours
+    )
+    SELECT assigned_to,
+           SUM(sign),
+           COALESCE(SUM(sign) FILTER (WHERE status = 'pending'), 0),
+           COALESCE(SUM(sign) FILTER (WHERE status = 'in_progress'), 0),
+           COALESCE(SUM(sign) FILTER (WHERE status = 'completed'), 0),
+           COALESCE(SUM(sign) FILTER (WHERE status = 'rejected'), 0),
+           COALESCE(SUM(sign * estimated_hours), 0),
+           COALESCE(SUM(sign * actual_hours), 0)
+    FROM net
+    WHERE assigned_to IS NOT NULL
+    GROUP BY assigned_to
+    ORDER BY assigned_to
+    ON CONFLICT (user_id) DO UPDATE SET
+        total_tasks = s.total_tasks + EXCLUDED.total_tasks,
+        pending_tasks = s.pending_tasks + EXCLUDED.pending_tasks,
+        in_progress_tasks = s.in_progress_tasks + EXCLUDED.in_progress_tasks,
+        completed_tasks = s.completed_tasks + EXCLUDED.completed_tasks,
+        rejected_tasks = s.rejected_tasks + EXCLUDED.rejected_tasks,
+        estimated_hours = s.estimated_hours + EXCLUDED.estimated_hours,
+        actual_hours = s.actual_hours + EXCLUDED.actual_hours,
+        updated_at = NOW();
+$$ language 'sql';
+
+CREATE OR REPLACE FUNCTION maintain_task_stats()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM apply_task_stats_delta(ARRAY(
+            SELECT ROW(project_id, assigned_to, status, estimated_hours, actual_hours, 1)::task_stats_delta
+            FROM new_rows
+        ));
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM apply_task_stats_delta(ARRAY(
+            SELECT ROW(project_id, assigned_to, status, estimated_hours, actual_hours, -1)::task_stats_delta
+            FROM old_rows
+        ));
+    ELSE
+        PERFORM apply_task_stats_delta(ARRAY(
+            SELECT ROW(project_id, assigned_to, status, estimated_hours, actual_hours, -1)::task_stats_delta
+            FROM old_rows
+            UNION ALL
+            SELECT ROW(project_id, assigned_to, status, estimated_hours, actual_hours, 1)::task_stats_delta
+            FROM new_rows
+        ));
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS maintain_task_stats_insert ON tasks;
+CREATE TRIGGER maintain_task_stats_insert
+    AFTER INSERT ON tasks
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_task_stats();
+
+DROP TRIGGER IF EXISTS maintain_task_stats_update ON tasks;
+CREATE TRIGGER maintain_task_stats_update
+    AFTER UPDATE ON tasks
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_task_stats();
+
+DROP TRIGGER IF EXISTS maintain_task_stats_delete ON tasks;
+CREATE TRIGGER maintain_task_stats_delete
+    AFTER DELETE ON tasks
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_task_stats();
+
+-- Backfill from existing tasks
+TRUNCATE project_task_stats, user_task_stats;
+SELECT apply_task_stats_delta(ARRAY(
+    SELECT ROW(project_id, assigned_to, status, estimated_hours, actual_hours, 1)::task_stats_delta
+    FROM tasks
+));
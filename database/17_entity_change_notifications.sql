@@ -0,0 +1,29 @@
+-- Change notifications for the API's entity caches
+-- Every write to a project or task row sends NOTIFY entity_changes with
+-- "<table>:<id>". Each API worker listens on the channel and drops the row
+-- from its cache, so a cached row is replaced once the write commits,
+-- whichever worker or tool made it (including PostgREST and background
+-- maintenance such as cost rollups). Notifications are delivered at commit
+-- and identical ones within a transaction are sent once.
+CREATE OR REPLACE FUNCTION notify_entity_change()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        PERFORM pg_notify('entity_changes', TG_TABLE_NAME || ':' || OLD.id);
+    ELSE
+        PERFORM pg_notify('entity_changes', TG_TABLE_NAME || ':' || NEW.id);
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+-- Inserted rows cannot be cached yet, since misses are not cached
+DROP TRIGGER IF EXISTS notify_projects_change ON projects;
+CREATE TRIGGER notify_projects_change
+    AFTER UPDATE OR DELETE ON projects
+    FOR EACH ROW EXECUTE FUNCTION notify_entity_change();
+
+DROP TRIGGER IF EXISTS notify_tasks_change ON tasks;
+CREATE TRIGGER notify_tasks_change
+    AFTER UPDATE OR DELETE ON tasks
+    FOR EACH ROW EXECUTE FUNCTION notify_entity_change();
@@ -0,0 +1,41 @@
+-- Workload notifications for assignee recommendations
+-- Each API worker keeps an in-memory index of open tasks per assignee. Every
+-- insert or delete of a task, and every change to its assignee, status, due
+-- date or estimate, sends the task's new workload fields on the
+-- task_workload channel (status null once deleted, due date as epoch
+-- seconds), so the index applies the change instead of recounting tasks
+-- per user.
+CREATE OR REPLACE FUNCTION notify_task_workload()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        PERFORM pg_notify('task_workload', json_build_object('id', OLD.id, 'status', NULL)::text);
+    ELSE
+        PERFORM pg_notify('task_workload', json_build_object(
+            'id', NEW.id,
+            'assigned_to', NEW.assigned_to,
+            'status', NEW.status,
+            'due_epoch', extract(epoch FROM NEW.due_date),
+            'estimated_hours', NEW.estimated_hours
+        )::text);
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS notify_task_workload_insert_delete ON tasks;
+CREATE TRIGGER notify_task_workload_insert_delete
+    AFTER INSERT OR DELETE ON tasks
+    FOR EACH ROW EXECUTE FUNCTION notify_task_workload();
+
+DROP TRIGGER IF EXISTS notify_task_workload_update ON tasks;
+CREATE TRIGGER notify_task_workload_update
+    AFTER UPDATE OF assigned_to, status, due_date, estimated_hours ON tasks
+    FOR EACH ROW
+    WHEN (
+        OLD.assigned_to IS DISTINCT FROM NEW.assigned_to OR
+        OLD.status IS DISTINCT FROM NEW.status OR
+        OLD.due_date IS DISTINCT FROM NEW.due_date OR
+        OLD.estimated_hours IS DISTINCT FROM NEW.estimated_hours
+    )
+    EXECUTE FUNCTION notify_task_workload();
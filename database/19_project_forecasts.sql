@@ -0,0 +1,123 @@
+-- Project completion forecasts, recomputed only for projects that changed
+-- project_forecasts holds the last forecast per active project. Writes that
+-- can move a forecast mark the project in project_forecast_dirty, in the
+-- same statement as the write: task changes to the project, assignee,
+-- status, hours or completion time, and project changes to budget,
+-- actual_cost or status. A change to a completed task also moves its
+-- assignee's actual/estimated ratio, so it marks every project where that
+-- assignee has open tasks. The API claims the dirty projects, then
+-- recomputes them in one statement (app/services/forecasts.py).
+CREATE TABLE IF NOT EXISTS public.project_forecast_dirty (
+    project_id UUID PRIMARY KEY REFERENCES projects(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS public.project_forecasts (
+    project_id UUID PRIMARY KEY REFERENCES projects(id) ON DELETE CASCADE,
+    open_tasks INTEGER NOT NULL,
+    remaining_estimated_hours NUMERIC NOT NULL,
+    adjusted_remaining_hours NUMERIC NOT NULL,
+    daily_throughput_hours NUMERIC NOT NULL,
+    percent_complete NUMERIC NOT NULL,
+    forecast_completion_date DATE,
+    cost_performance_index NUMERIC,
+    estimated_cost_at_completion NUMERIC NOT NULL,
+    computed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+ALTER TABLE project_forecast_dirty ENABLE ROW LEVEL SECURITY;
+ALTER TABLE project_forecasts ENABLE ROW LEVEL SECURITY;
+
+CREATE OR REPLACE FUNCTION mark_project_forecasts_stale(p_project_ids UUID[], p_history_assignees UUID[])
+RETURNS VOID AS $$
+    INSERT INTO project_forecast_dirty (project_id)
+    SELECT DISTINCT project_id
+    FROM (
+        SELECT unnest(p_project_ids) AS project_id
+        UNION ALL
+        SELECT t.project_id
+        FROM tasks t
+        WHERE t.assigned_to = ANY(p_history_assignees) AND t.status IN ('pending', 'in_progress')
+    ) changed
+    WHERE project_id IS NOT NULL
+    ORDER BY project_id
+    -- Updating an existing marker locks it until the write commits, so a
+    -- refresh claiming it waits and then sees the write
+    ON CONFLICT (project_id) DO UPDATE SET project_id = EXCLUDED.project_id;
+$$ language 'sql';
+
+CREATE OR REPLACE FUNCTION mark_task_forecasts_stale()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM mark_project_forecasts_stale(
+            ARRAY(SELECT project_id FROM new_rows),
+            ARRAY(SELECT assigned_to FROM new_rows WHERE status = 'completed')
+        );
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM mark_project_forecasts_stale(
+            ARRAY(SELECT project_id FROM old_rows),
+            ARRAY(SELECT assigned_to FROM old_rows WHERE status = 'completed')
+        );
+    ELSE
+        -- Title and description edits leave every forecast as it was
+        PERFORM mark_project_forecasts_stale(
+            array_agg(o.project_id) || array_agg(n.project_id),
+            array_agg(o.assigned_to) FILTER (WHERE o.status = 'completed' OR n.status = 'completed') ||
+            array_agg(n.assigned_to) FILTER (WHERE o.status = 'completed' OR n.status = 'completed')
+        )
+        FROM old_rows o
+        JOIN new_rows n ON n.id = o.id
+        WHERE (o.project_id, o.assigned_to, o.status, o.estimated_hours, o.actual_hours, o.completed_at)
+              IS DISTINCT FROM
+              (n.project_id, n.assigned_to, n.status, n.estimated_hours, n.actual_hours, n.completed_at);
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS mark_task_forecasts_stale_insert ON tasks;
+CREATE TRIGGER mark_task_forecasts_stale_insert
+    AFTER INSERT ON tasks
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION mark_task_forecasts_stale();
+
+DROP TRIGGER IF EXISTS mark_task_forecasts_stale_update ON tasks;
+CREATE TRIGGER mark_task_forecasts_stale_update
+    AFTER UPDATE ON tasks
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION mark_task_forecasts_stale();
+
+DROP TRIGGER IF EXISTS mark_task_forecasts_stale_delete ON tasks;
+CREATE TRIGGER mark_task_forecasts_stale_delete
+    AFTER DELETE ON tasks
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION mark_task_forecasts_stale();
+
+CREATE OR REPLACE FUNCTION mark_project_forecast_stale()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM mark_project_forecasts_stale(ARRAY[NEW.id], ARRAY[]::UUID[]);
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS mark_project_forecast_stale_insert ON projects;
+CREATE TRIGGER mark_project_forecast_stale_insert
+    AFTER INSERT ON projects
+    FOR EACH ROW EXECUTE FUNCTION mark_project_forecast_stale();
+
+DROP TRIGGER IF EXISTS mark_project_forecast_stale_update ON projects;
+CREATE TRIGGER mark_project_forecast_stale_update
+    AFTER UPDATE OF budget, actual_cost, status ON projects
+    FOR EACH ROW
+    WHEN (
+        OLD.budget IS DISTINCT FROM NEW.budget OR
+        OLD.actual_cost IS DISTINCT FROM NEW.actual_cost OR
+        OLD.status IS DISTINCT FROM NEW.status
+    )
+    EXECUTE FUNCTION mark_project_forecast_stale();
+
+-- Every project gets its first forecast on the next read
+INSERT INTO project_forecast_dirty (project_id)
+SELECT id FROM projects
+ON CONFLICT (project_id) DO NOTHING;
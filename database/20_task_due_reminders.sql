@@ -0,0 +1,21 @@
+-- Due and overdue task reminders
+-- The reminder sweep (app/services/task_reminders.py) reads assigned open
+-- tasks due before the end of its horizon through a partial index that
+-- leaves completed and rejected tasks out. task_due_reminders records which
+-- reminder each task already got for which due date: one 'due_soon' and one
+-- 'overdue' per due date, so moving the due date makes the task eligible
+-- again, and sweeps running concurrently in several workers claim each
+-- reminder once.
+CREATE INDEX IF NOT EXISTS idx_tasks_open_due_date
+    ON tasks(due_date) INCLUDE (assigned_to)
+    WHERE status IN ('pending', 'in_progress') AND assigned_to IS NOT NULL;
+
+CREATE TABLE IF NOT EXISTS public.task_due_reminders (
+    task_id UUID NOT NULL REFERENCES tasks(id) ON DELETE CASCADE,
+    kind VARCHAR(20) NOT NULL, -- due_soon, overdue
+    due_date TIMESTAMP WITH TIME ZONE NOT NULL,
+    sent_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    PRIMARY KEY (task_id, kind)
+);
+
+ALTER TABLE task_due_reminders ENABLE ROW LEVEL SECURITY;
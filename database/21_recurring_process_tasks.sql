@@ -0,0 +1,19 @@
+-- Recurring process tasks
+-- Daily, weekly and monthly processes become one task per period for every
+-- active user of the process's role (app/services/recurrence.py). Generated
+-- tasks carry a recurrence key of process, user and period start, so
+-- reruns and concurrent runs insert each of them once. They belong to no
+-- project and have no creator. process_recurrences holds the start of the
+-- last period generated per process; after downtime the next run generates
+-- the periods since then.
+ALTER TABLE tasks ADD COLUMN IF NOT EXISTS recurrence_key VARCHAR(255);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_tasks_recurrence_key ON tasks(recurrence_key);
+
+CREATE TABLE IF NOT EXISTS public.process_recurrences (
+    process_id VARCHAR(100) PRIMARY KEY REFERENCES processes(id) ON DELETE CASCADE,
+    generated_through DATE NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+ALTER TABLE process_recurrences ENABLE ROW LEVEL SECURITY;
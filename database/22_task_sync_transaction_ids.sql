@@ -0,0 +1,52 @@
+-- Task delta sync by transaction id
+-- updated_at and deleted_at hold the writing transaction's start time, so a
+-- change can commit after a sync has handed out a later cursor and be
+-- skipped. Each task change and tombstone also records the id of the
+-- transaction that wrote it, and a sync only hands out changes below its
+-- snapshot's xmin (app/api/v1/tasks.py): every transaction below it has
+-- finished, and every later write gets a higher id. Only transactions that
+-- write hold it back; read-only queries and vacuum do not.
+ALTER TABLE tasks ADD COLUMN IF NOT EXISTS change_xid xid8 NOT NULL DEFAULT pg_current_xact_id();
+ALTER TABLE task_tombstones ADD COLUMN IF NOT EXISTS change_xid xid8 NOT NULL DEFAULT pg_current_xact_id();
+
+CREATE INDEX IF NOT EXISTS idx_tasks_assigned_change_xid ON tasks(assigned_to, change_xid, id);
+CREATE INDEX IF NOT EXISTS idx_task_tombstones_assigned_change_xid
+    ON task_tombstones(assigned_to, change_xid, task_id);
+
+CREATE OR REPLACE FUNCTION set_task_change_xid()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.change_xid = pg_current_xact_id();
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS set_task_change_xid ON tasks;
+CREATE TRIGGER set_task_change_xid BEFORE UPDATE ON tasks FOR EACH ROW EXECUTE FUNCTION set_task_change_xid();
+
+CREATE OR REPLACE FUNCTION record_deleted_task_tombstones()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO task_tombstones (task_id, assigned_to)
+    SELECT id, assigned_to FROM old_rows WHERE assigned_to IS NOT NULL
+    ON CONFLICT (assigned_to, task_id) DO UPDATE SET
+        deleted_at = EXCLUDED.deleted_at,
+        change_xid = EXCLUDED.change_xid;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION record_reassigned_task_tombstones()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO task_tombstones (task_id, assigned_to)
+    SELECT o.id, o.assigned_to
+    FROM old_rows o
+    JOIN new_rows n ON n.id = o.id
+    WHERE o.assigned_to IS NOT NULL AND n.assigned_to IS DISTINCT FROM o.assigned_to
+    ON CONFLICT (assigned_to, task_id) DO UPDATE SET
+        deleted_at = EXCLUDED.deleted_at,
+        change_xid = EXCLUDED.change_xid;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';